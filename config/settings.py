@@ -6,7 +6,38 @@ class Config:
     RECOMMENDATION_ALGORITHM = 'collaborative_filtering'
     DATA_SOURCE = 'path/to/data/source'
     MAX_RECOMMENDATIONS = 10
-    CACHE_TIMEOUT = 300  # seconds
+    CACHE_TIMEOUT = 300  # seconds; 0 disables the recommendation and profile caches
+    CACHE_MAX_ENTRIES = 10_000  # per cache, least recently used entries are evicted first
+    SIMILARITY_SEARCH = 'exact'  # 'exact' or 'ivf' (approximate)
+    IVF_NUM_LISTS = None  # None picks sqrt(number of students)
+    IVF_NUM_PROBES = 8
+    # 'global': the same 5 nearest students for every course; 'per_course': nearest students per
+    # candidate course, one top-k per course (about 1.4x the request time of 'global' on the
+    # 10,000-student sample; with 'ivf', only within the probed lists); 'item': course co-enrollment,
+    # no neighbor search
+    COLLABORATIVE_NEIGHBORS = 'global'
+    BULK_LOAD = False  # parse the CSV in typed pandas chunks instead of row by row
+    LOAD_CHUNK_SIZE = 100_000  # rows per chunk in bulk mode
+    LOAD_WORKERS = 1  # processes parsing chunks in bulk mode
+    SNAPSHOT_PATH = None  # directory for binary snapshots; None disables them
+    MODEL_PATH = None  # directory for the dropout model artifact; None always retrains
+    RECOMMENDATION_BATCH_SIZE = 1024  # students scored per pass by the batch endpoint
+    BATCH_STREAM_THRESHOLD = 100  # larger batch requests are streamed back as NDJSON
+    RETRAIN_INTERVAL = 0  # seconds between background model retrains; 0 disables
+    RETRAIN_DRIFT_THRESHOLD = 0.0  # retrain once this share of students has changed; 0 disables
+    RETRAIN_CHECK_INTERVAL = 30  # seconds between scheduler checks
+    MODEL_SELECTION = False  # cross-validate several dropout models and tune the threshold; False trains one Random Forest
+    MODEL_SELECTION_FOLDS = 5
+    MODEL_SELECTION_WORKERS = None  # processes evaluating candidates; None uses every core
+    MODEL_SELECTION_BUDGET = 600  # seconds; candidates still running are dropped; None waits for all
+    MODEL_SELECTION_BETA = 1.0  # threshold maximises F-beta of the dropout class; >1 favours recall
+    MODEL_SELECTION_TOLERANCE = 0.01  # prefer a cheaper model within this F-beta of the best
+    DROPOUT_BATCH_MAX_ROWS = 64  # profiles scored together by POST /api/dropout-score
+    DROPOUT_BATCH_WAIT_MS = 2  # how long the first request in a batch waits for others
+    METRICS_ENABLED = True  # per-stage latency histograms served at /api/metrics
+    PROFILING_ENABLED = False  # honour ?profile=1 / X-Profile: 1 by running the request under cProfile
+    PROFILE_MIN_INTERVAL = 60  # seconds between profiled requests, per process
+    PROFILE_DIR = None  # where .prof and .txt reports are written; None uses <tmp>/recommender-profiles
 
 class ProductionConfig(Config):
     DEBUG = False
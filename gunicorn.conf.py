@@ -0,0 +1,42 @@
+"""Gunicorn settings for pre-fork serving.
+
+    DATASET_PATH=personalized_learning_dataset.csv gunicorn -c gunicorn.conf.py recommender.api.app:app
+
+The app is imported once in the master (``preload_app``): the dataset is
+loaded, from a memory-mapped snapshot when ``Config.SNAPSHOT_PATH`` is set,
+and the classifier trained before any worker exists. Workers are forked
+afterwards and share those pages copy-on-write. Set ``PRELOAD_APP=0`` to
+load the app separately in every worker instead (for comparison).
+"""
+import gc
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+preload_app = os.environ.get("PRELOAD_APP", "1") != "0"
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded and before the first fork."""
+    if not preload_app:
+        return
+    from recommender.api.app import data_manager
+    # initialize() started the retraining scheduler here in the master; its
+    # thread would not be forked, and a retrain swapping the model after
+    # gc.freeze() would only dirty shared pages. One worker retrains instead.
+    data_manager.stop_retraining()
+    data_manager.warm_up()
+    # Move every object into the permanent generation, so that garbage
+    # collections in the workers never write to (and copy) the pages holding them
+    gc.collect()
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    """Threads do not survive fork, so retraining starts in each worker, preloaded or not.
+
+    With several workers one of them wins the lock next to
+    ``Config.MODEL_PATH`` and retrains; the others reload each model it saves.
+    """
+    from recommender.api.app import data_manager
+    data_manager.start_retraining(shared=workers > 1)
@@ -1,32 +1,210 @@
-from typing import List
+from contextlib import contextmanager
+from typing import Iterator, List, Dict, Optional
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+import joblib
+import sklearn
 from sklearn.ensemble import RandomForestClassifier
 import numpy as np
 from ..core.models import StudentProfile
+from ..core.metrics import registry as metrics
+from .forest import FlatForest
+
+MODEL_FORMAT_VERSION = 1
+MODEL_FILE = "model.joblib"
+METADATA_FILE = "metadata.json"
+# Batches up to this size are scored with the flattened forest, larger ones by sklearn
+FLAT_FOREST_MAX_ROWS = 64
+
+
+class ModelNotTrainedError(ValueError):
+    """Raised when scoring with a classifier that has not been trained or loaded yet."""
+
+
+@contextmanager
+def artifact_lock(path: str, shared: bool = False) -> Iterator[None]:
+    """Lock the artifact directory ``path`` across processes: exclusive to replace it, shared to read it."""
+    with open(f"{path}.lock", "a") as file:
+        fcntl.flock(file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def training_data_hash(X, y) -> str:
+    """SHA-256 of the feature matrix and labels a model is trained on."""
+    digest = hashlib.sha256()
+    X_np = np.ascontiguousarray(X, dtype=np.float64)
+    digest.update(str(X_np.shape).encode())
+    digest.update(X_np.tobytes())
+    digest.update(np.asarray(y, dtype=np.int8).tobytes())
+    return digest.hexdigest()
+
 
 class DropoutClassifier:
-    def __init__(self):
-        self.model = RandomForestClassifier(n_estimators=100, class_weight="balanced", random_state=42)
-        self.is_trained = False
+    def __init__(self, model_path: Optional[str] = None, threshold: float = 0.2):
+        """Create an untrained classifier, or one backed by a saved artifact.
+
+        With ``model_path`` only the metadata is read here; the model itself
+        is unpickled the first time it is used.
+        """
+        self.model_path = model_path
+        self.threshold = threshold
+        self.metadata: Dict = {}
+        self._lock = threading.Lock()
+        self._flat_forest = None  # built on first small-batch prediction; False if unsupported
+        if model_path:
+            self._model = None
+            self.metadata = self.read_metadata(model_path) or {}
+            self.threshold = self.metadata.get("threshold", threshold)
+            self.is_trained = True
+        else:
+            self._model = RandomForestClassifier(n_estimators=100, class_weight="balanced", random_state=42)
+            self.is_trained = False
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_flat_forest"] = None
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = joblib.load(Path(self.model_path) / MODEL_FILE)
+        return self._model
+
+    @model.setter
+    def model(self, model) -> None:
+        self._model = model
+        self._flat_forest = None
 
-    def train(self, X: List[List[float]], y: List[bool]) -> None:
+    @property
+    def flat_forest(self) -> Optional[FlatForest]:
+        """The trained model as a ``FlatForest``, or None if it is not a random forest."""
+        if self._flat_forest is None:
+            self._flat_forest = FlatForest.from_estimator(self.model) or False
+        return self._flat_forest or None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def train(self, X: np.ndarray, y: List[bool]) -> None:
         """Train the classifier on preprocessed student data."""
-        X_np = np.array(X)
         y_np = np.array([1 if label else 0 for label in y])
-        self.model.fit(X_np, y_np)
+        self.model.fit(X, y_np)
+        self._flat_forest = None
         self.is_trained = True
 
-    def predict_proba(self, X: List[List[float]]) -> np.ndarray:  # Change return type to np.ndarray
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:  # Change return type to np.ndarray
         """Predict dropout probability for a list of students."""
         if not self.is_trained:
-            raise ValueError("Classifier must be trained before predicting.")
-        X_np = np.array(X)
-        probabilities = self.model.predict_proba(X_np)[:, 1]  # Probability of dropout (class 1)
+            raise ModelNotTrainedError("Classifier must be trained before predicting.")
+        with metrics.stage("model_inference"):
+            if len(X) <= FLAT_FOREST_MAX_ROWS and self.flat_forest is not None and not np.isnan(X).any():
+                return self.flat_forest.predict_proba(X)  # same values, without sklearn's per-call overhead
+            probabilities = self.model.predict_proba(X)[:, 1]  # Probability of dropout (class 1)
         return probabilities  # Return NumPy array, not list
 
-    def predict(self, X: List[List[float]]) -> List[bool]:
-        """Predict binary dropout likelihood."""
+    def predict(self, X: np.ndarray) -> List[bool]:
+        """Predict binary dropout likelihood at the classifier's decision threshold."""
+        return [bool(prob > self.threshold) for prob in self.predict_proba(X)]
+
+    def save(self, path: str, metadata: Optional[Dict] = None) -> None:
+        """Write the model and its metadata to the artifact directory ``path``.
+
+        ``metadata`` should carry ``feature_columns``, ``training_data_hash``
+        and ``metrics``; format, library versions and the threshold are added.
+        """
+        if not self.is_trained:
+            raise ValueError("Classifier must be trained before saving.")
+        self.metadata = self._artifact_metadata(metadata or self.metadata)
+        target = Path(path)
+        staging = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+        shutil.rmtree(staging, ignore_errors=True)
+        self._write_artifact(staging)
+        # Other processes may save to or read from the same path
+        with artifact_lock(str(target)):
+            retired = target.with_name(f"{target.name}.old-{os.getpid()}")
+            if target.exists():
+                target.rename(retired)
+            staging.rename(target)
+            shutil.rmtree(retired, ignore_errors=True)
+        self.model_path = str(target)
+
+    def export(self, path: str) -> None:
+        """Write the model to the new directory ``path`` without making it this classifier's artifact.
+
+        Used to embed the model in another artifact, such as a data snapshot.
+        """
         if not self.is_trained:
-            raise ValueError("Classifier must be trained before predicting.")
-        X_np = np.array(X)
-        predictions = self.model.predict(X_np)
-        return [bool(pred) for pred in predictions]
\ No newline at end of file
+            raise ValueError("Classifier must be trained before saving.")
+        self._write_artifact(Path(path), self._artifact_metadata(self.metadata))
+
+    def _artifact_metadata(self, metadata: Dict) -> Dict:
+        metadata = dict(metadata)
+        metadata.update({
+            "format_version": MODEL_FORMAT_VERSION,
+            "sklearn_version": sklearn.__version__,
+            "model_type": type(self.model).__name__,
+            "threshold": self.threshold,
+        })
+        metadata.setdefault("model_version", datetime.now().strftime("%Y%m%d%H%M%S"))
+        return metadata
+
+    def _write_artifact(self, directory: Path, metadata: Optional[Dict] = None) -> None:
+        directory.mkdir(parents=True)
+        joblib.dump(self.model, directory / MODEL_FILE)
+        with open(directory / METADATA_FILE, "w", encoding="utf-8") as file:
+            json.dump(self.metadata if metadata is None else metadata, file, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "DropoutClassifier":
+        """Classifier backed by the artifact at ``path``, unpickled lazily."""
+        if cls.read_metadata(path) is None:
+            raise FileNotFoundError(f"No model artifact at {path}")
+        return cls(model_path=path)
+
+    @classmethod
+    def load_now(cls, path: str) -> "DropoutClassifier":
+        """Classifier with the model at ``path`` unpickled right away, safe against a concurrent ``save``."""
+        with artifact_lock(path, shared=True):
+            classifier = cls.load(path)
+            classifier.model
+        return classifier
+
+    @staticmethod
+    def read_metadata(path: str) -> Optional[Dict]:
+        try:
+            with open(Path(path) / METADATA_FILE, encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    @classmethod
+    def is_compatible(cls, path: str, feature_columns: List[str], data_hash: Optional[str] = None) -> bool:
+        """Whether the artifact at ``path`` can be reused for these features (and data)."""
+        metadata = cls.read_metadata(path)
+        if not metadata or not (Path(path) / MODEL_FILE).exists():
+            return False
+        if metadata.get("format_version") != MODEL_FORMAT_VERSION:
+            return False
+        if metadata.get("sklearn_version") != sklearn.__version__:
+            return False
+        if metadata.get("feature_columns") != list(feature_columns):
+            return False
+        return data_hash is None or metadata.get("training_data_hash") == data_hash
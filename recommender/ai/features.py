@@ -0,0 +1,157 @@
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+from ..core.models import Gender, EducationLevel, EngagementLevel, LearningStyle
+from ..core.table import DirtyRows, StudentTable, StudentView, GENDERS, EDUCATION_LEVELS, LEARNING_STYLES, ENGAGEMENT_LEVELS
+
+NUM_CLASSIFIER_FEATURES = 19
+NUM_SIMILARITY_FEATURES = 16
+
+# Ordinal encodings shared by both feature sets, indexed by enum code
+_ENGAGEMENT_ORDINAL = np.array([
+    {EngagementLevel.HIGH: 1.0, EngagementLevel.MEDIUM: 0.5}.get(level, 0.0) for level in ENGAGEMENT_LEVELS
+])
+_GENDER_ORDINAL = np.array([{Gender.MALE: 1.0, Gender.FEMALE: 0.5}.get(gender, 0.0) for gender in GENDERS])
+_EDUCATION_ORDINAL = np.array([
+    {EducationLevel.POSTGRADUATE: 1.0, EducationLevel.UNDERGRADUATE: 0.5}.get(level, 0.0) for level in EDUCATION_LEVELS
+])
+
+
+def _one_hot(codes: np.ndarray, members: tuple, order: list) -> np.ndarray:
+    """One column per member of ``order``, whatever the enum's storage order."""
+    lookup = np.array([[1.0 if member == wanted else 0.0 for wanted in order] for member in members])
+    return lookup[codes]
+
+
+def encode_table(table: StudentTable, rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Classifier and similarity feature matrices for ``rows`` (default: all rows)."""
+    rows = np.arange(len(table)) if rows is None else np.asarray(rows, dtype=np.int64)
+    count = len(rows)
+    # Enrollments come out in insertion order per student, so per-student sums
+    # accumulate in the same order as summing the profile dicts
+    enrollments, positions = table.enrollments_of(rows)
+    courses = np.bincount(positions, minlength=count)
+    per_course = np.maximum(1, courses)
+
+    def average(name: str) -> np.ndarray:
+        totals = np.bincount(positions, weights=table.enrollment_column(name)[enrollments], minlength=count)
+        return totals / per_course
+
+    age = table.column("age")[rows] / 50.0
+    gender = table.column("gender")[rows]
+    education = table.column("education_level")[rows]
+    style = _one_hot(table.column("learning_style")[rows], LEARNING_STYLES, list(LearningStyle))
+    engagement = _ENGAGEMENT_ORDINAL[table.column("engagement_level")[rows]]
+    time_spent = average("time_spent_on_videos") / 500.0
+    quiz_scores = average("quiz_scores") / 100.0
+    forum = average("forum_participation") / 50.0
+    assignments = average("assignment_completion_rate") / 100.0
+    quiz_attempts = average("quiz_attempts") / 4.0
+    final_exam = average("final_exam_score") / 100.0
+    feedback = average("feedback_score") / 5.0
+
+    classifier = np.empty((count, NUM_CLASSIFIER_FEATURES))
+    classifier[:, 0] = age
+    classifier[:, 1:4] = _one_hot(gender, GENDERS, [Gender.MALE, Gender.FEMALE, Gender.OTHER])
+    classifier[:, 4:7] = _one_hot(
+        education, EDUCATION_LEVELS,
+        [EducationLevel.HIGH_SCHOOL, EducationLevel.UNDERGRADUATE, EducationLevel.POSTGRADUATE]
+    )
+    classifier[:, 7:11] = style
+    classifier[:, 11] = engagement
+    classifier[:, 12] = time_spent
+    classifier[:, 13] = quiz_attempts
+    classifier[:, 14] = quiz_scores
+    classifier[:, 15] = forum
+    classifier[:, 16] = assignments
+    classifier[:, 17] = final_exam
+    classifier[:, 18] = feedback
+
+    similarity = np.empty((count, NUM_SIMILARITY_FEATURES))
+    similarity[:, 0:4] = style
+    similarity[:, 4] = age
+    similarity[:, 5] = _GENDER_ORDINAL[gender]
+    similarity[:, 6] = _EDUCATION_ORDINAL[education]
+    similarity[:, 7] = engagement
+    similarity[:, 8] = time_spent
+    similarity[:, 9] = quiz_scores
+    similarity[:, 10] = forum
+    similarity[:, 11] = assignments
+    similarity[:, 12] = quiz_attempts
+    similarity[:, 13] = final_exam
+    similarity[:, 14] = feedback
+    similarity[:, 15] = table.column("dropout_likelihood")[rows]
+    return classifier, similarity
+
+
+def encode_profiles(profiles: List) -> Tuple[np.ndarray, np.ndarray]:
+    """Encode arbitrary profiles (``StudentProfile`` or ``StudentView``) in one pass."""
+    if profiles and all(isinstance(p, StudentView) for p in profiles):
+        table = profiles[0]._table
+        if all(p._table is table for p in profiles):
+            return encode_table(table, np.array([p.row for p in profiles], dtype=np.int64))
+    table = StudentTable(initial_capacity=max(1, len(profiles)))
+    for position, profile in enumerate(profiles):
+        profile = profile.to_profile() if isinstance(profile, StudentView) else profile
+        # Keyed by position: the same student may legitimately appear twice
+        table.add_profile(profile, student_id=str(position))
+    return encode_table(table)
+
+
+class FeatureStore:
+    """Classifier and similarity encodings for every row of a ``StudentTable``.
+
+    Both matrices are computed in one vectorized pass at load time and kept
+    row-aligned with the table. New rows and rows marked dirty are
+    re-encoded on the next ``refresh``.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        self._classifier = np.zeros((initial_capacity, NUM_CLASSIFIER_FEATURES))
+        self._similarity = np.zeros((initial_capacity, NUM_SIMILARITY_FEATURES))
+        self._size = 0
+        self._dirty = DirtyRows()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def classifier(self) -> np.ndarray:
+        """Dropout classifier features, one row per table row."""
+        return self._classifier[:self._size]
+
+    @property
+    def similarity(self) -> np.ndarray:
+        """Unnormalized similarity features, one row per table row."""
+        return self._similarity[:self._size]
+
+    def mark_dirty(self, rows: Iterable[int]) -> None:
+        self._dirty.add(rows)
+
+    def refresh(self, table: StudentTable) -> np.ndarray:
+        """Encode new and dirty rows; return the rows that changed, ascending."""
+        rows = np.union1d(self._dirty.take(self._size), np.arange(self._size, len(table)))
+        if not len(rows):
+            return rows
+        self._ensure_capacity(len(table))
+        classifier, similarity = encode_table(table, rows)
+        self._classifier[rows] = classifier
+        self._similarity[rows] = similarity
+        self._size = len(table)
+        return rows
+
+    def load_arrays(self, classifier: np.ndarray, similarity: np.ndarray) -> None:
+        """Adopt precomputed (e.g. memory-mapped) matrices."""
+        self._classifier = classifier
+        self._similarity = similarity
+        self._size = len(classifier)
+        self._dirty.clear()
+
+    def _ensure_capacity(self, size: int) -> None:
+        if size <= len(self._classifier):
+            return
+        capacity = max(size, 2 * len(self._classifier), 16)
+        for name in ("_classifier", "_similarity"):
+            current = getattr(self, name)
+            grown = np.zeros((capacity, current.shape[1]))
+            grown[:len(current)] = current
+            setattr(self, name, grown)
@@ -0,0 +1,98 @@
+from typing import Optional
+import numpy as np
+import sklearn
+from sklearn.tree import DecisionTreeClassifier
+
+# From 1.4 on, tree leaves hold class fractions and predict_proba returns them
+# as is; before that they hold weighted counts that predict_proba normalises.
+_LEAVES_NORMALIZED = tuple(int(part) for part in sklearn.__version__.split(".")[:2]) >= (1, 4)
+
+
+def _leaf_probabilities(tree) -> np.ndarray:
+    """Dropout probability of every node of a fitted tree, computed as sklearn does."""
+    proba = tree.tree_.value[:, 0, :tree.n_classes_].astype(np.float64)
+    if not _LEAVES_NORMALIZED:
+        normalizer = proba.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        proba /= normalizer
+    return proba[:, 1]
+
+
+class FlatForest:
+    """A binary random forest flattened into contiguous node arrays.
+
+    All trees are walked at once, one level per step, over the (tree, row)
+    pairs that have not reached a leaf yet. Scoring a single student thus
+    costs a few dozen small numpy operations instead of a full
+    ``predict_proba`` call with input validation and a joblib dispatch;
+    past a few hundred rows sklearn's compiled traversal is faster. The
+    per-tree probabilities are summed in tree order and divided by the
+    number of trees, like sklearn, so the results are bit-for-bit identical.
+    """
+
+    def __init__(self, feature, threshold, left, right, leaf_value, roots, depth, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.leaf_value = leaf_value
+        self.roots = roots
+        self.depth = depth
+        self.n_features = n_features
+        self.is_leaf = left == np.arange(len(left))  # leaves point at themselves
+
+    @classmethod
+    def from_estimator(cls, model) -> Optional["FlatForest"]:
+        """Flatten a fitted binary forest of decision trees; None for any other model."""
+        trees = getattr(model, "estimators_", None)
+        if not trees or len(getattr(model, "classes_", ())) != 2:
+            return None
+        if not all(isinstance(tree, DecisionTreeClassifier) and tree.n_classes_ == 2 for tree in trees):
+            return None
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            structure = tree.tree_
+            nodes = np.arange(structure.node_count)
+            leaf = structure.children_left == -1
+            features.append(np.where(leaf, 0, structure.feature))
+            thresholds.append(np.where(leaf, np.inf, structure.threshold))
+            lefts.append(np.where(leaf, nodes, structure.children_left) + offset)
+            rights.append(np.where(leaf, nodes, structure.children_right) + offset)
+            values.append(_leaf_probabilities(tree))
+            roots.append(offset)
+            offset += structure.node_count
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            leaf_value=np.concatenate(values),
+            roots=np.array(roots, dtype=np.intp),
+            depth=max(tree.tree_.max_depth for tree in trees),
+            n_features=model.n_features_in_ if hasattr(model, "n_features_in_") else model.n_features_
+        )
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Dropout probability for every row of ``X``, as the forest's ``predict_proba(X)[:, 1]``."""
+        # Trees compare float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got shape {X.shape}")
+        n_trees, n_rows = len(self.roots), X.shape[0]
+        values = X.ravel()
+        nodes = np.repeat(self.roots, n_rows)  # tree-major: (tree, row) pairs
+        offsets = np.tile(np.arange(n_rows) * self.n_features, n_trees)
+        active = np.arange(nodes.size)
+        for _ in range(self.depth):
+            current = nodes[active]
+            go_left = values[offsets[active] + self.feature[current]] <= self.threshold[current]
+            current = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = current
+            active = active[~self.is_leaf[current]]
+            if not active.size:
+                break
+        nodes = nodes.reshape(n_trees, n_rows)
+        # cumsum adds trees strictly in order, like the forest's accumulation
+        total = np.cumsum(self.leaf_value[nodes], axis=0)[-1]
+        return total / len(self.roots)
@@ -0,0 +1,212 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.utils.class_weight import compute_sample_weight
+from config.settings import Config
+
+try:
+    from sklearn.ensemble import HistGradientBoostingClassifier
+except ImportError:  # scikit-learn < 1.0 keeps it behind sklearn.experimental
+    from sklearn.experimental import enable_hist_gradient_boosting  # noqa: F401
+    from sklearn.ensemble import HistGradientBoostingClassifier
+# class_weight, needed for the imbalanced dropout labels, arrived in scikit-learn 1.2
+HGB_CLASS_WEIGHT = "class_weight" in HistGradientBoostingClassifier().get_params()
+
+
+class BalancedHistGradientBoostingClassifier(HistGradientBoostingClassifier):
+    """HistGradientBoosting weighting classes like ``class_weight="balanced"``, for scikit-learn < 1.2."""
+
+    def fit(self, X, y, sample_weight=None):
+        weights = compute_sample_weight("balanced", y)
+        if sample_weight is not None:
+            weights = weights * sample_weight
+        return super().fit(X, y, sample_weight=weights)
+
+
+def balanced_hist_gradient_boosting(**params) -> HistGradientBoostingClassifier:
+    """A HistGradientBoosting classifier with balanced class weights on any supported scikit-learn."""
+    if HGB_CLASS_WEIGHT:
+        return HistGradientBoostingClassifier(class_weight="balanced", **params)
+    return BalancedHistGradientBoostingClassifier(**params)
+
+
+class Candidate(NamedTuple):
+    name: str
+    estimator: object  # unfitted; cloned for every fold
+
+
+def default_candidates(random_state: int = 42) -> List[Candidate]:
+    """The model grid searched by default, roughly cheapest first."""
+    return [
+        Candidate("hgb_100", balanced_hist_gradient_boosting(
+            max_iter=100, learning_rate=0.1, random_state=random_state)),
+        Candidate("hgb_200_slow", balanced_hist_gradient_boosting(
+            max_iter=200, learning_rate=0.05, max_leaf_nodes=15, random_state=random_state)),
+        Candidate("rf_50_leaf5", RandomForestClassifier(
+            n_estimators=50, min_samples_leaf=5, class_weight="balanced", random_state=random_state)),
+        Candidate("rf_100", RandomForestClassifier(
+            n_estimators=100, class_weight="balanced", random_state=random_state)),
+        Candidate("rf_200_depth12", RandomForestClassifier(
+            n_estimators=200, max_depth=12, class_weight="balanced", random_state=random_state)),
+    ]
+
+
+class CandidateResult(NamedTuple):
+    name: str
+    params: Dict
+    roc_auc: float
+    score: float  # F-beta of the dropout class at ``threshold``, out of fold
+    threshold: float
+    accuracy: float
+    fit_seconds: float  # mean per fold
+    inference_us_per_row: float  # batch scoring of a held-out fold
+    single_row_ms: float  # one predict_proba call on one student, best of 5
+    oof_probabilities: np.ndarray
+
+    def summary(self) -> Dict:
+        summary = self._asdict()
+        del summary["oof_probabilities"]
+        return summary
+
+
+def tune_threshold(y: np.ndarray, probabilities: np.ndarray, beta: float = 1.0) -> Tuple[float, float]:
+    """Threshold maximising F-beta of ``probabilities > threshold``, and that score."""
+    y = np.asarray(y, dtype=bool)
+    order = np.argsort(-probabilities, kind="stable")
+    true_positives = np.concatenate(([0], np.cumsum(y[order])))
+    ascending = probabilities[order][::-1]
+    thresholds = np.unique(np.concatenate(([0.0], probabilities)))
+    # Rows scoring strictly above each threshold are a prefix of ``order``
+    predicted = len(y) - np.searchsorted(ascending, thresholds, side="right")
+    tp = true_positives[predicted]
+    weight = 1 + beta ** 2
+    denominator = weight * tp + beta ** 2 * (y.sum() - tp) + (predicted - tp)
+    scores = np.divide(weight * tp, denominator, out=np.zeros(len(tp)), where=denominator > 0)
+    best = int(np.argmax(scores))
+    return float(thresholds[best]), float(scores[best])
+
+
+def evaluate_candidate(
+    candidate: Candidate, X: np.ndarray, y: np.ndarray, folds: int, random_state: int, beta: float, deadline: float
+) -> Optional[CandidateResult]:
+    """Cross-validate one candidate; None if the wall-clock ``deadline`` passes first."""
+    y = np.asarray(y, dtype=np.int8)
+    oof = np.zeros(len(y))
+    fit_seconds = inference_seconds = 0.0
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=random_state)
+    for train, test in splitter.split(X, y):
+        if time.time() >= deadline:
+            return None
+        estimator = clone(candidate.estimator)
+        started = time.perf_counter()
+        estimator.fit(X[train], y[train])
+        fitted = time.perf_counter()
+        oof[test] = estimator.predict_proba(X[test])[:, 1]
+        fit_seconds += fitted - started
+        inference_seconds += time.perf_counter() - fitted
+    single_row_ms = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        estimator.predict_proba(X[test[:1]])
+        single_row_ms = min(single_row_ms, (time.perf_counter() - started) * 1000)
+    threshold, score = tune_threshold(y, oof, beta)
+    return CandidateResult(
+        name=candidate.name,
+        params={key: value for key, value in candidate.estimator.get_params().items() if _is_plain(value)},
+        roc_auc=float(roc_auc_score(y, oof)),
+        score=score,
+        threshold=threshold,
+        accuracy=float(np.mean((oof > threshold) == y)),
+        fit_seconds=fit_seconds / folds,
+        inference_us_per_row=inference_seconds / len(y) * 1e6,
+        single_row_ms=single_row_ms,
+        oof_probabilities=oof
+    )
+
+
+def _is_plain(value) -> bool:
+    return value is None or isinstance(value, (bool, int, float, str))
+
+
+class ModelSelector:
+    """Cross-validated search over dropout models with a tuned decision threshold.
+
+    Candidates are evaluated with stratified k-fold CV in a process pool
+    (inline when ``workers`` is 1); those still running when
+    ``time_budget`` seconds have passed are dropped at their next fold.
+    Each candidate's threshold maximises F-beta of the dropout class on its
+    out-of-fold probabilities. The best score wins, except that any
+    candidate within ``tolerance`` of it with cheaper single-student
+    inference is preferred.
+    """
+
+    def __init__(
+        self,
+        candidates: Optional[Sequence[Candidate]] = None,
+        folds: int = 5,
+        workers: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        beta: float = 1.0,
+        tolerance: float = 0.01,
+        random_state: int = 42
+    ):
+        self.candidates = list(candidates) if candidates is not None else default_candidates(random_state)
+        self.folds = folds
+        self.workers = workers or os.cpu_count() or 1
+        self.time_budget = time_budget
+        self.beta = beta
+        self.tolerance = tolerance
+        self.random_state = random_state
+
+    @classmethod
+    def from_config(cls, config=Config) -> Optional["ModelSelector"]:
+        """A selector configured from ``config``, or None if model selection is off."""
+        if not getattr(config, "MODEL_SELECTION", False):
+            return None
+        return cls(
+            folds=getattr(config, "MODEL_SELECTION_FOLDS", 5),
+            workers=getattr(config, "MODEL_SELECTION_WORKERS", None),
+            time_budget=getattr(config, "MODEL_SELECTION_BUDGET", None),
+            beta=getattr(config, "MODEL_SELECTION_BETA", 1.0),
+            tolerance=getattr(config, "MODEL_SELECTION_TOLERANCE", 0.01)
+        )
+
+    def evaluate(self, X: np.ndarray, y: np.ndarray) -> List[CandidateResult]:
+        """Results for the candidates that finished within the budget, best first."""
+        deadline = time.time() + self.time_budget if self.time_budget else float("inf")
+        args = (X, y, self.folds, self.random_state, self.beta, deadline)
+        if self.workers == 1 or len(self.candidates) == 1:
+            results = [evaluate_candidate(candidate, *args) for candidate in self.candidates]
+        else:
+            results = []
+            executor = ProcessPoolExecutor(max_workers=min(self.workers, len(self.candidates)))
+            try:
+                pending = {executor.submit(evaluate_candidate, candidate, *args) for candidate in self.candidates}
+                while pending:
+                    timeout = None if deadline == float("inf") else max(0.0, deadline - time.time())
+                    done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                    if not done:
+                        break
+                    results.extend(future.result() for future in done)
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+        return self.rank([result for result in results if result is not None])
+
+    def rank(self, results: List[CandidateResult]) -> List[CandidateResult]:
+        results = sorted(results, key=lambda result: (-result.score, result.single_row_ms))
+        if results:
+            close = [result for result in results if result.score >= results[0].score - self.tolerance]
+            cheapest = min(close, key=lambda result: result.single_row_ms)
+            results.remove(cheapest)
+            results.insert(0, cheapest)
+        return results
+
+    def estimator(self, result: CandidateResult):
+        """An unfitted copy of the estimator behind ``result``."""
+        return clone(next(candidate.estimator for candidate in self.candidates if candidate.name == result.name))
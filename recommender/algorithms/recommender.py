@@ -1,5 +1,10 @@
-from typing import List, Dict
+from typing import List, Optional, Tuple, Union
+import numpy as np
 from ..core.models import StudentProfile, Course, Recommendation, LearningStyle
+from ..core.table import LEARNING_STYLES
+
+HIGH_DROPOUT_RISK = 0.5
+DROPOUT_ADJUSTMENT = 0.25  # Fixed adjustment for high risk
 
 class CourseRecommender:
     def __init__(self):
@@ -13,43 +18,101 @@ class CourseRecommender:
         num_recommendations: int = 3
     ) -> List[Recommendation]:
         """Generate course recommendations based on student profile and similar students."""
-        recommendations = []
-        
-        for course in available_courses:
-            # Content match score based on learning style
-            content_match = course.content_type_weights.get(student.learning_style, 0.0)
-            
+        neighbor_exam_scores = np.array([[
+            [s.final_exam_scores.get(course.course_name, 0.0) if course.course_name in s.course_history else 0.0
+             for course in available_courses]
+            for s in similar_students
+        ]]).reshape(1, len(similar_students), len(available_courses))
+        return self.rank_courses(
+            learning_styles=np.array([LEARNING_STYLES.index(student.learning_style)]),
+            dropout_scores=np.array([student.predicted_dropout_score or np.nan]),
+            available=np.ones((1, len(available_courses)), dtype=bool),
+            neighbor_exam_scores=neighbor_exam_scores,
+            courses=available_courses,
+            num_recommendations=num_recommendations
+        )[0]
+
+    @staticmethod
+    def style_weights(courses: List[Course]) -> np.ndarray:
+        """Learning style x course matrix of ``content_type_weights``, rows in ``LEARNING_STYLES`` order."""
+        return np.array([[course.content_type_weights.get(style, 0.0) for course in courses] for style in LEARNING_STYLES]).reshape(
+            len(LEARNING_STYLES), len(courses)
+        )
+
+    def rank_courses(
+        self,
+        learning_styles: np.ndarray,
+        dropout_scores: np.ndarray,
+        available: np.ndarray,
+        neighbor_exam_scores: Optional[np.ndarray],
+        courses: List[Course],
+        num_recommendations: int = 3,
+        weights: Optional[np.ndarray] = None,
+        collaborative: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        evidence: Union[str, np.ndarray] = "similar students"
+    ) -> List[List[Recommendation]]:
+        """Score every course for a batch of students with array operations.
+
+        ``learning_styles`` holds ``LEARNING_STYLES`` codes and
+        ``dropout_scores`` the predicted scores (NaN if unknown), one per
+        student. ``available`` is a ``(students, courses)`` mask and
+        ``neighbor_exam_scores`` a ``(students, neighbors, courses)`` array of
+        final exam scores, zero where a neighbor is not enrolled. Instead of
+        neighbor scores, ``collaborative`` may give the ``(students,
+        courses)`` success counts and average successes directly, with
+        ``evidence`` naming whose success it is in the reasoning (one name,
+        or one per student and course). ``weights``
+        defaults to ``style_weights(courses)``. Courses are ranked by
+        relevance, ties in course order; reasoning is only built for the
+        courses that are returned.
+        """
+        if weights is None:
+            weights = self.style_weights(courses)
+        content_match = weights[learning_styles]
+
+        if collaborative is not None:
+            collab_count, collab_score = collaborative
+        else:
             # Collaborative filtering: success rate among similar students
-            similar_students_success = [
-                s.final_exam_scores.get(course.course_name, 0.0) / 100.0
-                for s in similar_students
-                if course.course_name in s.course_history and s.final_exam_scores.get(course.course_name, 0.0) > 0
-            ]
-            collab_score = sum(similar_students_success) / len(similar_students_success) if similar_students_success else 0.0
-            collab_count = len(similar_students_success)
-            
-            # Base relevance score
-            relevance_score = 0.5 * content_match + 0.5 * collab_score
-            
-            # Adjust for high dropout risk
-            dropout_adjustment = 0.0
-            if student.predicted_dropout_score and student.predicted_dropout_score > 0.5:
-                dropout_adjustment = 0.25  # Fixed adjustment for high risk
-                relevance_score += dropout_adjustment
-            
-            # Reasoning
-            reasoning_parts = [f"Matches learning style ({student.learning_style.value}: {content_match:.2f})"]
-            if collab_count > 0:
-                reasoning_parts.append(f"Popular among {collab_count} similar students (avg success: {collab_score:.2f})")
-            if dropout_adjustment > 0:
-                reasoning_parts.append(f"Adjusted for high dropout risk (+{dropout_adjustment:.2f})")
-            reasoning = ". ".join(reasoning_parts) + "."
-            
-            recommendations.append(Recommendation(
-                course_name=course.course_name,
-                reasoning=reasoning,
-                relevance_score=relevance_score
-            ))
-        
-        recommendations.sort(key=lambda x: x.relevance_score, reverse=True)
-        return recommendations[:num_recommendations]
\ No newline at end of file
+            succeeded = neighbor_exam_scores > 0
+            collab_count = succeeded.sum(axis=1)
+            collab_total = np.where(succeeded, neighbor_exam_scores / 100.0, 0.0).sum(axis=1)
+            collab_score = np.where(collab_count > 0, collab_total / np.maximum(collab_count, 1), 0.0)
+
+        relevance = 0.5 * content_match + 0.5 * collab_score
+        dropout_adjustment = np.where(dropout_scores > HIGH_DROPOUT_RISK, DROPOUT_ADJUSTMENT, 0.0)
+        relevance = np.where(dropout_adjustment[:, None] > 0, relevance + dropout_adjustment[:, None], relevance)
+
+        ranked = np.argsort(-np.where(available, relevance, -np.inf), axis=1, kind="stable")[:, :num_recommendations]
+        results = []
+        for student, columns in enumerate(ranked):
+            style = LEARNING_STYLES[learning_styles[student]]
+            results.append([
+                Recommendation(
+                    course_name=courses[column].course_name,
+                    reasoning=self._reasoning(
+                        style, float(content_match[student, column]), int(collab_count[student, column]),
+                        float(collab_score[student, column]), float(dropout_adjustment[student]),
+                        evidence if isinstance(evidence, str) else str(evidence[student, column])
+                    ),
+                    relevance_score=float(relevance[student, column])
+                )
+                for column in columns if available[student, column]
+            ])
+        return results
+
+    @staticmethod
+    def _reasoning(
+        learning_style: LearningStyle,
+        content_match: float,
+        collab_count: int,
+        collab_score: float,
+        dropout_adjustment: float,
+        evidence: str = "similar students"
+    ) -> str:
+        reasoning_parts = [f"Matches learning style ({learning_style.value}: {content_match:.2f})"]
+        if collab_count > 0:
+            reasoning_parts.append(f"Popular among {collab_count} {evidence} (avg success: {collab_score:.2f})")
+        if dropout_adjustment > 0:
+            reasoning_parts.append(f"Adjusted for high dropout risk (+{dropout_adjustment:.2f})")
+        return ". ".join(reasoning_parts) + "."
@@ -1,16 +1,14 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 import math
-from ..core.models import StudentProfile, LearningStyle, Gender, EducationLevel, EngagementLevel
+import numpy as np
+from ..core.models import StudentProfile
+from ..ai.features import encode_profiles
 
 class CosineSimilarity:
     def calculate_profile_similarity(self, student1: StudentProfile, student2: StudentProfile) -> float:
         """Calculate cosine similarity between two student profiles."""
-        vector1 = self._vectorize_profile(student1)
-        vector2 = self._vectorize_profile(student2)
-        
-        if not vector1 or not vector2:
-            return 0.0
-        
+        vector1, vector2 = self.vectorize_profiles([student1, student2]).tolist()
+
         dot_product = sum(a * b for a, b in zip(vector1, vector2))
         magnitude1 = math.sqrt(sum(a * a for a in vector1))
         magnitude2 = math.sqrt(sum(b * b for b in vector2))
@@ -20,66 +18,475 @@ class CosineSimilarity:
         
         return dot_product / (magnitude1 * magnitude2)
 
-    def _vectorize_profile(self, profile: StudentProfile) -> List[float]:
+    def vectorize_profiles(self, profiles: List[StudentProfile]) -> np.ndarray:
+        """Similarity feature vectors for many profiles, one row each (see ``ai.features``)."""
+        return encode_profiles(list(profiles))[1]
+
+    def _vectorize_profile(self, profile: StudentProfile) -> np.ndarray:
         """Convert a student profile into a numerical vector for similarity calculation."""
-        vector = []
-
-        # 1. Learning Style (one-hot encoding)
-        learning_style_vector = [
-            1.0 if profile.learning_style == LearningStyle.VISUAL else 0.0,
-            1.0 if profile.learning_style == LearningStyle.AUDITORY else 0.0,
-            1.0 if profile.learning_style == LearningStyle.READING_WRITING else 0.0,
-            1.0 if profile.learning_style == LearningStyle.KINESTHETIC else 0.0
-        ]
-        vector.extend(learning_style_vector)
-
-        # 2. Demographics
-        vector.append(profile.age / 50.0)  # Normalize age (assuming max 50)
-        vector.append(1.0 if profile.gender == Gender.MALE else 0.5 if profile.gender == Gender.FEMALE else 0.0)
-        vector.append(1.0 if profile.education_level == EducationLevel.POSTGRADUATE else 
-                     0.5 if profile.education_level == EducationLevel.UNDERGRADUATE else 0.0)
-
-        # 3. Engagement Level (ordinal encoding)
-        engagement_value = (1.0 if profile.engagement_level == EngagementLevel.HIGH else 
-                           0.5 if profile.engagement_level == EngagementLevel.MEDIUM else 0.0)
-        vector.append(engagement_value)
-
-        # 4. Engagement Metrics (averaged across courses)
-        avg_metrics = self._average_engagement_metrics(profile.engagement_metrics)
-        vector.append(avg_metrics.get("time_spent_on_videos", 0.0) / 500.0)  # Normalize (max ~500)
-        vector.append(avg_metrics.get("quiz_scores", 0.0) / 100.0)           # Normalize (0-100)
-        vector.append(avg_metrics.get("forum_participation", 0.0) / 50.0)   # Normalize (max ~50)
-        vector.append(avg_metrics.get("assignment_completion_rate", 0.0) / 100.0)  # Normalize (0-100)
-
-        # 5. Performance Metrics (averaged across courses)
-        avg_quiz_attempts = sum(profile.quiz_attempts.values()) / max(1, len(profile.quiz_attempts)) / 4.0  # Normalize (max 4)
-        avg_final_exam = sum(profile.final_exam_scores.values()) / max(1, len(profile.final_exam_scores)) / 100.0  # Normalize (0-100)
-        avg_feedback = sum(profile.feedback_scores.values()) / max(1, len(profile.feedback_scores)) / 5.0  # Normalize (1-5)
-        vector.extend([avg_quiz_attempts, avg_final_exam, avg_feedback])
-
-        # 6. Dropout Likelihood
-        vector.append(1.0 if profile.dropout_likelihood else 0.0)
-
-        return vector
-
-    def _average_engagement_metrics(self, metrics: Dict[str, Dict[str, float]]) -> Dict[str, float]:
-        """Calculate average engagement metrics across all courses."""
-        if not metrics:
-            return {"time_spent_on_videos": 0.0, "quiz_scores": 0.0, "forum_participation": 0.0, "assignment_completion_rate": 0.0}
-
-        avg_metrics = {
-            "time_spent_on_videos": 0.0,
-            "quiz_scores": 0.0,
-            "forum_participation": 0.0,
-            "assignment_completion_rate": 0.0
-        }
-        n = len(metrics)
-        
-        for course_metrics in metrics.values():
-            for key in avg_metrics:
-                avg_metrics[key] += course_metrics.get(key, 0.0)
-        
-        for key in avg_metrics:
-            avg_metrics[key] /= n
-        
-        return avg_metrics
\ No newline at end of file
+        return self.vectorize_profiles([profile])[0]
+
+class SimilarityIndex:
+    """Prenormalized feature matrix for top-k cosine neighbor search.
+
+    Rows are kept in the order students were first added, so ties are broken
+    the same way as a stable sort over ``RecommendationService.students``.
+    Changed profiles are only marked dirty; their rows are re-vectorized on
+    the next ``refresh``.
+    """
+
+    # Scores within this distance of the k-th best are recomputed exactly
+    SCORE_TOLERANCE = 1e-9
+    # Gathering a row before its product costs about this many rows of a full matrix product
+    GATHER_RATIO = 5
+
+    def __init__(self, vectorizer: Optional[CosineSimilarity] = None, initial_capacity: int = 1024):
+        self.vectorizer = vectorizer or CosineSimilarity()
+        self.ids: List[str] = []
+        self._rows: Optional[Dict[str, int]] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._capacity = initial_capacity
+        self._dirty: Dict[str, None] = {}  # insertion-ordered set
+        # Bumped whenever neighbor lists may change beyond the rows that were updated
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def rows(self) -> Dict[str, int]:
+        """Student ID to matrix row."""
+        if self._rows is None:
+            self._rows = dict(zip(self.ids, range(len(self.ids))))
+        return self._rows
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Unit-length feature vectors, one row per indexed student."""
+        if self._matrix is None:
+            return np.zeros((0, 0))
+        return self._matrix[:len(self.ids)]
+
+    def mark_dirty(self, student_id: str) -> None:
+        self._dirty[student_id] = None
+
+    def warm_up(self) -> None:
+        """Build the structures that are otherwise created on the first query."""
+        self.rows
+
+    def refresh(self, students: Dict[str, StudentProfile]) -> None:
+        """Re-vectorize every profile marked dirty since the last refresh."""
+        if not self._dirty:
+            return
+        student_ids = [student_id for student_id in self._dirty if student_id in students]
+        self._dirty.clear()
+        vectors = self.vectorizer.vectorize_profiles([students[student_id] for student_id in student_ids])
+        self.add_vectors(student_ids, vectors)
+
+    def load_matrix(self, student_ids: List[str], matrix: np.ndarray) -> None:
+        """Adopt an already normalized matrix (e.g. memory-mapped) as the index."""
+        self.ids = list(student_ids)
+        self._rows = None  # built on first lookup
+        self._matrix = matrix
+        self._dirty.clear()
+        self.generation += 1
+        self._on_rows_changed(np.arange(len(self.ids)))
+
+    def add_vectors(self, student_ids: List[str], vectors: np.ndarray) -> None:
+        """Insert or overwrite raw feature vectors in bulk, bypassing profiles.
+
+        ``student_ids`` must not repeat; new IDs are appended in the given order.
+        """
+        vectors = np.array(vectors, dtype=np.float64, ndmin=2)
+        norms = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+        nonzero = norms > 0
+        vectors[nonzero] /= norms[nonzero, None]
+        rows = self.rows
+        changed = np.fromiter((rows.get(student_id, -1) for student_id in student_ids), dtype=np.intp, count=len(student_ids))
+        new = np.flatnonzero(changed < 0)
+        if len(new):
+            start = len(self.ids)
+            changed[new] = np.arange(start, start + len(new))
+            self._ensure_capacity(start + len(new), vectors.shape[1])
+            new_ids = [student_ids[i] for i in new]
+            self.ids.extend(new_ids)
+            rows.update(zip(new_ids, range(start, start + len(new))))
+        if len(changed):
+            self._matrix[changed] = vectors
+        self._on_rows_changed(changed)
+
+    def rebuild(self, students: Dict[str, StudentProfile]) -> None:
+        """Drop the current matrix and vectorize all students from scratch."""
+        self.ids = []
+        self._rows = {}
+        self._matrix = None
+        self._dirty = dict.fromkeys(students)
+        self.generation += 1
+        self.refresh(students)
+
+    def top_k(self, student_id: str, k: int = 5) -> List[Tuple[str, float]]:
+        """Return the ``k`` most similar students as ``(student_id, score)`` pairs."""
+        row = self.rows.get(student_id)
+        if row is None or k <= 0:
+            return []
+        matrix = self.matrix
+        scores = matrix @ matrix[row]
+        scores[row] = -np.inf
+        candidates, exact = self._rescore(matrix, matrix[row], scores, min(k, len(self.ids) - 1))
+        order = self._top_k_rows(exact, min(k, len(self.ids) - 1))
+        return [(self.ids[candidates[i]], float(exact[i])) for i in order]
+
+    def top_k_batch(self, student_ids: List[str], k: int = 5) -> List[Optional[List[Tuple[str, float]]]]:
+        """``top_k`` for many students at once, one matrix product per chunk of queries.
+
+        Results match ``top_k`` exactly; unknown students get ``None``.
+        """
+        results: List[Optional[List[Tuple[str, float]]]] = [None] * len(student_ids)
+        query_rows = np.fromiter((self.rows.get(student_id, -1) for student_id in student_ids), dtype=np.intp, count=len(student_ids))
+        known = np.flatnonzero(query_rows >= 0)
+        k = min(k, len(self.ids) - 1)
+        if k <= 0:
+            for position in known:
+                results[position] = []
+            return results
+        matrix = self.matrix
+        chunk_size = max(1, (1 << 22) // len(matrix))
+        for start in range(0, len(known), chunk_size):
+            positions = known[start:start + chunk_size]
+            neighbors, scores = self._top_k_rows_batch(matrix, query_rows[positions], k)
+            for position, neighbor_rows, neighbor_scores in zip(positions, neighbors, scores):
+                results[position] = [(self.ids[i], float(score)) for i, score in zip(neighbor_rows, neighbor_scores)]
+        return results
+
+    def top_k_among(
+        self, query_rows: np.ndarray, row_lists: List[np.ndarray], k: int = 5, searched: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """The ``k`` most similar students within each of several groups of matrix rows.
+
+        ``row_lists`` holds sorted matrix rows per group and ``searched`` a
+        ``(len(query_rows), len(row_lists))`` mask of the groups to search
+        for each query (all by default); a searched group must not contain
+        the query row. Each group is scored exactly, with one matrix
+        product per group and chunk of queries. A single query scores only
+        the rows of its searched groups, or the whole matrix at once when
+        they hold more than ``1 / GATHER_RATIO`` of it.
+        Returns neighbor rows and scores, shape ``(queries, k, groups)``,
+        ordered like ``top_k`` and padded with -1 and NaN where a group has
+        fewer than ``k`` rows or is not searched. A query gets the same
+        neighbors alone or in a batch.
+        """
+        query_rows = np.asarray(query_rows, dtype=np.intp)
+        neighbors = np.full((len(query_rows), k, len(row_lists)), -1, dtype=np.intp)
+        scores = np.full(neighbors.shape, np.nan)
+        if searched is None:
+            searched = np.ones((len(query_rows), len(row_lists)), dtype=bool)
+        matrix = self.matrix
+        if len(query_rows) == 1:
+            query = matrix[query_rows[0]]
+            groups = np.flatnonzero(searched[0])
+            gathered = sum(len(row_lists[group]) for group in groups) * self.GATHER_RATIO < len(matrix)
+            products = None if gathered else matrix @ query
+            for group in groups:
+                rows = row_lists[group]
+                count = min(k, len(rows))
+                group_products = matrix[rows] @ query if gathered else products[rows]
+                candidates, exact = self._rescore(matrix, query, group_products, count, rows)
+                order = self._top_k_rows(exact, count)
+                neighbors[0, :count, group] = rows[candidates[order]]
+                scores[0, :count, group] = exact[order]
+            return neighbors, scores
+        for group, rows in enumerate(row_lists):
+            count = min(k, len(rows))
+            queries = np.flatnonzero(searched[:, group])
+            if count <= 0 or not len(queries):
+                continue
+            block = matrix[rows]
+            chunk_size = max(1, (1 << 22) // len(rows))
+            for start in range(0, len(queries), chunk_size):
+                positions = queries[start:start + chunk_size]
+                columns, exact = self._top_k_columns(block, matrix[query_rows[positions]], count)
+                neighbors[positions, :count, group] = rows[columns]
+                scores[positions, :count, group] = exact
+        return neighbors, scores
+
+    @classmethod
+    def _top_k_rows_batch(cls, matrix: np.ndarray, query_rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Neighbor rows and exact scores, shape ``(len(query_rows), k)``, ordered like ``top_k``."""
+        return cls._top_k_columns(matrix, matrix[query_rows], k, query_rows)
+
+    @classmethod
+    def _top_k_columns(
+        cls, matrix: np.ndarray, queries: np.ndarray, k: int, excluded: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows of ``matrix`` most similar to each of ``queries``, with exact scores, shape ``(len(queries), k)``.
+
+        ``excluded`` holds one row per query that is skipped (the query itself).
+        """
+        scores = queries @ matrix.T
+        if excluded is None:
+            excluded = np.full(len(queries), -1, dtype=np.intp)
+        else:
+            scores[np.arange(len(queries)), excluded] = -np.inf
+        query, candidate = cls._candidates_batch(scores, excluded, k)
+        exact = cls._dot_rows(matrix[candidate], queries[query])
+        order = np.lexsort((candidate, -exact, query))
+        query, candidate, exact = query[order], candidate[order], exact[order]
+        rank = np.arange(len(query)) - np.searchsorted(query, query)
+        keep = rank < k
+        return candidate[keep].reshape(-1, k), exact[keep].reshape(-1, k)
+
+    @classmethod
+    def _candidates_batch(cls, scores: np.ndarray, query_rows: np.ndarray, k: int, block: int = 64) -> Tuple[np.ndarray, np.ndarray]:
+        """``(query, row)`` pairs that may be in each query's top ``k``, grouped by query.
+
+        Block maxima are disjoint elements, so the k-th largest of them is a
+        lower bound on the k-th best score; only blocks reaching that bound
+        are scanned element by element.
+        """
+        n = scores.shape[1]
+        maxima = np.maximum.reduceat(scores, np.arange(0, n, block), axis=1)
+        if maxima.shape[1] >= k:
+            bound = np.partition(maxima, maxima.shape[1] - k, axis=1)[:, maxima.shape[1] - k] - cls.SCORE_TOLERANCE
+        else:
+            bound = np.full(len(scores), -np.inf)
+        query, hot = np.nonzero(maxima >= bound[:, None])
+        columns = hot[:, None] * block + np.arange(block)
+        inside = columns < n
+        columns = np.minimum(columns, n - 1)
+        keep = inside & (scores[query[:, None], columns] >= bound[query, None]) & (columns != query_rows[query, None])
+        return np.broadcast_to(query[:, None], columns.shape)[keep], columns[keep]
+
+    @classmethod
+    def _rescore(
+        cls, matrix: np.ndarray, query: np.ndarray, scores: np.ndarray, k: int, rows: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions that may be in the top ``k`` of ``scores``, with their exact scores.
+
+        ``scores[i]`` belongs to matrix row ``rows[i]``, or row ``i`` without ``rows``.
+
+        BLAS rounds the same dot product differently depending on the shape of
+        the call, so scores are recomputed in a fixed order for the few rows
+        near the cut-off; single and batched queries then agree bit for bit.
+        """
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= kth - cls.SCORE_TOLERANCE)
+        return candidates, cls._dot_rows(matrix[candidates if rows is None else rows[candidates]], query)
+
+    @staticmethod
+    def _dot_rows(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        return (left * right).sum(axis=1)
+
+    @staticmethod
+    def _top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the ``k`` highest scores, ties broken by lowest row."""
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        if k < len(scores):
+            kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+            candidates = np.flatnonzero(scores >= kth)
+        else:
+            candidates = np.arange(len(scores))
+        order = np.lexsort((candidates, -scores[candidates]))
+        return candidates[order[:k]]
+
+    def _on_rows_changed(self, rows: np.ndarray) -> None:
+        """Hook for subclasses that maintain structures on top of the matrix."""
+
+    def _ensure_capacity(self, size: int, dim: int) -> None:
+        if self._matrix is None:
+            self._matrix = np.zeros((max(self._capacity, size), dim))
+        elif size > len(self._matrix):
+            grown = np.zeros((max(size, 2 * len(self._matrix)), dim))
+            grown[:len(self._matrix)] = self._matrix
+            self._matrix = grown
+
+
+class IVFSimilarityIndex(SimilarityIndex):
+    """Approximate top-k search over an inverted file of k-means clusters.
+
+    Students are bucketed by their nearest centroid; a query scores the
+    ``n_probe`` closest buckets exactly and ignores the rest. More lists make
+    buckets smaller (faster, lower recall); more probes trade speed back for
+    recall. Centroids are retrained whenever the index has doubled in size
+    since the last training.
+    """
+
+    def __init__(
+        self,
+        vectorizer: Optional[CosineSimilarity] = None,
+        n_lists: Optional[int] = None,
+        n_probe: int = 8,
+        training_iterations: int = 10,
+        seed: int = 42,
+        initial_capacity: int = 1024
+    ):
+        super().__init__(vectorizer, initial_capacity)
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.training_iterations = training_iterations
+        self.seed = seed
+        self._reset_clusters()
+
+    def _reset_clusters(self) -> None:
+        self.centroids: Optional[np.ndarray] = None
+        self._trained_size = 0
+        self._assignments = np.zeros(0, dtype=np.intp)
+        self._lists: Optional[List[np.ndarray]] = None  # rows in each list, ascending
+
+    def rebuild(self, students: Dict[str, StudentProfile]) -> None:
+        self._reset_clusters()
+        super().rebuild(students)
+
+    def load_matrix(self, student_ids: List[str], matrix: np.ndarray) -> None:
+        self._reset_clusters()
+        super().load_matrix(student_ids, matrix)
+
+    def top_k(self, student_id: str, k: int = 5) -> List[Tuple[str, float]]:
+        row = self.rows.get(student_id)
+        if row is None or k <= 0:
+            return []
+        if self.centroids is None:
+            return super().top_k(student_id, k)
+        matrix = self.matrix
+        query = matrix[row]
+        candidates = self._probe(query, self.n_probe)
+        candidates = candidates[candidates != row]
+        if len(candidates) < k:
+            return super().top_k(student_id, k)
+        scores = matrix[candidates] @ query
+        within, exact = self._rescore(matrix[candidates], query, scores, k)
+        order = self._top_k_rows(exact, k)
+        return [(self.ids[candidates[within[i]]], float(exact[i])) for i in order]
+
+    def top_k_among(
+        self, query_rows: np.ndarray, row_lists: List[np.ndarray], k: int = 5, searched: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Like ``SimilarityIndex.top_k_among``, within the ``n_probe`` lists closest to each query.
+
+        Each group is searched among its rows in those lists only, or
+        exactly when fewer than ``k`` of its rows are in them.
+        """
+        if self.centroids is None:
+            return super().top_k_among(query_rows, row_lists, k, searched)
+        query_rows = np.asarray(query_rows, dtype=np.intp)
+        neighbors = np.full((len(query_rows), k, len(row_lists)), -1, dtype=np.intp)
+        scores = np.full(neighbors.shape, np.nan)
+        if searched is None:
+            searched = np.ones((len(query_rows), len(row_lists)), dtype=bool)
+        matrix = self.matrix
+        probed = np.zeros(len(matrix), dtype=bool)
+        for position, row in enumerate(query_rows):
+            query = matrix[row]
+            probes = self._probe(query, self.n_probe)
+            probed[probes] = True
+            exhaustive = np.zeros((1, len(row_lists)), dtype=bool)
+            for group in np.flatnonzero(searched[position]):
+                rows = row_lists[group]
+                candidates = rows[probed[rows]]
+                count = min(k, len(rows))
+                if len(candidates) < count:
+                    exhaustive[0, group] = True
+                    continue
+                within, exact = self._rescore(matrix, query, matrix[candidates] @ query, count, candidates)
+                order = self._top_k_rows(exact, count)
+                neighbors[position, :count, group] = candidates[within[order]]
+                scores[position, :count, group] = exact[order]
+            probed[probes] = False
+            if exhaustive.any():
+                found, exact = super().top_k_among(query_rows[position:position + 1], row_lists, k, exhaustive)
+                groups = np.flatnonzero(exhaustive[0])
+                neighbors[position][:, groups] = found[0][:, groups]
+                scores[position][:, groups] = exact[0][:, groups]
+        return neighbors, scores
+
+    def warm_up(self) -> None:
+        super().warm_up()
+        if self.centroids is not None and self._lists is None:
+            self._build_lists()
+
+    def top_k_batch(self, student_ids: List[str], k: int = 5) -> List[Optional[List[Tuple[str, float]]]]:
+        # Each query probes its own lists, so there is no shared matrix product
+        return [self.top_k(student_id, k) if student_id in self.rows else None for student_id in student_ids]
+
+    def _probe(self, query: np.ndarray, n_probe: int) -> np.ndarray:
+        """Rows in the ``n_probe`` lists closest to ``query``, in row order."""
+        if self._lists is None:
+            self._build_lists()
+        centroid_scores = self.centroids @ query
+        n_probe = min(n_probe, len(self.centroids))
+        probes = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        lists = self._lists
+        candidates = np.concatenate([lists[probe] for probe in probes])
+        candidates.sort()
+        return candidates
+
+    def _on_rows_changed(self, rows: np.ndarray) -> None:
+        size = len(self.ids)
+        if self.centroids is None or size >= 2 * self._trained_size:
+            self._train()
+            return
+        if len(self._assignments) < size:
+            grown = np.full(max(size, 2 * len(self._assignments)), -1, dtype=np.intp)  # -1: not in a list yet
+            grown[:len(self._assignments)] = self._assignments
+            self._assignments = grown
+        if len(rows):
+            old = self._assignments[rows]
+            new = self._assign(self.matrix[rows])
+            self._assignments[rows] = new
+            if self._lists is not None:
+                moved = old != new
+                self._move_rows(rows[moved], old[moved], new[moved])
+
+    def _train(self) -> None:
+        """Spherical k-means on a sample of rows, then assign every row."""
+        matrix = self.matrix
+        size = len(matrix)
+        n_lists = self.n_lists or max(1, int(np.sqrt(size)))
+        n_lists = min(n_lists, size)
+        if n_lists == 0:
+            return
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(size, 256 * n_lists)
+        sample = matrix[rng.choice(size, sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+        for _ in range(self.training_iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1)
+            empty = norms == 0
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            norms[empty] = 1.0
+            centroids = sums / norms[:, None]
+        self.centroids = centroids
+        self._trained_size = size
+        self.generation += 1
+        self._assignments = self._assign(matrix)
+        self._lists = None
+
+    def _assign(self, vectors: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        labels = np.empty(len(vectors), dtype=np.intp)
+        for start in range(0, len(vectors), chunk_size):
+            chunk = vectors[start:start + chunk_size]
+            labels[start:start + chunk_size] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return labels
+
+    def _build_lists(self) -> None:
+        assignments = self._assignments[:len(self.ids)]
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=len(self.centroids))
+        self._lists = np.split(order, np.cumsum(counts)[:-1])
+
+    def _move_rows(self, rows: np.ndarray, old: np.ndarray, new: np.ndarray) -> None:
+        """Move ``rows`` from lists ``old`` (-1 for rows not listed yet) to lists ``new``.
+
+        Only the lists involved are copied; each stays in ascending row order.
+        """
+        lists = self._lists
+        for bucket in np.unique(old[old >= 0]):
+            rows_out = rows[old == bucket]
+            lists[bucket] = lists[bucket][~np.isin(lists[bucket], rows_out)]
+        for bucket in np.unique(new):
+            lists[bucket] = np.union1d(lists[bucket], rows[new == bucket])
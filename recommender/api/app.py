@@ -1,15 +1,53 @@
-from flask import Flask, request
+import json
+import os
+from flask import Flask, Response, g, request, stream_with_context
 from flask_restx import Api, Resource, fields
 from recommender.data.manager import DataManager
+from recommender.core.metrics import registry as metrics
+from recommender.api.profiling import RequestProfiler
+from recommender.ai.classifier import ModelNotTrainedError
+from config.settings import Config
 from pathlib import Path
 
 # Initialize Flask app
 app = Flask(__name__)
 
 # Define dataset path
-DATASET_PATH = "/Users/mac/Desktop/Adaptative-courses/personalized_learning_dataset.csv"
+DATASET_PATH = os.environ.get("DATASET_PATH", "/Users/mac/Desktop/Adaptative-courses/personalized_learning_dataset.csv")
 data_manager = DataManager(DATASET_PATH)
 data_manager.initialize()
+profiler = RequestProfiler.from_config(Config)
+
+@app.before_request
+def start_profiling():
+    if request.args.get('profile') == '1' or request.headers.get('X-Profile') == '1':
+        if profiler.acquire():
+            g.profile = profiler.start()
+        elif profiler.enabled:
+            g.profile_skipped = True
+
+@app.after_request
+def finish_profiling(response):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        label = f"{request.method} {request.full_path}"
+        if response.is_streamed:
+            # The body is generated after this hook returns: keep profiling
+            # until the server closes the response
+            profile_id = profiler.new_id()
+            response.call_on_close(lambda: profiler.finish(profile, label, profile_id))
+            response.headers['X-Profile-Id'] = profile_id
+        else:
+            response.headers['X-Profile-Id'] = profiler.finish(profile, label)
+    elif g.pop('profile_skipped', False):
+        response.headers['X-Profile-Skipped'] = 'rate-limited'
+    return response
+
+@app.teardown_request
+def stop_profiling(error=None):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profile.disable()
 
 # Initialize Flask-RESTX API with Swagger configuration
 api = Api(
@@ -47,6 +85,45 @@ recommendations_response = api.model('RecommendationsResponse', {
     'recommendations': fields.List(fields.Nested(recommendation_model), description='List of recommended courses')
 })
 
+batch_request_model = api.model('RecommendationsBatchRequest', {
+    'student_ids': fields.List(fields.String, required=True, example=['S00027', 'S00028'], description='Students to recommend courses for'),
+    'num': fields.Integer(example=3, default=3, description='Number of recommendations per student')
+})
+
+batch_result_model = api.inherit('RecommendationsBatchResult', recommendations_response, {
+    'error': fields.String(example='Student S99999 not found', description='Set instead of recommendations for unknown students')
+})
+
+batch_response = api.model('RecommendationsBatchResponse', {
+    'results': fields.List(fields.Nested(batch_result_model), description='One entry per requested student, in request order')
+})
+
+event_model = api.model('Event', {
+    'student_id': fields.String(required=True, example='S00027', description='Student the event belongs to'),
+    'course_name': fields.String(required=True, example='Python Basics', description='Course the event belongs to'),
+    'quiz_scores': fields.Float(example=82.0, description='New quiz score (0-100)'),
+    'quiz_attempts': fields.Integer(example=3, description='New number of quiz attempts'),
+    'final_exam_score': fields.Float(example=74.0, description='New final exam score (0-100)'),
+    'time_spent_on_videos': fields.Float(example=240.0, description='New time spent on videos'),
+    'forum_participation': fields.Float(example=12.0, description='New forum participation count'),
+    'assignment_completion_rate': fields.Float(example=90.0, description='New assignment completion rate (%)'),
+    'feedback_score': fields.Integer(example=4, description='New feedback score (1-5)'),
+    'engagement_level': fields.String(example='High', enum=['Low', 'Medium', 'High'], description='New engagement level'),
+    'age': fields.Integer(example=30, description='Required for a new student'),
+    'gender': fields.String(example='Male', description='Required for a new student'),
+    'education_level': fields.String(example='Undergraduate', description='Required for a new student'),
+    'learning_style': fields.String(example='Visual', description='Required for a new student')
+})
+
+events_request_model = api.model('EventsRequest', {
+    'events': fields.List(fields.Nested(event_model), required=True, description='Events to apply, in order')
+})
+
+events_response = api.model('EventsResponse', {
+    'applied': fields.Integer(example=1, description='Number of events applied'),
+    'student_ids': fields.List(fields.String, example=['S00027'], description='Students whose data changed')
+})
+
 course_model = api.model('Course', {
     'course_name': fields.String(example='Python Basics', description='Name of the course'),
     'average_completion_rate': fields.Float(example=85.5, description='Average assignment completion rate (%)'),
@@ -63,6 +140,36 @@ health_model = api.model('Health', {
     'message': fields.String(example='API is running', description='Health check message')
 })
 
+students_page_model = api.model('StudentsPage', {
+    'students': fields.List(fields.Nested(student_model), description='Students on this page, in load order'),
+    'next_cursor': fields.String(example='cm93Ojk5', description='Pass as ?cursor= for the next page; null after the last page')
+})
+
+course_activity_model = api.model('CourseActivity', {
+    'course_name': fields.String(required=True, example='Python Basics', description='Course name'),
+    'quiz_scores': fields.Float(example=82.0, description='Quiz score (0-100)'),
+    'quiz_attempts': fields.Integer(example=2, description='Number of quiz attempts'),
+    'final_exam_score': fields.Float(example=74.0, description='Final exam score (0-100)'),
+    'time_spent_on_videos': fields.Float(example=240.0, description='Time spent on videos'),
+    'forum_participation': fields.Float(example=12.0, description='Forum participation count'),
+    'assignment_completion_rate': fields.Float(example=90.0, description='Assignment completion rate (%)'),
+    'feedback_score': fields.Integer(example=4, description='Feedback score (1-5)')
+})
+
+dropout_profile_model = api.model('DropoutProfile', {
+    'age': fields.Integer(required=True, example=22, description='Student age'),
+    'gender': fields.String(required=True, example='Female', enum=['Male', 'Female', 'Other'], description='Student gender'),
+    'education_level': fields.String(required=True, example='Undergraduate', description='Education level'),
+    'learning_style': fields.String(required=True, example='Visual', description='Preferred learning style'),
+    'engagement_level': fields.String(required=True, example='Medium', enum=['Low', 'Medium', 'High'], description='Engagement level'),
+    'courses': fields.List(fields.Nested(course_activity_model), description='Course activity so far; fields left out count as 0')
+})
+
+dropout_score_model = api.model('DropoutScore', {
+    'dropout_score': fields.Float(example=0.73, description='Predicted dropout probability (0-1, rounded to 4 decimals)'),
+    'batch_size': fields.Integer(example=12, description='Profiles scored in the same micro-batch as this request')
+})
+
 analysis_model = api.model('Analysis', {
     'avg_dropout_risk': fields.Float(example=0.1976, description='Average predicted dropout risk across all students (0-1)'),
     'course_statistics': fields.Raw(example={'Python Basics': {'avg_quiz_score': 75.2, 'avg_completion_rate': 85.5}}, description='Statistics per course (quiz scores, completion rates, etc.)'),
@@ -75,7 +182,65 @@ error_model = api.model('Error', {
     'error': fields.String(example='Student S00027 not found', description='Error message')
 })
 
+def serialize_recommendations(recommendations):
+    with metrics.stage('serialization'):
+        return [
+            {
+                "course_name": rec.course_name,
+                "relevance_score": round(rec.relevance_score, 2),
+                "reasoning": rec.reasoning
+            }
+            for rec in recommendations
+        ]
+
+ROSTER_FILTER_PARAMS = ('course', 'learning_style', 'risk_band')
+MAX_PAGE_SIZE = 1000
+
+def roster_filters():
+    return {name: request.args[name] for name in ROSTER_FILTER_PARAMS if request.args.get(name)}
+
 # Endpoint definitions with Swagger documentation
+@ns.route('/students')
+class StudentsResource(Resource):
+    @ns.doc(description='List students a page at a time, optionally filtered. Filters are answered from '
+                        'per-course, per-learning-style and per-risk-band indexes.')
+    @ns.param('limit', f'Students per page (default: 100, max: {MAX_PAGE_SIZE})', type=int, default=100, required=False)
+    @ns.param('cursor', 'next_cursor from the previous page', required=False)
+    @ns.param('course', 'Only students enrolled in this course', required=False)
+    @ns.param('learning_style', 'Only students with this learning style', required=False)
+    @ns.param('risk_band', 'Only students in this dropout risk band (0-0.25, 0.25-0.5, 0.5-0.75, 0.75-1.0)', required=False)
+    @ns.response(200, 'Success', students_page_model)
+    @ns.response(400, 'Invalid request', error_model)
+    def get(self):
+        """List students with cursor pagination"""
+        limit = request.args.get('limit', default=100, type=int)
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            return {'error': f"'limit' must be between 1 and {MAX_PAGE_SIZE}"}, 400
+        try:
+            students, next_cursor = data_manager.list_students(limit, request.args.get('cursor'), roster_filters())
+        except ValueError as error:
+            return {'error': str(error)}, 400
+        return {"students": students, "next_cursor": next_cursor}, 200
+
+@ns.route('/students/export')
+class StudentsExportResource(Resource):
+    @ns.doc(description='Stream every matching student as NDJSON, one profile per line, with the filters of '
+                        'GET /api/students. Memory use does not depend on the number of students.')
+    @ns.param('course', 'Only students enrolled in this course', required=False)
+    @ns.param('learning_style', 'Only students with this learning style', required=False)
+    @ns.param('risk_band', 'Only students in this dropout risk band', required=False)
+    @ns.produces(['application/x-ndjson'])
+    @ns.response(200, 'Success')
+    @ns.response(400, 'Invalid request', error_model)
+    def get(self):
+        """Export students as NDJSON"""
+        try:
+            students = data_manager.export_students(roster_filters())
+        except ValueError as error:
+            return {'error': str(error)}, 400
+        lines = (json.dumps(student) + "\n" for student in students)
+        return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
 @ns.route('/students/<string:student_id>')
 class StudentResource(Resource):
     @ns.doc(description='Retrieve a student profile by ID.')
@@ -83,20 +248,9 @@ class StudentResource(Resource):
     @ns.response(404, 'Student not found', error_model)
     def get(self, student_id):
         """Get student profile details"""
-        student = data_manager.get_student_profile(student_id)
-        if not student:
+        student_data = data_manager.get_student_data(student_id)
+        if student_data is None:
             return {'error': f"Student {student_id} not found"}, 404
-        student_data = {
-            "student_id": student.student_id,
-            "age": student.age,
-            "gender": student.gender.value,
-            "education_level": student.education_level.value,
-            "learning_style": student.learning_style.value,
-            "course_history": student.course_history,
-            "engagement_level": student.engagement_level.value,
-            "dropout_likelihood": student.dropout_likelihood,
-            "predicted_dropout_score": round(student.predicted_dropout_score, 4) if student.predicted_dropout_score is not None else None
-        }
         return student_data, 200
 
 @ns.route('/recommendations/<string:student_id>')
@@ -109,17 +263,83 @@ class RecommendationsResource(Resource):
         """Get personalized course recommendations"""
         num_recommendations = request.args.get('num', default=3, type=int)
         recommendations = data_manager.get_recommendations(student_id, num_recommendations)
-        if not recommendations and not data_manager.get_student_profile(student_id):
+        if recommendations is None:
             return {'error': f"Student {student_id} not found"}, 404
-        recommendations_data = [
-            {
-                "course_name": rec.course_name,
-                "relevance_score": round(rec.relevance_score, 2),
-                "reasoning": rec.reasoning
-            }
-            for rec in recommendations
-        ]
-        return {"student_id": student_id, "recommendations": recommendations_data}, 200
+        return {"student_id": student_id, "recommendations": serialize_recommendations(recommendations)}, 200
+
+@ns.route('/recommendations/batch')
+class RecommendationsBatchResource(Resource):
+    @ns.doc(description='Get course recommendations for many students in one request. '
+                        'Batches larger than Config.BATCH_STREAM_THRESHOLD (or requested with '
+                        '"Accept: application/x-ndjson") are streamed as one JSON object per line.')
+    @ns.expect(batch_request_model)
+    @ns.response(200, 'Success', batch_response)
+    @ns.response(400, 'Invalid request', error_model)
+    def post(self):
+        """Get personalized course recommendations for a batch of students"""
+        payload = request.get_json(silent=True) or {}
+        student_ids = payload.get('student_ids')
+        num_recommendations = payload.get('num', 3)
+        if not isinstance(student_ids, list) or not all(isinstance(student_id, str) for student_id in student_ids):
+            return {'error': "'student_ids' must be a list of strings"}, 400
+        if not isinstance(num_recommendations, int) or num_recommendations < 0:
+            return {'error': "'num' must be a non-negative integer"}, 400
+
+        results = (
+            {"student_id": student_id, "recommendations": serialize_recommendations(recommendations)}
+            if recommendations is not None else
+            {"student_id": student_id, "error": f"Student {student_id} not found"}
+            for student_id, recommendations in data_manager.get_recommendations_batch(student_ids, num_recommendations)
+        )
+        if len(student_ids) > Config.BATCH_STREAM_THRESHOLD or request.accept_mimetypes.best == 'application/x-ndjson':
+            lines = (json.dumps(result) + "\n" for result in results)
+            return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+        return {"results": list(results)}, 200
+
+@ns.route('/events')
+class EventsResource(Resource):
+    @ns.doc(description='Apply quiz, exam and engagement events in place. Fields an event leaves out keep '
+                        'their current value. Accepts {"events": [...]} or a single event object.')
+    @ns.expect(events_request_model)
+    @ns.response(200, 'Events applied', events_response)
+    @ns.response(400, 'Invalid request', error_model)
+    def post(self):
+        """Ingest new student activity without reloading the dataset"""
+        payload = request.get_json(silent=True)
+        events = payload['events'] if isinstance(payload, dict) and 'events' in payload else [payload]
+        if not isinstance(events, list) or not all(isinstance(event, dict) for event in events):
+            return {'error': "'events' must be a list of objects"}, 400
+        try:
+            student_ids = data_manager.apply_events(events)
+        except ValueError as error:
+            return {'error': str(error)}, 400
+        return {"applied": len(events), "student_ids": student_ids}, 200
+
+@ns.route('/dropout-score')
+class DropoutScoreResource(Resource):
+    @ns.doc(description='Score profiles that are not in the dataset, e.g. at signup. Accepts one profile, or '
+                        '{"profiles": [...]} which returns {"results": [...], "batch_size": n}. Concurrent requests '
+                        'are scored together in micro-batches.')
+    @ns.expect(dropout_profile_model)
+    @ns.response(200, 'Success', dropout_score_model)
+    @ns.response(400, 'Invalid request', error_model)
+    @ns.response(503, 'Dropout model not trained yet', error_model)
+    def post(self):
+        """Predict the dropout probability of new students"""
+        payload = request.get_json(silent=True)
+        many = isinstance(payload, dict) and 'profiles' in payload
+        profiles = payload['profiles'] if many else [payload]
+        if not isinstance(profiles, list) or not profiles or not all(isinstance(profile, dict) for profile in profiles):
+            return {'error': "'profiles' must be a non-empty list of objects"}, 400
+        try:
+            scores, batch_size = data_manager.score_profiles(profiles)
+        except ModelNotTrainedError as error:
+            return {'error': str(error)}, 503
+        except ValueError as error:
+            return {'error': str(error)}, 400
+        if many:
+            return {"results": [{"dropout_score": round(score, 4)} for score in scores], "batch_size": batch_size}, 200
+        return {"dropout_score": round(scores[0], 4), "batch_size": batch_size}, 200
 
 @ns.route('/courses')
 class CoursesResource(Resource):
@@ -138,13 +358,46 @@ class HealthResource(Resource):
         """Health check endpoint"""
         return {"status": "healthy", "message": "API is running"}, 200
 
+@ns.route('/metrics')
+class MetricsResource(Resource):
+    @ns.doc(description='Per-stage latency histograms (load, vectorize, neighbor_search, scoring, serialization, '
+                        'model_inference), cache counters, student count and model version in the Prometheus text format.')
+    @ns.produces(['text/plain'])
+    @ns.response(200, 'Success')
+    def get(self):
+        """Prometheus metrics"""
+        return Response(data_manager.get_metrics(), mimetype='text/plain; version=0.0.4')
+
+@ns.route('/profiles/<string:profile_id>')
+class ProfileResource(Resource):
+    @ns.doc(description='Call-tree statistics of a request profiled with ?profile=1 or an X-Profile: 1 header, '
+                        'by the ID from its X-Profile-Id response header. Requires Config.PROFILING_ENABLED.')
+    @ns.produces(['text/plain'])
+    @ns.response(200, 'Success')
+    @ns.response(404, 'Profile not found', error_model)
+    def get(self, profile_id):
+        """Get a request profile"""
+        report = profiler.report(profile_id) if profiler.enabled else None
+        if report is None:
+            return {'error': f"Profile {profile_id} not found"}, 404
+        return Response(report, mimetype='text/plain')
+
 @ns.route('/analysis')
 class AnalysisResource(Resource):
-    @ns.doc(description='Get aggregated analysis data for dropout risk, engagement, and course performance.')
+    @ns.doc(description='Get aggregated analysis data for dropout risk, engagement, and course performance, '
+                        'optionally restricted to one learning style, education level and/or gender.')
+    @ns.param('learning_style', 'Only students with this learning style', enum=['Visual', 'Auditory', 'Reading/Writing', 'Kinesthetic'], required=False)
+    @ns.param('education_level', 'Only students with this education level', enum=['High School', 'Undergraduate', 'Postgraduate'], required=False)
+    @ns.param('gender', 'Only students of this gender', enum=['Male', 'Female', 'Other'], required=False)
     @ns.response(200, 'Success', analysis_model)
+    @ns.response(400, 'Invalid filter', error_model)
     def get(self):
         """Get analysis data for dashboard insights"""
-        analysis_data = data_manager.get_analysis_data()
+        filters = {name: request.args[name] for name in ('learning_style', 'education_level', 'gender') if name in request.args}
+        try:
+            analysis_data = data_manager.get_analysis_data(filters)
+        except ValueError as error:
+            return {'error': str(error)}, 400
         return analysis_data, 200
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+import cProfile
+import io
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+from typing import Callable, Optional
+from config.settings import Config
+
+PROFILE_ID_PATTERN = re.compile(r"^\d+-\d+$")
+
+
+class RequestProfiler:
+    """Runs individual requests under cProfile on demand.
+
+    A request asks for profiling with ``?profile=1`` or an ``X-Profile: 1``
+    header; it is honoured only when the profiler is enabled and at least
+    ``min_interval`` seconds have passed since the last profiled request in
+    this process, so the switch can stay on in production. Each profile is
+    written to ``output_dir`` as ``<id>.prof`` (loadable with ``pstats`` or
+    snakeviz) and ``<id>.txt`` (the top functions by cumulative time).
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        min_interval: float = 60.0,
+        output_dir: Optional[str] = None,
+        top: int = 40,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.enabled = enabled
+        self.min_interval = min_interval
+        self.output_dir = output_dir or os.path.join(tempfile.gettempdir(), "recommender-profiles")
+        self.top = top
+        self._clock = clock
+        self._last_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config=Config) -> "RequestProfiler":
+        return cls(
+            enabled=getattr(config, "PROFILING_ENABLED", False),
+            min_interval=getattr(config, "PROFILE_MIN_INTERVAL", 60.0),
+            output_dir=getattr(config, "PROFILE_DIR", None)
+        )
+
+    def acquire(self) -> bool:
+        """Claim the next profiling slot; False while rate-limited or disabled."""
+        if not self.enabled:
+            return False
+        with self._lock:
+            now = self._clock()
+            if self._last_started is not None and now - self._last_started < self.min_interval:
+                return False
+            self._last_started = now
+            return True
+
+    def start(self) -> cProfile.Profile:
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def new_id(self) -> str:
+        return f"{int(time.time() * 1000)}-{os.getpid()}"
+
+    def finish(self, profile: cProfile.Profile, label: str, profile_id: Optional[str] = None) -> str:
+        """Stop ``profile``, write its statistics and return the profile ID.
+
+        ``profile_id`` is one handed out by ``new_id`` beforehand, for
+        streamed responses whose ID is sent before the profile is finished.
+        """
+        profile.disable()
+        profile_id = profile_id or self.new_id()
+        os.makedirs(self.output_dir, exist_ok=True)
+        profile.dump_stats(os.path.join(self.output_dir, profile_id + ".prof"))
+        report = io.StringIO()
+        report.write(label + "\n\n")
+        pstats.Stats(profile, stream=report).sort_stats("cumulative").print_stats(self.top)
+        with open(os.path.join(self.output_dir, profile_id + ".txt"), "w") as file:
+            file.write(report.getvalue())
+        return profile_id
+
+    def report(self, profile_id: str) -> Optional[str]:
+        """The text report for a profile ID, or None if there is none."""
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        try:
+            with open(os.path.join(self.output_dir, profile_id + ".txt")) as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
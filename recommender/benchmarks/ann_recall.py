@@ -0,0 +1,94 @@
+"""Recall@k versus latency for approximate (IVF) and exact neighbor search.
+
+Usage:
+    python -m recommender.benchmarks.ann_recall --students 1000000 --lists 256,1024 --probes 1,4,16
+"""
+import argparse
+import json
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from recommender.algorithms.similarity import SimilarityIndex, IVFSimilarityIndex
+from recommender.data.loader import DataLoader
+
+
+def load_vectors(dataset_path: str, num_students: int, seed: int = 0):
+    """Feature vectors for the bundled dataset, resampled with jitter up to ``num_students``."""
+    loader = DataLoader(dataset_path)
+    loader.load_dataset()
+    base = loader.get_service().similarity_index.matrix
+    if num_students <= len(base):
+        vectors = base[:num_students]
+    else:
+        rng = np.random.default_rng(seed)
+        vectors = base[rng.integers(0, len(base), num_students)]
+        vectors = np.clip(vectors + rng.normal(0.0, 0.02, vectors.shape), 0.0, None)
+    ids = [f"S{i:07d}" for i in range(len(vectors))]
+    return ids, vectors
+
+
+def time_queries(index: SimilarityIndex, query_ids: List[str], k: int):
+    results, latencies = [], []
+    for student_id in query_ids:
+        start = time.perf_counter()
+        neighbors = index.top_k(student_id, k)
+        latencies.append(time.perf_counter() - start)
+        results.append([sid for sid, _ in neighbors])
+    return results, np.array(latencies) * 1000.0
+
+
+def run(args) -> List[Dict]:
+    ids, vectors = load_vectors(args.dataset, args.students)
+    rng = np.random.default_rng(1)
+    query_ids = [ids[i] for i in rng.choice(len(ids), min(args.queries, len(ids)), replace=False)]
+
+    exact = SimilarityIndex()
+    exact.add_vectors(ids, vectors)
+    truth, exact_ms = time_queries(exact, query_ids, args.k)
+    rows = [{
+        "method": "exact", "n_lists": None, "n_probe": None, "build_s": 0.0, "recall": 1.0,
+        "p50_ms": float(np.percentile(exact_ms, 50)), "p95_ms": float(np.percentile(exact_ms, 95))
+    }]
+
+    for n_lists in args.lists:
+        index = IVFSimilarityIndex(n_lists=n_lists)
+        start = time.perf_counter()
+        index.add_vectors(ids, vectors)
+        build_s = time.perf_counter() - start
+        for n_probe in args.probes:
+            index.n_probe = n_probe
+            found, latency_ms = time_queries(index, query_ids, args.k)
+            recall = np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth) if t])
+            rows.append({
+                "method": "ivf", "n_lists": n_lists, "n_probe": n_probe, "build_s": build_s,
+                "recall": float(recall),
+                "p50_ms": float(np.percentile(latency_ms, 50)), "p95_ms": float(np.percentile(latency_ms, 95))
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", default="personalized_learning_dataset.csv")
+    parser.add_argument("--students", type=int, default=10000, help="Index size (rows are resampled with jitter)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--lists", type=lambda v: [int(x) for x in v.split(",")], default=[32, 100, 316])
+    parser.add_argument("--probes", type=lambda v: [int(x) for x in v.split(",")], default=[1, 2, 4, 8, 16])
+    parser.add_argument("--output", help="Optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    rows = run(args)
+    print(f"{'method':<6} {'lists':>6} {'probe':>6} {'build s':>8} {'recall@' + str(args.k):>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for row in rows:
+        print(f"{row['method']:<6} {str(row['n_lists'] or '-'):>6} {str(row['n_probe'] or '-'):>6} "
+              f"{row['build_s']:>8.2f} {row['recall']:>9.3f} {row['p50_ms']:>8.3f} {row['p95_ms']:>8.3f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"students": args.students, "k": args.k, "results": rows}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Synthetic datasets with the ``personalized_learning_dataset.csv`` schema.
+
+Values are drawn independently from the ranges and category frequencies of
+the bundled dataset, so the files exercise the same code paths at any size.
+
+Usage:
+    python -m recommender.benchmarks.generate_dataset --students 1000000 --output synthetic_1000000.csv
+"""
+import argparse
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+COURSES = ("Machine Learning", "Cybersecurity", "Python Basics", "Data Science", "Web Development")
+# Category -> frequency in the bundled dataset
+GENDERS = {"Female": 0.489, "Male": 0.47, "Other": 0.041}
+EDUCATION_LEVELS = {"Undergraduate": 0.507, "High School": 0.292, "Postgraduate": 0.201}
+ENGAGEMENT_LEVELS = {"Medium": 0.493, "High": 0.298, "Low": 0.209}
+LEARNING_STYLES = {"Reading/Writing": 0.255, "Visual": 0.252, "Auditory": 0.248, "Kinesthetic": 0.245}
+DROPOUT_RATE = 0.196
+# Column -> inclusive integer range in the bundled dataset
+RANGES = {
+    "Time_Spent_on_Videos": (10, 499),
+    "Quiz_Attempts": (1, 4),
+    "Quiz_Scores": (30, 99),
+    "Forum_Participation": (0, 49),
+    "Assignment_Completion_Rate": (40, 99),
+    "Final_Exam_Score": (30, 99),
+    "Feedback_Score": (1, 5),
+}
+
+
+def _choice(rng: np.random.Generator, frequencies: dict, size: int) -> np.ndarray:
+    values = np.array(list(frequencies), dtype=object)
+    weights = np.array(list(frequencies.values()))
+    return values[rng.choice(len(values), size=size, p=weights / weights.sum())]
+
+
+def generate_frame(first_student: int, num_students: int, courses_per_student: int = 1, seed: Optional[int] = None) -> pd.DataFrame:
+    """Rows for students ``first_student .. first_student + num_students - 1`` (IDs ``S00001``...).
+
+    Each student takes ``courses_per_student`` distinct courses, one row each.
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.array([f"S{i:05d}" for i in range(first_student, first_student + num_students)], dtype=object)
+    students = {
+        "Age": rng.integers(15, 50, num_students),
+        "Gender": _choice(rng, GENDERS, num_students),
+        "Education_Level": _choice(rng, EDUCATION_LEVELS, num_students),
+        "Engagement_Level": _choice(rng, ENGAGEMENT_LEVELS, num_students),
+        "Learning_Style": _choice(rng, LEARNING_STYLES, num_students),
+        "Dropout_Likelihood": np.where(rng.random(num_students) < DROPOUT_RATE, "Yes", "No"),
+    }
+    rows = num_students * courses_per_student
+    repeat = np.repeat(np.arange(num_students), courses_per_student)
+    courses = np.argsort(rng.random((num_students, len(COURSES))), axis=1)[:, :courses_per_student].ravel()
+    frame = {
+        "Student_ID": ids[repeat],
+        "Age": students["Age"][repeat],
+        "Gender": students["Gender"][repeat],
+        "Education_Level": students["Education_Level"][repeat],
+        "Course_Name": np.array(COURSES, dtype=object)[courses],
+    }
+    for column in ("Time_Spent_on_Videos", "Quiz_Attempts", "Quiz_Scores", "Forum_Participation", "Assignment_Completion_Rate"):
+        low, high = RANGES[column]
+        frame[column] = rng.integers(low, high + 1, rows)
+    frame["Engagement_Level"] = students["Engagement_Level"][repeat]
+    low, high = RANGES["Final_Exam_Score"]
+    frame["Final_Exam_Score"] = rng.integers(low, high + 1, rows)
+    frame["Learning_Style"] = students["Learning_Style"][repeat]
+    low, high = RANGES["Feedback_Score"]
+    frame["Feedback_Score"] = rng.integers(low, high + 1, rows)
+    frame["Dropout_Likelihood"] = students["Dropout_Likelihood"][repeat]
+    return pd.DataFrame(frame)
+
+
+def generate_dataset(
+    path: str,
+    num_students: int,
+    courses_per_student: int = 1,
+    seed: int = 0,
+    chunk_size: int = 100_000
+) -> None:
+    """Write a CSV for ``num_students`` students, ``chunk_size`` students at a time."""
+    if not 1 <= courses_per_student <= len(COURSES):
+        raise ValueError(f"courses_per_student must be between 1 and {len(COURSES)}")
+    seeds = np.random.SeedSequence(seed).spawn((num_students + chunk_size - 1) // chunk_size)
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        for chunk, start in enumerate(range(0, num_students, chunk_size)):
+            count = min(chunk_size, num_students - start)
+            frame = generate_frame(start + 1, count, courses_per_student, seeds[chunk])
+            frame.to_csv(file, header=chunk == 0, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--courses-per-student", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="defaults to synthetic_<students>.csv")
+    args = parser.parse_args()
+    generate_dataset(args.output or f"synthetic_{args.students}.csv", args.students, args.courses_per_student, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Dropout scoring latency: sklearn ``predict_proba`` versus the flattened forest.
+
+Trains the service's dropout model on a dataset and times both paths for
+several batch sizes, after checking that they return identical
+probabilities.
+
+Usage:
+    python -m recommender.benchmarks.inference --dataset personalized_learning_dataset.csv --batches 1,8,64,512
+"""
+import argparse
+import contextlib
+import io
+import json
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from recommender.ai.forest import FlatForest
+from recommender.data.loader import DataLoader
+
+
+def time_calls(predict, X: np.ndarray, batch: int, calls: int, rng) -> np.ndarray:
+    """Milliseconds per call of ``predict`` on random batches of ``batch`` rows."""
+    latencies = []
+    for _ in range(calls):
+        rows = X[rng.integers(0, len(X), batch)]
+        start = time.perf_counter()
+        predict(rows)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000.0
+
+
+def run(args) -> List[Dict]:
+    loader = DataLoader(args.dataset)
+    with contextlib.redirect_stdout(io.StringIO()):
+        loader.load_dataset()
+        service = loader.get_service()
+        service.train_classifier()
+    X = service.features.classifier
+    model = service.classifier.model
+    start = time.perf_counter()
+    forest = FlatForest.from_estimator(model)
+    build_s = time.perf_counter() - start
+    if forest is None:
+        raise SystemExit(f"{type(model).__name__} is not a random forest; nothing to compare")
+    if not np.array_equal(forest.predict_proba(X), model.predict_proba(X)[:, 1]):
+        raise SystemExit("Flattened forest probabilities differ from sklearn's")
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for batch in args.batches:
+        calls = max(5, args.calls // batch)
+        sklearn_ms = time_calls(lambda rows: model.predict_proba(rows)[:, 1], X, batch, calls, rng)
+        flat_ms = time_calls(forest.predict_proba, X, batch, calls, rng)
+        rows.append({
+            "batch": batch, "calls": calls, "build_s": build_s,
+            "sklearn_p50_ms": float(np.percentile(sklearn_ms, 50)), "sklearn_p95_ms": float(np.percentile(sklearn_ms, 95)),
+            "flat_p50_ms": float(np.percentile(flat_ms, 50)), "flat_p95_ms": float(np.percentile(flat_ms, 95)),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", default="personalized_learning_dataset.csv")
+    parser.add_argument("--batches", type=lambda v: [int(x) for x in v.split(",")], default=[1, 8, 64, 512])
+    parser.add_argument("--calls", type=int, default=500, help="single-row calls; larger batches get proportionally fewer")
+    parser.add_argument("--output", help="Optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    rows = run(args)
+    print(f"{'batch':>6} {'sklearn p50':>12} {'sklearn p95':>12} {'flat p50':>9} {'flat p95':>9} {'speedup':>8}")
+    for row in rows:
+        print(f"{row['batch']:>6} {row['sklearn_p50_ms']:>12.3f} {row['sklearn_p95_ms']:>12.3f} "
+              f"{row['flat_p50_ms']:>9.3f} {row['flat_p95_ms']:>9.3f} {row['sklearn_p50_ms'] / row['flat_p50_ms']:>7.1f}x")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"dataset": args.dataset, "results": rows}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
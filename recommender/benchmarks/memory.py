@@ -0,0 +1,54 @@
+"""Memory per student: dict of StudentProfile dataclasses versus StudentTable.
+
+Usage:
+    python -m recommender.benchmarks.memory --dataset personalized_learning_dataset.csv
+"""
+import argparse
+import gc
+import tracemalloc
+
+from recommender.core.table import StudentTable
+from recommender.data.loader import DataLoader
+
+
+def traced_bytes(build):
+    """Bytes still allocated after ``build()`` returns, and its result."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", default="personalized_learning_dataset.csv")
+    args = parser.parse_args()
+
+    loader = DataLoader(args.dataset)
+    loader.load_dataset()
+    source = loader.get_service().students
+    profiles = [view.to_profile() for view in source.values()]
+
+    def build_dict():
+        return {p.student_id: view.to_profile() for p, view in zip(profiles, source.values())}
+
+    def build_table():
+        table = StudentTable()
+        for profile in profiles:
+            table.add_profile(profile)
+        return table
+
+    dict_bytes, _ = traced_bytes(build_dict)
+    table_bytes, table = traced_bytes(build_table)
+    count = len(profiles)
+    print(f"students: {count}")
+    print(f"dict of StudentProfile: {dict_bytes / count:8.1f} bytes/student")
+    print(f"StudentTable:           {table_bytes / count:8.1f} bytes/student "
+          f"(columns {table.nbytes / count:.1f}, including growth headroom)")
+
+
+if __name__ == "__main__":
+    main()
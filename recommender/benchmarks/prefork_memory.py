@@ -0,0 +1,99 @@
+"""Per-worker memory of the gunicorn server, with and without a preloaded app.
+
+Starts ``gunicorn -c gunicorn.conf.py`` in each mode, sends a few requests so
+every worker has served traffic, and reports each process's RSS, PSS and
+private memory from ``/proc/<pid>/smaps_rollup`` (Linux only). PSS splits
+shared pages between the processes sharing them, so its sum is the real
+footprint of the server.
+
+Usage:
+    python -m recommender.benchmarks.prefork_memory --dataset personalized_learning_dataset.csv --workers 4
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List
+
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def process_memory(pid: int) -> Dict[str, int]:
+    """Memory counters of one process in kB."""
+    usage = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as file:
+        for line in file:
+            name, _, value = line.partition(":")
+            if name in FIELDS:
+                usage[name] = int(value.split()[0])
+    return usage
+
+
+def child_pids(pid: int) -> List[int]:
+    with open(f"/proc/{pid}/task/{pid}/children", encoding="utf-8") as file:
+        return [int(child) for child in file.read().split()]
+
+
+def wait_until_ready(url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.5)
+
+
+def measure(dataset: str, workers: int, preload: bool, port: int, requests: int, timeout: float) -> None:
+    env = dict(os.environ, DATASET_PATH=dataset, WEB_CONCURRENCY=str(workers),
+               PRELOAD_APP="1" if preload else "0", BIND=f"127.0.0.1:{port}")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "recommender.api.app:app"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        started = time.monotonic()
+        base = f"http://127.0.0.1:{port}/api"
+        wait_until_ready(f"{base}/health", timeout)
+        while len(child_pids(server.pid)) < workers:
+            time.sleep(0.5)
+        ready = time.monotonic() - started
+        for i in range(requests):
+            urllib.request.urlopen(f"{base}/recommendations/S{i % 10000 + 1:05d}").read()
+            urllib.request.urlopen(f"{base}/analysis").read()
+
+        print(f"\n{'preloaded' if preload else 'per-worker load'}: {workers} workers, ready in {ready:.1f}s")
+        print(f"{'process':>10} {'RSS MB':>8} {'PSS MB':>8} {'shared MB':>10} {'private MB':>11}")
+        total_pss = 0
+        for role, pid in [("master", server.pid)] + [("worker", pid) for pid in child_pids(server.pid)]:
+            usage = process_memory(pid)
+            shared = usage["Shared_Clean"] + usage["Shared_Dirty"]
+            private = usage["Private_Clean"] + usage["Private_Dirty"]
+            total_pss += usage["Pss"]
+            print(f"{role:>10} {usage['Rss'] / 1024:8.1f} {usage['Pss'] / 1024:8.1f} {shared / 1024:10.1f} {private / 1024:11.1f}")
+        print(f"{'total PSS':>10} {total_pss / 1024:8.1f} MB")
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", default="personalized_learning_dataset.csv")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--requests", type=int, default=200, help="requests sent before measuring")
+    parser.add_argument("--timeout", type=float, default=600.0)
+    args = parser.parse_args()
+    dataset = os.path.abspath(args.dataset)
+    for preload in (True, False):
+        measure(dataset, args.workers, preload, args.port, args.requests, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
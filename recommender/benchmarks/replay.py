@@ -0,0 +1,248 @@
+"""Replay a JSONL request log against the API and report latency percentiles.
+
+Each log line is ``{"method": "GET", "path": "/api/students/S00027"}``, with
+an optional JSON ``body``. Requests are sent by ``--concurrency`` threads,
+either as fast as possible or paced at ``--rate`` requests per second. When
+paced, latency is measured from each request's scheduled send time, so a
+server that falls behind shows up in the percentiles instead of silently
+lowering the offered load. Targets are a running server (``--url``) or the
+Flask test client in-process (``--test-client``, which loads the app).
+
+Usage:
+    python -m recommender.benchmarks.replay generate --dataset personalized_learning_dataset.csv --requests 10000 --output traffic.jsonl
+    python -m recommender.benchmarks.replay run traffic.jsonl --url http://127.0.0.1:5000 --concurrency 8 --rate 500
+    python -m recommender.benchmarks.replay run traffic.jsonl --test-client --concurrency 4
+"""
+import argparse
+import http.client
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+# Share of generated requests per endpoint
+DEFAULT_MIX = {"recommendations": 0.6, "students": 0.3, "analysis": 0.1}
+# Path pattern -> endpoint name used in the report
+ENDPOINTS = [
+    (re.compile(r"^/api/recommendations/batch"), "POST /api/recommendations/batch"),
+    (re.compile(r"^/api/recommendations/[^/?]+"), "GET /api/recommendations/<id>"),
+    (re.compile(r"^/api/students/[^/?]+"), "GET /api/students/<id>"),
+    (re.compile(r"^/api/analysis"), "GET /api/analysis"),
+    (re.compile(r"^/api/events"), "POST /api/events"),
+]
+
+
+def endpoint_name(method: str, path: str) -> str:
+    for pattern, name in ENDPOINTS:
+        if pattern.match(path):
+            return name
+    return f"{method} {path.split('?')[0]}"
+
+
+def generate_profile(
+    dataset: str,
+    num_requests: int,
+    mix: Optional[Dict[str, float]] = None,
+    zipf: float = 0.0,
+    missing_rate: float = 0.0,
+    seed: int = 0
+) -> List[Dict]:
+    """Requests for the dataset's student IDs, ``mix`` giving each endpoint's share.
+
+    With ``zipf > 1`` student popularity follows a Zipf law (a few hot
+    students, as with real dashboards); otherwise students are uniform.
+    ``missing_rate`` of the per-student requests use unknown IDs.
+    """
+    mix = mix or DEFAULT_MIX
+    rng = np.random.default_rng(seed)
+    student_ids = pd.read_csv(dataset, usecols=["Student_ID"])["Student_ID"].unique()
+    if zipf > 1:
+        picks = (rng.zipf(zipf, num_requests) - 1) % len(student_ids)
+    else:
+        picks = rng.integers(0, len(student_ids), num_requests)
+    names = list(mix)
+    weights = np.array([mix[name] for name in names], dtype=float)
+    kinds = rng.choice(len(names), size=num_requests, p=weights / weights.sum())
+    missing = rng.random(num_requests) < missing_rate
+
+    requests = []
+    for i in range(num_requests):
+        student_id = f"MISSING{i}" if missing[i] else str(student_ids[picks[i]])
+        kind = names[kinds[i]]
+        if kind == "recommendations":
+            requests.append({"method": "GET", "path": f"/api/recommendations/{student_id}?num=3"})
+        elif kind == "students":
+            requests.append({"method": "GET", "path": f"/api/students/{student_id}"})
+        elif kind == "analysis":
+            requests.append({"method": "GET", "path": "/api/analysis"})
+        else:
+            raise ValueError(f"Unknown endpoint in mix: {kind}")
+    return requests
+
+
+def read_log(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def write_log(path: str, requests: Iterable[Dict]) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        for request in requests:
+            file.write(json.dumps(request) + "\n")
+
+
+def http_sender(base_url: str) -> Callable[[Dict], int]:
+    """Sender for a running server, with one keep-alive connection per thread."""
+    url = urlsplit(base_url)
+    local = threading.local()
+
+    def send(request: Dict) -> int:
+        connection = getattr(local, "connection", None)
+        if connection is None:
+            connection = local.connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=60)
+        body = json.dumps(request["body"]) if "body" in request else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        try:
+            connection.request(request["method"], url.path.rstrip("/") + request["path"], body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            local.connection = None
+            raise
+
+    return send
+
+
+def test_client_sender() -> Callable[[Dict], int]:
+    """Sender driving the Flask app in-process, with one test client per thread."""
+    from recommender.api.app import app
+    local = threading.local()
+
+    def send(request: Dict) -> int:
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        response = client.open(request["path"], method=request["method"], json=request.get("body"))
+        response.get_data()
+        return response.status_code
+
+    return send
+
+
+def replay(requests: List[Dict], send: Callable[[Dict], int], concurrency: int = 1, rate: float = 0.0) -> Dict:
+    """Send ``requests`` and return per-endpoint latency statistics plus overall throughput."""
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def run(item: Tuple[int, Dict]) -> None:
+        index, request = item
+        scheduled = start + index / rate if rate > 0 else None
+        if scheduled is not None:
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        sent = time.perf_counter()
+        try:
+            status = str(send(request))
+        except Exception as error:  # count it and keep replaying
+            status = type(error).__name__
+        finished = time.perf_counter()
+        name = endpoint_name(request["method"], request["path"])
+        with lock:
+            latencies[name].append(finished - (scheduled if scheduled is not None else sent))
+            statuses[name][status] += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in pool.map(run, enumerate(requests)):
+            pass
+    elapsed = time.perf_counter() - start
+
+    endpoints = {}
+    for name, values in sorted(latencies.items()):
+        milliseconds = np.array(values) * 1000.0
+        endpoints[name] = {
+            "requests": len(values),
+            "throughput_rps": len(values) / elapsed,
+            "mean_ms": float(milliseconds.mean()),
+            "p50_ms": float(np.percentile(milliseconds, 50)),
+            "p95_ms": float(np.percentile(milliseconds, 95)),
+            "p99_ms": float(np.percentile(milliseconds, 99)),
+            "max_ms": float(milliseconds.max()),
+            "statuses": dict(statuses[name]),
+        }
+    return {
+        "requests": len(requests),
+        "elapsed_s": elapsed,
+        "throughput_rps": len(requests) / elapsed if elapsed else 0.0,
+        "concurrency": concurrency,
+        "rate": rate,
+        "endpoints": endpoints,
+    }
+
+
+def format_report(report: Dict) -> str:
+    lines = [
+        f"{report['requests']} requests in {report['elapsed_s']:.2f}s: {report['throughput_rps']:.1f} req/s "
+        f"(concurrency {report['concurrency']}, rate {report['rate'] or 'unlimited'})",
+        f"{'endpoint':<34} {'count':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}  statuses",
+    ]
+    for name, stats in report["endpoints"].items():
+        statuses = ", ".join(f"{status}: {count}" for status, count in sorted(stats["statuses"].items()))
+        lines.append(
+            f"{name:<34} {stats['requests']:>7} {stats['throughput_rps']:>8.1f} {stats['p50_ms']:>8.2f} "
+            f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['max_ms']:>8.2f}  {statuses}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="write a traffic profile for a dataset")
+    generate.add_argument("--dataset", default="personalized_learning_dataset.csv")
+    generate.add_argument("--requests", type=int, default=10_000)
+    generate.add_argument("--mix", default=",".join(f"{name}={share}" for name, share in DEFAULT_MIX.items()),
+                          help="endpoint=share pairs, e.g. recommendations=0.6,students=0.3,analysis=0.1")
+    generate.add_argument("--zipf", type=float, default=0.0, help="Zipf exponent (> 1) for skewed student popularity")
+    generate.add_argument("--missing-rate", type=float, default=0.0, help="share of requests for unknown students")
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--output", default="traffic.jsonl")
+
+    run = commands.add_parser("run", help="replay a request log")
+    run.add_argument("log")
+    target = run.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="base URL of a running server, e.g. http://127.0.0.1:5000")
+    target.add_argument("--test-client", action="store_true", help="drive the app in-process")
+    run.add_argument("--concurrency", type=int, default=4)
+    run.add_argument("--rate", type=float, default=0.0, help="requests per second; 0 sends as fast as possible")
+    run.add_argument("--output", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        mix = {name: float(share) for name, share in (pair.split("=") for pair in args.mix.split(","))}
+        write_log(args.output, generate_profile(args.dataset, args.requests, mix, args.zipf, args.missing_rate, args.seed))
+        print(f"Wrote {args.requests} requests to {args.output}")
+        return
+
+    send = http_sender(args.url) if args.url else test_client_sender()
+    report = replay(read_log(args.log), send, args.concurrency, args.rate)
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""End-to-end timings of the main service operations on synthetic datasets.
+
+For each size a dataset is generated (and cached in ``--data-dir``), then
+``DataLoader.load_dataset``, ``train_classifier``, ``get_similar_students``,
+``generate_recommendations`` and ``get_analysis_data`` are timed. Results
+are written as JSON together with the commit and library versions, and can
+be compared against an earlier run to spot regressions.
+
+Usage:
+    python -m recommender.benchmarks.suite --sizes 10000,100000,1000000 --output bench.json
+    python -m recommender.benchmarks.suite --sizes 10000 --output new.json --compare bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from recommender.benchmarks.generate_dataset import generate_dataset
+from recommender.data.loader import DataLoader
+from recommender.data.manager import DataManager
+from config.settings import Config
+
+
+def timed(function: Callable[[], object]) -> float:
+    """Seconds taken by ``function()``, with its printing silenced."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        function()
+        return time.perf_counter() - start
+
+
+def latency_stats(seconds: List[float]) -> Dict[str, float]:
+    milliseconds = np.array(seconds) * 1000.0
+    return {
+        "calls": len(milliseconds),
+        "mean_ms": float(milliseconds.mean()),
+        "p50_ms": float(np.percentile(milliseconds, 50)),
+        "p95_ms": float(np.percentile(milliseconds, 95)),
+        "max_ms": float(milliseconds.max()),
+    }
+
+
+def run_size(dataset: str, queries: int, config, seed: int = 0) -> Dict[str, Dict[str, float]]:
+    results = {}
+    loader = DataLoader(dataset, config)
+    results["load_dataset"] = {"seconds": timed(loader.load_dataset)}
+    service = loader.get_service()
+    results["train_classifier"] = {"seconds": timed(service.train_classifier)}
+
+    rng = np.random.default_rng(seed)
+    student_ids = [service.students.ids[row] for row in rng.integers(0, len(service.students), queries)]
+    results["get_similar_students"] = latency_stats(
+        [timed(lambda: service.get_similar_students(student_id)) for student_id in student_ids]
+    )
+
+    def uncached(student_id: str) -> Callable[[], object]:
+        def recommend():
+            service.recommendation_cache.clear()
+            return service.generate_recommendations(student_id)
+        return recommend
+    results["generate_recommendations"] = latency_stats([timed(uncached(student_id)) for student_id in student_ids])
+
+    manager = DataManager(dataset, config)
+    manager.service = service
+    results["get_analysis_data_first"] = {"seconds": timed(manager.get_analysis_data)}
+    results["get_analysis_data"] = latency_stats([timed(manager.get_analysis_data) for _ in range(queries)])
+    return results
+
+
+def metadata(config) -> Dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "config": {
+            name: getattr(config, name, None)
+            for name in ("BULK_LOAD", "LOAD_WORKERS", "SIMILARITY_SEARCH", "CACHE_TIMEOUT")
+        },
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Lines describing each operation's change; regressions beyond ``tolerance`` are flagged."""
+    lines = []
+    for size, operations in current["results"].items():
+        for operation, stats in operations.items():
+            previous = baseline.get("results", {}).get(size, {}).get(operation)
+            if not previous:
+                continue
+            key = "seconds" if "seconds" in stats else "mean_ms"
+            ratio = stats[key] / previous[key] if previous[key] else float("inf")
+            flag = "  REGRESSION" if ratio > 1 + tolerance else ""
+            lines.append(f"{size:>8} {operation:<26} {previous[key]:10.3f} -> {stats[key]:10.3f} {key} ({ratio:5.2f}x){flag}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated student counts")
+    parser.add_argument("--queries", type=int, default=200, help="calls per latency measurement")
+    parser.add_argument("--courses-per-student", type=int, default=1)
+    parser.add_argument("--data-dir", default=".", help="where generated datasets are cached")
+    parser.add_argument("--bulk", action="store_true", help="load with Config.BULK_LOAD")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="slowdown flagged as a regression")
+    args = parser.parse_args()
+
+    config = type("BenchmarkConfig", (Config,), {"BULK_LOAD": args.bulk or Config.BULK_LOAD, "MODEL_PATH": None, "SNAPSHOT_PATH": None})
+    report = {"meta": metadata(config), "results": {}}
+    for size in (int(value) for value in args.sizes.split(",")):
+        dataset = os.path.join(args.data_dir, f"synthetic_{size}_{args.courses_per_student}.csv")
+        if not os.path.exists(dataset):
+            generate_dataset(dataset, size, args.courses_per_student)
+        report["results"][str(size)] = results = run_size(dataset, args.queries, config)
+        for operation, stats in results.items():
+            summary = f"{stats['seconds']:.3f} s" if "seconds" in stats else f"mean {stats['mean_ms']:.3f} ms, p95 {stats['p95_ms']:.3f} ms"
+            print(f"{size:>8} {operation:<26} {summary}")
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        print(f"\nCompared with {args.compare} ({baseline.get('meta', {}).get('commit')}):")
+        print("\n".join(compare(report, baseline, args.tolerance)))
+
+
+if __name__ == "__main__":
+    main()
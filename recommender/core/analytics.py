@@ -0,0 +1,170 @@
+import threading
+from typing import Dict, Iterable, Optional
+import numpy as np
+from .table import DirtyRows, StudentTable, GENDERS, EDUCATION_LEVELS, LEARNING_STYLES, ENGAGEMENT_LEVELS
+
+# Student columns the aggregates are grouped by, with their members in code order
+GROUP_BY = {
+    "learning_style": LEARNING_STYLES,
+    "education_level": EDUCATION_LEVELS,
+    "gender": GENDERS,
+}
+RISK_BIN_EDGES = np.array([0.25, 0.5, 0.75])  # inclusive upper bounds of all but the last bin
+RISK_BIN_LABELS = ("0-0.25", "0.25-0.5", "0.5-0.75", "0.75-1.0")
+
+
+class AnalyticsAggregates:
+    """Dashboard metrics kept as running sums per group-by cell.
+
+    Every student falls into one cell of the ``GROUP_BY`` cube. Per cell the
+    aggregates hold the student count, the count and sum of predicted
+    dropout scores, the risk histogram and the engagement counts; per cell
+    and course, the enrolled count, their scored count and score sum, and
+    the sum of their final exam scores. What each row contributed is
+    remembered, so a changed row is taken out and put back in time
+    proportional to its enrollments, and a query only sums the matching
+    cells.
+
+    Rows are picked up lazily like in ``FeatureStore``: new rows and rows
+    marked dirty are folded in on the next ``summary``.
+    """
+
+    def __init__(self):
+        self._shape = tuple(len(members) for members in GROUP_BY.values())
+        self._cells = int(np.prod(self._shape))
+        self._coordinates = dict(zip(GROUP_BY, np.unravel_index(np.arange(self._cells), self._shape)))
+        self._students = np.zeros(self._cells, dtype=np.int64)
+        self._scored = np.zeros(self._cells, dtype=np.int64)
+        self._score_sum = np.zeros(self._cells)
+        self._risk = np.zeros((self._cells, len(RISK_BIN_LABELS)), dtype=np.int64)
+        self._engagement = np.zeros((self._cells, len(ENGAGEMENT_LEVELS)), dtype=np.int64)
+        self._course_students = np.zeros((self._cells, 0), dtype=np.int64)
+        self._course_scored = np.zeros((self._cells, 0), dtype=np.int64)
+        self._course_score_sum = np.zeros((self._cells, 0))
+        self._course_exam_sum = np.zeros((self._cells, 0))
+        # Contribution last folded in, per row and per enrollment (NaN: not yet counted)
+        self._row_cell = np.zeros(0, dtype=np.int64)
+        self._row_engagement = np.zeros(0, dtype=np.int64)
+        self._row_score = np.zeros(0)
+        self._enrollment_exam = np.zeros(0)
+        self._size = 0
+        self._dirty = DirtyRows()
+        self._lock = threading.Lock()
+
+    def mark_dirty(self, rows: Iterable[int]) -> None:
+        self._dirty.add(rows)
+
+    def summary(self, table: StudentTable, course_names: Iterable[str], filters: Optional[Dict[str, str]] = None) -> Dict:
+        """Analysis data for the students matching ``filters`` (``GROUP_BY`` field -> value).
+
+        Raises ValueError for an unknown filter field or value.
+        """
+        cells = np.ones(self._cells, dtype=bool)
+        for name, value in (filters or {}).items():
+            if name not in GROUP_BY:
+                raise ValueError(f"Cannot filter by {name}; expected one of {', '.join(GROUP_BY)}")
+            members = GROUP_BY[name]
+            cells &= self._coordinates[name] == members.index(members[0].__class__(value))
+
+        with self._lock:
+            self._refresh(table)
+            students = int(self._students[cells].sum())
+            scored = int(self._scored[cells].sum())
+            score_sum = float(self._score_sum[cells].sum())
+            risk = self._risk[cells].sum(axis=0)
+            engagement = self._engagement[cells].sum(axis=0)
+            course_students = self._course_students[cells].sum(axis=0)
+            course_scored = self._course_scored[cells].sum(axis=0)
+            course_score_sum = self._course_score_sum[cells].sum(axis=0)
+            course_exam_sum = self._course_exam_sum[cells].sum(axis=0)
+
+        course_stats = {}
+        for course_name in course_names:
+            code = table.course_index.get(course_name)
+            if code is None or code >= len(course_students) or not course_students[code]:
+                continue
+            course_stats[course_name] = {
+                "student_count": int(course_students[code]),
+                "avg_dropout_risk": float(course_score_sum[code] / course_scored[code]) if course_scored[code] else 0.0,
+                "avg_final_exam_score": float(course_exam_sum[code] / course_students[code])
+            }
+        return {
+            "total_students": students,
+            "avg_dropout_risk": score_sum / scored if scored else 0.0,
+            "engagement_distribution": {level.value: int(count) for level, count in zip(ENGAGEMENT_LEVELS, engagement)},
+            "dropout_risk_distribution": dict(zip(RISK_BIN_LABELS, (int(count) for count in risk))),
+            "course_statistics": course_stats
+        }
+
+    def _refresh(self, table: StudentTable) -> None:
+        dirty = self._dirty.take(self._size)
+        self._ensure_capacity(table)
+        if len(dirty):
+            self._fold(table, dirty, -1)
+        rows = np.union1d(dirty, np.arange(self._size, len(table)))
+        self._size = len(table)
+        if len(rows):
+            self._fold(table, rows, 1)
+
+    def _fold(self, table: StudentTable, rows: np.ndarray, sign: int) -> None:
+        """Add (``sign=1``, from the table) or remove (``sign=-1``, as recorded) the contribution of ``rows``."""
+        enrollments, positions = table.enrollments_of(rows)
+        if sign > 0:
+            cell = np.zeros(len(rows), dtype=np.int64)
+            for name, size in zip(GROUP_BY, self._shape):
+                cell = cell * size + table.column(name)[rows]
+            self._row_cell[rows] = cell
+            self._row_engagement[rows] = table.column("engagement_level")[rows]
+            self._row_score[rows] = table.column("predicted_dropout_score")[rows]
+            self._enrollment_exam[enrollments] = table.enrollment_column("final_exam_score")[enrollments]
+        else:
+            counted = ~np.isnan(self._enrollment_exam[enrollments])
+            enrollments, positions = enrollments[counted], positions[counted]
+        cell = self._row_cell[rows]
+        score = self._row_score[rows]
+        scored = ~np.isnan(score)
+        cells = self._cells
+
+        self._students += sign * np.bincount(cell, minlength=cells)
+        self._scored += sign * np.bincount(cell[scored], minlength=cells)
+        self._score_sum += sign * np.bincount(cell[scored], weights=score[scored], minlength=cells)
+        bins = np.searchsorted(RISK_BIN_EDGES, score[scored], side="left")
+        self._risk += sign * np.bincount(
+            cell[scored] * self._risk.shape[1] + bins, minlength=self._risk.size
+        ).reshape(self._risk.shape)
+        self._engagement += sign * np.bincount(
+            cell * self._engagement.shape[1] + self._row_engagement[rows], minlength=self._engagement.size
+        ).reshape(self._engagement.shape)
+
+        courses = self._course_students.shape[1]
+        flat = cell[positions] * courses + table.enrollment_column("course")[enrollments]
+        enrolled_score = score[positions]
+        enrolled_scored = ~np.isnan(enrolled_score)
+        size = self._course_students.size
+        self._course_students += sign * np.bincount(flat, minlength=size).reshape(cells, courses)
+        self._course_scored += sign * np.bincount(flat[enrolled_scored], minlength=size).reshape(cells, courses)
+        self._course_score_sum += sign * np.bincount(
+            flat[enrolled_scored], weights=enrolled_score[enrolled_scored], minlength=size
+        ).reshape(cells, courses)
+        self._course_exam_sum += sign * np.bincount(
+            flat, weights=self._enrollment_exam[enrollments], minlength=size
+        ).reshape(cells, courses)
+
+    def _ensure_capacity(self, table: StudentTable) -> None:
+        grow = len(table.course_names) - self._course_students.shape[1]
+        if grow > 0:
+            for name in ("_course_students", "_course_scored", "_course_score_sum", "_course_exam_sum"):
+                current = getattr(self, name)
+                setattr(self, name, np.pad(current, ((0, 0), (0, grow))))
+        if len(table) > len(self._row_cell):
+            capacity = max(len(table), 2 * len(self._row_cell), 16)
+            for name, fill in (("_row_cell", 0), ("_row_engagement", 0), ("_row_score", np.nan)):
+                current = getattr(self, name)
+                grown = np.full(capacity, fill, dtype=current.dtype)
+                grown[:len(current)] = current
+                setattr(self, name, grown)
+        if table.num_enrollments > len(self._enrollment_exam):
+            capacity = max(table.num_enrollments, 2 * len(self._enrollment_exam), 16)
+            grown = np.full(capacity, np.nan)
+            grown[:len(self._enrollment_exam)] = self._enrollment_exam
+            self._enrollment_exam = grown
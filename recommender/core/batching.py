@@ -0,0 +1,99 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from queue import Empty, SimpleQueue
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+from .metrics import registry as metrics
+
+
+class MicroBatcher:
+    """Groups concurrent scoring calls into one call of ``function``.
+
+    ``submit(X)`` queues a feature matrix and blocks until its scores are
+    ready. A worker thread takes the first queued matrix, collects whatever
+    else arrives within ``max_wait`` seconds (up to ``max_rows`` rows),
+    scores the stacked rows with a single ``function`` call and hands each
+    caller its slice. It only waits while other callers are inside
+    ``submit`` but not yet in the batch, so a lone request is scored at
+    once; under load, requests also queue up while the previous batch is
+    being scored. Any request thus waits at most ``max_wait`` plus two
+    model calls, while many concurrent ones share the per-call overhead.
+    The worker starts on first use in each process, so the batcher
+    survives a pre-fork server's fork.
+    """
+
+    def __init__(
+        self,
+        function: Callable[[np.ndarray], np.ndarray],
+        max_rows: int = 64,
+        max_wait: float = 0.002,
+        name: str = "batch"
+    ):
+        self.function = function
+        self.max_rows = max_rows
+        self.max_wait = max_wait
+        self.name = name
+        self.batches = 0
+        self.last_batch_size = 0
+        self._queue: SimpleQueue = SimpleQueue()
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._in_flight = 0  # callers inside submit
+
+    def submit(self, X: np.ndarray) -> Tuple[np.ndarray, int]:
+        """Scores for the rows of ``X`` and the number of rows in the batch that scored them."""
+        self._ensure_worker()
+        future: Future = Future()
+        with self._lock:
+            self._in_flight += 1
+        try:
+            self._queue.put((np.atleast_2d(X), future))
+            return future.result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _ensure_worker(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = SimpleQueue()  # a forked child must not share the parent's queue
+                thread = threading.Thread(target=self._run, args=(self._queue,), name=f"{self.name}-batcher", daemon=True)
+                thread.start()
+                self._pid = os.getpid()
+
+    def _run(self, queue: SimpleQueue) -> None:
+        while True:
+            batch = [queue.get()]
+            rows = len(batch[0][0])
+            deadline = time.perf_counter() + self.max_wait
+            while rows < self.max_rows:
+                remaining = deadline - time.perf_counter()
+                try:
+                    if remaining > 0 and len(batch) < self._in_flight:
+                        item = queue.get(timeout=remaining)
+                    else:
+                        item = queue.get_nowait()
+                except Empty:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            self._score(batch, rows)
+
+    def _score(self, batch: List[Tuple[np.ndarray, Future]], rows: int) -> None:
+        self.batches += 1
+        self.last_batch_size = rows
+        metrics.observe_size(self.name, rows)
+        try:
+            scores = self.function(np.vstack([X for X, _ in batch]))
+        except Exception as error:  # every caller in the batch sees the failure
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        start = 0
+        for X, future in batch:
+            future.set_result((scores[start:start + len(X)], rows))
+            start += len(X)
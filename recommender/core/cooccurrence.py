@@ -0,0 +1,127 @@
+import threading
+from typing import Iterable, NamedTuple, Tuple
+import numpy as np
+from .table import DirtyRows, StudentTable
+
+
+class CourseMatrices(NamedTuple):
+    """Course x course counts, indexed by table course code."""
+    together: np.ndarray  # students enrolled in both courses; the diagonal is each course's enrollment
+    passed: np.ndarray  # [a, b]: students of both who passed b (final exam score above 0)
+    success: np.ndarray  # [a, b]: sum of those students' b exam scores / 100
+
+    def conditional_success(self) -> np.ndarray:
+        """``[a, b]``: share of course ``a``'s students who took and passed ``b``; NaN for empty courses."""
+        enrolled = np.diag(self.together).astype(np.float64)
+        return np.divide(self.passed, enrolled[:, None], out=np.full(self.passed.shape, np.nan), where=enrolled[:, None] > 0)
+
+
+def _pairs(positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Every ``(i, j)`` with ``positions[i] == positions[j]``, including ``i == j``; ``positions`` sorted."""
+    starts = np.searchsorted(positions, positions, side="left")
+    sizes = np.searchsorted(positions, positions, side="right") - starts
+    first = np.repeat(np.arange(len(positions)), sizes)
+    offsets = np.arange(len(first)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    return first, np.repeat(starts, sizes) + offsets
+
+
+class CourseCooccurrence:
+    """Item-item course statistics from the sparse student x course enrollments.
+
+    Every student adds one to ``together`` for each ordered pair of their
+    courses and, for each course ``b`` they passed, to ``passed`` and
+    ``success`` for every ``(a, b)``, so folding a row in or out costs the
+    square of its enrollment count. Item-based scores for a student then
+    take one row per course they have taken: O(courses) per candidate
+    course, whatever the number of students.
+
+    Rows are picked up lazily like in ``AnalyticsAggregates``: new rows and
+    rows marked dirty (new enrollments or exam scores) are folded in on the
+    next query, after taking out what they contributed before.
+    """
+
+    def __init__(self):
+        self._together = np.zeros((0, 0), dtype=np.int64)
+        self._passed = np.zeros((0, 0), dtype=np.int64)
+        self._success = np.zeros((0, 0))
+        self._enrollment_exam = np.zeros(0)  # as folded in, per enrollment (NaN: not yet counted)
+        self._size = 0
+        self._dirty = DirtyRows()
+        self._lock = threading.Lock()
+
+    def mark_dirty(self, rows: Iterable[int]) -> None:
+        self._dirty.add(rows)
+
+    def matrices(self, table: StudentTable) -> CourseMatrices:
+        """Copies of the current counts."""
+        with self._lock:
+            self._refresh(table)
+            return CourseMatrices(self._together.copy(), self._passed.copy(), self._success.copy())
+
+    def collaborative(
+        self, table: StudentTable, taken: np.ndarray, course_codes: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Item-based ``(counts, scores, overall)``, shape ``(students, len(course_codes))``.
+
+        ``taken`` is a ``(students, table courses)`` mask of each student's
+        courses. For every course in ``course_codes``, ``counts`` sums the
+        students who passed it over the student's courses, and ``scores``
+        is their average exam score / 100, the same average
+        ``CourseRecommender`` takes over similar students. Where none of
+        them passed it, which includes students without courses, the
+        course's own pass count and average are used and ``overall`` is set.
+        """
+        with self._lock:
+            self._refresh(table)
+            passed = self._passed[:, course_codes]
+            success = self._success[:, course_codes]
+        taken = taken.astype(np.float64)
+        counts = taken @ passed
+        total = taken @ success
+        overall = counts == 0
+        counts = np.where(overall, passed[course_codes, np.arange(len(course_codes))], counts)
+        total = np.where(overall, success[course_codes, np.arange(len(course_codes))], total)
+        return counts.astype(np.int64), np.divide(total, counts, out=np.zeros(counts.shape), where=counts > 0), overall
+
+    def _refresh(self, table: StudentTable) -> None:
+        dirty = self._dirty.take(self._size)
+        self._ensure_capacity(table)
+        if len(dirty):
+            self._fold(table, dirty, -1)
+        rows = np.union1d(dirty, np.arange(self._size, len(table)))
+        self._size = len(table)
+        if len(rows):
+            self._fold(table, rows, 1)
+
+    def _fold(self, table: StudentTable, rows: np.ndarray, sign: int) -> None:
+        """Add (``sign=1``, from the table) or remove (``sign=-1``, as recorded) the contribution of ``rows``."""
+        enrollments, positions = table.enrollments_of(rows)
+        if sign > 0:
+            self._enrollment_exam[enrollments] = table.enrollment_column("final_exam_score")[enrollments]
+        else:
+            counted = ~np.isnan(self._enrollment_exam[enrollments])
+            enrollments, positions = enrollments[counted], positions[counted]
+        order = np.argsort(positions, kind="stable")
+        enrollments, positions = enrollments[order], positions[order]
+        first, second = _pairs(positions)
+        courses = table.enrollment_column("course")[enrollments]
+        exam = self._enrollment_exam[enrollments][second]
+        size = len(self._together)
+        flat = courses[first] * size + courses[second]
+        passed = exam > 0
+        self._together += sign * np.bincount(flat, minlength=size * size).reshape(size, size)
+        self._passed += sign * np.bincount(flat[passed], minlength=size * size).reshape(size, size)
+        self._success += sign * np.bincount(
+            flat[passed], weights=exam[passed] / 100.0, minlength=size * size
+        ).reshape(size, size)
+
+    def _ensure_capacity(self, table: StudentTable) -> None:
+        grow = len(table.course_names) - len(self._together)
+        if grow > 0:
+            for name in ("_together", "_passed", "_success"):
+                setattr(self, name, np.pad(getattr(self, name), ((0, grow), (0, grow))))
+        if table.num_enrollments > len(self._enrollment_exam):
+            capacity = max(table.num_enrollments, 2 * len(self._enrollment_exam), 16)
+            grown = np.full(capacity, np.nan)
+            grown[:len(self._enrollment_exam)] = self._enrollment_exam
+            self._enrollment_exam = grown
@@ -0,0 +1,135 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import ContextManager, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from config.settings import Config
+
+# Upper bounds in seconds, from sub-millisecond lookups to full dataset loads
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+# Upper bounds for batch sizes in rows
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+_DISABLED = nullcontext()
+
+
+class Metric(NamedTuple):
+    """A counter or gauge to render next to the histograms."""
+    name: str
+    kind: str  # "counter" or "gauge"
+    help: str
+    samples: List[Tuple[Dict[str, str], float]]
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus layout."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Cumulative counts per bucket (ending with +Inf) and the sum of observations."""
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        for i in range(1, len(counts)):
+            counts[i] += counts[i - 1]
+        return counts, total
+
+
+class _StageTimer:
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram: Histogram):
+        self._histogram = histogram
+
+    def __enter__(self) -> "_StageTimer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        self._histogram.observe(time.perf_counter() - self._start)
+        return False
+
+
+class MetricsRegistry:
+    """Per-stage latency histograms for the recommendation pipeline.
+
+    ``stage(name)`` returns a shared no-op context manager while the
+    registry is disabled, so instrumented code costs a method call and
+    nothing else.
+    """
+
+    def __init__(self, enabled: bool = True, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._histograms: Dict[str, Histogram] = {}
+        self._sizes: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, name: str, family: str = "_histograms", buckets: Optional[Tuple] = None) -> Histogram:
+        histograms = getattr(self, family)
+        histogram = histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = histograms.setdefault(name, Histogram(buckets or self.buckets))
+        return histogram
+
+    def stage(self, name: str) -> ContextManager:
+        if not self.enabled:
+            return _DISABLED
+        return _StageTimer(self._histogram(name))
+
+    def observe(self, name: str, seconds: float) -> None:
+        if self.enabled:
+            self._histogram(name).observe(seconds)
+
+    def observe_size(self, name: str, rows: int) -> None:
+        """Record the number of rows in one batch of the batcher ``name``."""
+        if self.enabled:
+            self._histogram(name, "_sizes", SIZE_BUCKETS).observe(rows)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms = {}
+            self._sizes = {}
+
+    def render(self, extra: Iterable[Metric] = ()) -> str:
+        """The histograms and ``extra`` metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric, label, help, histograms in (
+            ("recommender_stage_seconds", "stage", "Time spent in each recommendation pipeline stage.", self._histograms),
+            ("recommender_batch_rows", "batcher", "Rows per micro-batch.", self._sizes),
+        ):
+            lines.append(f"# HELP {metric} {help}")
+            lines.append(f"# TYPE {metric} histogram")
+            for name, histogram in sorted(histograms.items()):
+                counts, total = histogram.snapshot()
+                for bound, count in zip(histogram.buckets + (float("inf"),), counts):
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{metric}_bucket{{{label}="{name}",le="{le}"}} {count}')
+                lines.append(f'{metric}_sum{{{label}="{name}"}} {total!r}')
+                lines.append(f'{metric}_count{{{label}="{name}"}} {counts[-1]}')
+        for metric in extra:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, value in metric.samples:
+                rendered = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+                lines.append(f"{metric.name}{{{rendered}}} {value!r}" if rendered else f"{metric.name} {value!r}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+registry = MetricsRegistry(enabled=getattr(Config, "METRICS_ENABLED", True))
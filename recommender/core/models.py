@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict, Optional
 from datetime import datetime
 from enum import Enum
@@ -60,6 +60,97 @@ class Course:
     average_time_spent: float
     difficulty: Optional[float] = None
 
+@dataclass
+class RunningStats:
+    """Streaming mean/variance accumulator for one metric; values can be added and removed.
+
+    Keeps the mean and the sum of squared deviations from it (Welford's
+    method, merged in batches with Chan's formula) rather than a sum of
+    squares, whose difference with the squared mean cancels catastrophically.
+    """
+    count: int = 0
+    mean: float = 0.0
+    squared_deviations: float = 0.0
+
+    def add(self, value: float) -> None:
+        self._merge(1, value, 0.0)
+
+    def remove(self, value: float) -> None:
+        self._unmerge(1, value, 0.0)
+
+    def add_many(self, values) -> None:
+        if len(values):
+            mean = float(values.mean())
+            self._merge(len(values), mean, float(((values - mean) ** 2).sum()))
+
+    def remove_many(self, values) -> None:
+        if len(values):
+            mean = float(values.mean())
+            self._unmerge(len(values), mean, float(((values - mean) ** 2).sum()))
+
+    @property
+    def variance(self) -> float:
+        return self.squared_deviations / self.count if self.count else 0.0
+
+    def _merge(self, count: int, mean: float, squared_deviations: float) -> None:
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.squared_deviations += squared_deviations + delta * delta * self.count * count / total
+        self.count = total
+
+    def _unmerge(self, count: int, mean: float, squared_deviations: float) -> None:
+        """Inverse of ``_merge``: take out values with the given count, mean and squared deviations."""
+        remaining = self.count - count
+        if remaining <= 0:
+            self.count, self.mean, self.squared_deviations = 0, 0.0, 0.0
+            return
+        rest_mean = self.mean - (mean - self.mean) * count / remaining
+        delta = mean - rest_mean
+        self.squared_deviations = max(
+            0.0, self.squared_deviations - squared_deviations - delta * delta * remaining * count / self.count
+        )
+        self.mean = rest_mean
+        self.count = remaining
+
+@dataclass
+class CourseStats:
+    """Per-course accumulators behind the running averages on ``Course``."""
+    completion_rate: RunningStats = field(default_factory=RunningStats)
+    quiz_score: RunningStats = field(default_factory=RunningStats)
+    time_spent: RunningStats = field(default_factory=RunningStats)
+    final_exam_score: RunningStats = field(default_factory=RunningStats)
+
+    def add(self, completion_rate: float, quiz_score: float, time_spent: float, final_exam_score: float) -> None:
+        self.completion_rate.add(completion_rate)
+        self.quiz_score.add(quiz_score)
+        self.time_spent.add(time_spent)
+        self.final_exam_score.add(final_exam_score)
+
+    def remove(self, completion_rate: float, quiz_score: float, time_spent: float, final_exam_score: float) -> None:
+        self.completion_rate.remove(completion_rate)
+        self.quiz_score.remove(quiz_score)
+        self.time_spent.remove(time_spent)
+        self.final_exam_score.remove(final_exam_score)
+
+    def add_many(self, completion_rate, quiz_score, time_spent, final_exam_score) -> None:
+        """Add NumPy arrays of values, one entry per enrollment."""
+        self.completion_rate.add_many(completion_rate)
+        self.quiz_score.add_many(quiz_score)
+        self.time_spent.add_many(time_spent)
+        self.final_exam_score.add_many(final_exam_score)
+
+    def remove_many(self, completion_rate, quiz_score, time_spent, final_exam_score) -> None:
+        self.completion_rate.remove_many(completion_rate)
+        self.quiz_score.remove_many(quiz_score)
+        self.time_spent.remove_many(time_spent)
+        self.final_exam_score.remove_many(final_exam_score)
+
+    def apply_to(self, course: "Course") -> None:
+        course.average_completion_rate = self.completion_rate.mean
+        course.average_quiz_score = self.quiz_score.mean
+        course.average_time_spent = self.time_spent.mean
+
 @dataclass
 class Recommendation:
     course_name: str
@@ -0,0 +1,173 @@
+import fcntl
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import IO, Callable, Optional
+from .services import RecommendationService, fit_dropout_classifier, model_selector
+from ..ai.classifier import DropoutClassifier
+from config.settings import Config
+
+
+class RetrainingScheduler:
+    """Retrains a service's dropout model in a worker process and hot-swaps it in.
+
+    A retrain starts once ``interval`` seconds have passed since the last one,
+    or once the students re-encoded since then reach ``drift_threshold`` as a
+    share of all students (either trigger is off when 0). The request
+    threads only pay for copying the feature snapshot and for the swap in
+    ``RecommendationService.install_classifier``; fitting and scoring every
+    student happen in the worker.
+    """
+
+    def __init__(
+        self,
+        service: RecommendationService,
+        interval: float = 0,
+        drift_threshold: float = 0.0,
+        check_interval: float = 30,
+        executor: Optional[Executor] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.service = service
+        self.interval = interval
+        self.drift_threshold = drift_threshold
+        self.check_interval = check_interval
+        self._executor = executor
+        self._clock = clock
+        self.last_trained = clock()
+        self.retrains = 0
+        self.last_error: Optional[BaseException] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, service: RecommendationService, config=Config) -> "RetrainingScheduler":
+        return cls(
+            service,
+            interval=getattr(config, "RETRAIN_INTERVAL", 0),
+            drift_threshold=getattr(config, "RETRAIN_DRIFT_THRESHOLD", 0.0),
+            check_interval=getattr(config, "RETRAIN_CHECK_INTERVAL", 30)
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.interval or self.drift_threshold)
+
+    def drift(self) -> float:
+        """Students re-encoded since the last training, as a share of all students."""
+        return self.service.rows_changed_since_training / max(1, len(self.service.students))
+
+    def should_retrain(self) -> bool:
+        if self.interval and self._clock() - self.last_trained >= self.interval:
+            return True
+        return bool(self.drift_threshold) and self.drift() >= self.drift_threshold
+
+    def retrain(self) -> None:
+        """Train on a snapshot of the current features and install the result."""
+        service = self.service
+        X, y = service.training_snapshot()
+        self.last_trained = self._clock()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=1)
+        future = self._executor.submit(
+            fit_dropout_classifier, X, y, service.preprocessor.feature_columns,
+            getattr(service.config, "MODEL_PATH", None), service.classifier.threshold,
+            model_selector(service.config)
+        )
+        classifier, probabilities = future.result()
+        service.install_classifier(classifier, X, probabilities)
+        self.retrains += 1
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="dropout-retraining", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.check_interval):
+            if not self.should_retrain():
+                continue
+            try:
+                self.retrain()
+                self.last_error = None
+            except Exception as error:  # keep serving with the current model
+                self.last_error = error
+                print(f"Background retraining failed: {error}")
+
+
+class ModelWatcher:
+    """Installs the model artifact at ``model_path`` whenever another process saves a new one.
+
+    Server processes that do not retrain follow the one that does (see
+    ``DataManager.start_retraining``), so every process serves the same
+    model. Each new artifact is unpickled under a shared lock and scored
+    on this process's students before the swap.
+    """
+
+    def __init__(self, service: RecommendationService, model_path: str, check_interval: float = 30):
+        self.service = service
+        self.model_path = model_path
+        self.check_interval = check_interval
+        self.retrains = 0  # models installed
+        self.last_error: Optional[BaseException] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self) -> bool:
+        """Install the artifact if its version differs from the served model's; whether it did."""
+        metadata = DropoutClassifier.read_metadata(self.model_path) or {}
+        version = metadata.get("model_version")
+        if version is None or version == self.service.classifier.metadata.get("model_version"):
+            return False
+        classifier = DropoutClassifier.load_now(self.model_path)
+        X, _ = self.service.training_snapshot()
+        self.service.install_classifier(classifier, X, classifier.predict_proba(X))
+        self.retrains += 1
+        return True
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="dropout-model-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.check_interval):
+            try:
+                self.check()
+                self.last_error = None
+            except Exception as error:  # keep serving with the current model
+                self.last_error = error
+                print(f"Reloading the dropout model failed: {error}")
+
+
+def try_lock(path: str) -> Optional[IO]:
+    """Open ``path`` and take an exclusive lock on it without waiting; None if another process holds it.
+
+    The lock lasts as long as the returned file stays open.
+    """
+    file = open(path, "a")
+    try:
+        fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        file.close()
+        return None
+    return file
@@ -0,0 +1,161 @@
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from .analytics import RISK_BIN_EDGES, RISK_BIN_LABELS
+from .table import DirtyRows, StudentTable, LEARNING_STYLES
+
+# Student fields the roster can be filtered by
+ROSTER_FILTERS = ("course", "learning_style", "risk_band")
+
+
+def risk_bands(scores: np.ndarray) -> np.ndarray:
+    """Index into ``RISK_BIN_LABELS`` per score, -1 for students not scored yet."""
+    bands = np.searchsorted(RISK_BIN_EDGES, scores, side="left")
+    bands[np.isnan(scores)] = -1
+    return bands
+
+
+class RosterIndex:
+    """Sorted table rows per course, learning style and dropout-risk band.
+
+    Listing students with a filter walks the shortest matching row list
+    after the cursor and checks the other filters against their lists, so
+    it touches only the rows it returns, never the whole table. Row lists
+    are replaced rather than modified, so a listing in progress keeps
+    iterating a consistent snapshot.
+
+    Rows are picked up lazily like in ``FeatureStore``: new rows and
+    enrollments, and rows marked dirty (changed style or score), are
+    indexed on the next query. Past an eighth of the table the lists are
+    rebuilt instead.
+    """
+
+    def __init__(self):
+        self._rows: Dict[Tuple[str, int], np.ndarray] = {}
+        self._style = np.zeros(0, dtype=np.int64)  # as indexed, per row
+        self._band = np.zeros(0, dtype=np.int64)
+        self._size = 0
+        self._enrollments = 0
+        self._dirty = DirtyRows()
+        self._lock = threading.Lock()
+
+    def mark_dirty(self, rows) -> None:
+        self._dirty.add(rows)
+
+    def parse_filters(self, table: StudentTable, filters: Optional[Dict[str, str]]) -> List[Tuple[str, int]]:
+        """``(field, code)`` keys for ``filters``; raises ValueError for an unknown field or value."""
+        keys = []
+        for name, value in (filters or {}).items():
+            if name == "course":
+                if value not in table.course_index:
+                    raise ValueError(f"Unknown course {value}")
+                keys.append((name, table.course_index[value]))
+            elif name == "learning_style":
+                keys.append((name, LEARNING_STYLES.index(LEARNING_STYLES[0].__class__(value))))
+            elif name == "risk_band":
+                if value not in RISK_BIN_LABELS:
+                    raise ValueError(f"Unknown risk band {value}; expected one of {', '.join(RISK_BIN_LABELS)}")
+                keys.append((name, RISK_BIN_LABELS.index(value)))
+            else:
+                raise ValueError(f"Cannot filter by {name}; expected one of {', '.join(ROSTER_FILTERS)}")
+        return keys
+
+    def iter_rows(
+        self, table: StudentTable, filters: Optional[Dict[str, str]] = None, after: int = -1, chunk_size: int = 1000
+    ) -> Iterator[np.ndarray]:
+        """Ascending chunks of the rows after ``after`` that match every filter.
+
+        Filters are validated before the first chunk is requested.
+        """
+        keys = self.parse_filters(table, filters)
+        with self._lock:
+            self._refresh(table)
+            lists = sorted((self._rows.get(key, np.zeros(0, dtype=np.int64)) for key in keys), key=len)
+        return self._iter_rows(lists, len(table), after, chunk_size)
+
+    def course_rows(self, table: StudentTable) -> Dict[int, np.ndarray]:
+        """Course code to the sorted rows of the students enrolled in it."""
+        with self._lock:
+            self._refresh(table)
+            return {code: rows for (field, code), rows in self._rows.items() if field == "course"}
+
+    @staticmethod
+    def _iter_rows(lists: List[np.ndarray], size: int, after: int, chunk_size: int) -> Iterator[np.ndarray]:
+        primary, others = (lists[0], lists[1:]) if lists else (None, [])
+        start = int(np.searchsorted(primary, after, side="right")) if primary is not None else after + 1
+        end = len(primary) if primary is not None else size
+        for offset in range(start, end, chunk_size):
+            chunk = primary[offset:offset + chunk_size] if primary is not None else np.arange(offset, min(end, offset + chunk_size))
+            for rows in others:
+                if not len(rows):
+                    return
+                chunk = chunk[rows[np.minimum(np.searchsorted(rows, chunk), len(rows) - 1)] == chunk]
+            if len(chunk):
+                yield chunk
+
+    def _refresh(self, table: StudentTable) -> None:
+        size = len(table)
+        if not self._dirty and size == self._size and table.num_enrollments == self._enrollments and size:
+            return
+        dirty = self._dirty.take(self._size)
+        if len(dirty) * 8 > self._size or not self._size:
+            self._rebuild(table)
+            return
+        if len(self._style) < size:
+            capacity = max(size, 2 * len(self._style), 16)
+            self._style = np.resize(self._style, capacity)
+            self._band = np.resize(self._band, capacity)
+
+        new = np.arange(self._size, size)
+        for field, recorded, current in (
+            ("learning_style", self._style, table.column("learning_style")[:size].astype(np.int64)),
+            ("risk_band", self._band, risk_bands(table.column("predicted_dropout_score")[:size])),
+        ):
+            changed = dirty[recorded[dirty] != current[dirty]]
+            for code in np.unique(recorded[changed]):
+                if code < 0:  # unscored rows are in no risk band list
+                    continue
+                key = (field, int(code))
+                self._rows[key] = np.setdiff1d(self._rows[key], changed[recorded[changed] == code], assume_unique=True)
+            added = np.concatenate((changed, new))
+            for code in np.unique(current[added]):
+                if code >= 0:
+                    key = (field, int(code))
+                    self._rows[key] = np.union1d(self._rows.get(key, np.zeros(0, dtype=np.int64)), added[current[added] == code])
+            recorded[added] = current[added]
+
+        enrollments = np.arange(self._enrollments, table.num_enrollments)
+        students = table.enrollment_column("student")[enrollments].astype(np.int64)
+        courses = table.enrollment_column("course")[enrollments]
+        for code in np.unique(courses):
+            key = ("course", int(code))
+            self._rows[key] = np.union1d(self._rows.get(key, np.zeros(0, dtype=np.int64)), students[courses == code])
+        self._size, self._enrollments = size, table.num_enrollments
+
+    def _rebuild(self, table: StudentTable) -> None:
+        size = len(table)
+        self._style = table.column("learning_style")[:size].astype(np.int64)
+        self._band = risk_bands(table.column("predicted_dropout_score")[:size])
+        rows = {}
+        for field, codes in (("learning_style", self._style), ("risk_band", self._band)):
+            order = np.argsort(codes, kind="stable")
+            for code, start, end in _runs(codes[order]):
+                if code >= 0:
+                    rows[(field, code)] = order[start:end]
+        students = table.enrollment_column("student").astype(np.int64)
+        courses = table.enrollment_column("course")
+        order = np.lexsort((students, courses))
+        for code, start, end in _runs(courses[order]):
+            rows[("course", code)] = students[order[start:end]]
+        self._rows = rows
+        self._size, self._enrollments = size, table.num_enrollments
+
+
+def _runs(values: np.ndarray) -> Iterator[Tuple[int, int, int]]:
+    """``(value, start, end)`` for each run of equal values in sorted ``values``."""
+    boundaries = np.flatnonzero(np.diff(values)) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(values)]))
+    for start, end in zip(starts, ends):
+        if end > start:
+            yield int(values[start]), int(start), int(end)
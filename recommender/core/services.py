@@ -1,64 +1,515 @@
-from typing import List, Optional, Dict
-from ..core.models import StudentProfile, Course, Recommendation, LearningStyle, EngagementLevel, Gender, EducationLevel
-from ..algorithms.similarity import CosineSimilarity
+from typing import TYPE_CHECKING, FrozenSet, Iterator, List, NamedTuple, Optional, Dict, Tuple
+from ..core.models import StudentProfile, Course, CourseStats, Recommendation, LearningStyle, EngagementLevel, Gender, EducationLevel
+from ..core.table import (
+    StudentTable, StudentView, METRIC_FIELDS, STUDENT_VALUE_FIELDS,
+    GENDERS, EDUCATION_LEVELS, LEARNING_STYLES, ENGAGEMENT_LEVELS
+)
+from ..core.cache import TTLCache
+from ..core.analytics import AnalyticsAggregates
+from ..core.roster import RosterIndex
+from ..core.cooccurrence import CourseCooccurrence
+from ..core.metrics import registry as metrics
+from ..core.batching import MicroBatcher
+from ..algorithms.similarity import CosineSimilarity, SimilarityIndex, IVFSimilarityIndex
 from ..algorithms.recommender import CourseRecommender
 from ..ai.preprocessor import DataPreprocessor
-from ..ai.classifier import DropoutClassifier
-from datetime import datetime
+from ..ai.features import FeatureStore
+from ..ai.classifier import DropoutClassifier, ModelNotTrainedError, training_data_hash
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
 from sklearn.ensemble import RandomForestClassifier
 import numpy as np
+import threading
+import time
+from datetime import datetime
+from config.settings import Config
+
+if TYPE_CHECKING:
+    from ..ai.model_selection import ModelSelector
+
+ENROLLMENT_VALUE_FIELDS = METRIC_FIELDS + ("quiz_attempts", "final_exam_score", "feedback_score")
+# Enrollment columns feeding CourseStats, in CourseStats.add argument order
+COURSE_STAT_FIELDS = ("assignment_completion_rate", "quiz_scores", "time_spent_on_videos", "final_exam_score")
+SIMILAR_STUDENTS = 5  # neighbors consulted per recommendation
+# Enum-coded student fields an event may carry, with their members in code order
+EVENT_ENUM_FIELDS = {
+    "gender": GENDERS,
+    "education_level": EDUCATION_LEVELS,
+    "learning_style": LEARNING_STYLES,
+    "engagement_level": ENGAGEMENT_LEVELS,
+}
+# Fields an event must give to create a student; dropout_likelihood defaults to False
+EVENT_REQUIRED_STUDENT_FIELDS = ("age", "gender", "education_level", "learning_style", "engagement_level")
+# Past this many changed students, cached recommendations are dropped wholesale
+PRECISE_INVALIDATION_LIMIT = 1024
+
+
+def model_selector(config=Config) -> Optional["ModelSelector"]:
+    """``ModelSelector.from_config``; model selection is only imported when ``Config.MODEL_SELECTION`` is set."""
+    if not getattr(config, "MODEL_SELECTION", False):
+        return None
+    from ..ai.model_selection import ModelSelector
+    return ModelSelector.from_config(config)
+
+
+def fit_dropout_classifier(
+    X: np.ndarray,
+    y: np.ndarray,
+    feature_columns: List[str],
+    model_path: Optional[str] = None,
+    threshold: float = 0.2,
+    selector: Optional["ModelSelector"] = None
+) -> Tuple[DropoutClassifier, np.ndarray]:
+    """Fit (or reuse) a dropout model on a feature snapshot and score every row of it.
+
+    With a ``selector`` the model and its threshold come from a
+    cross-validated search; otherwise a Random Forest is evaluated on a
+    held-out split at the fixed ``threshold``. Touches no service state,
+    so it can run in a worker process.
+    """
+    data_hash = training_data_hash(X, y)
+    if model_path and DropoutClassifier.is_compatible(model_path, feature_columns, data_hash):
+        classifier = DropoutClassifier.load(model_path)
+        print(f"Reusing dropout model {classifier.metadata.get('model_version')} from {model_path}")
+        return classifier, classifier.predict_proba(X)
+
+    results = selector.evaluate(X, y) if selector is not None else []
+    if results:
+        print("Dropout model selection (out-of-fold):")
+        for result in results:
+            print(f"- {result.name}: F{selector.beta:g}={result.score:.4f} AUC={result.roc_auc:.4f} "
+                  f"threshold={result.threshold:.3f} fit={result.fit_seconds:.2f}s/fold "
+                  f"inference={result.inference_us_per_row:.1f}us/row single={result.single_row_ms:.2f}ms")
+        best = results[0]
+        classifier = DropoutClassifier(threshold=best.threshold)
+        classifier.model = selector.estimator(best)
+        classifier.train(X, y)
+        y_test, y_prob, threshold = y, best.oof_probabilities, best.threshold
+    else:
+        if selector is not None:
+            print("No dropout model finished cross-validation within the budget; using the default model")
+        classifier = DropoutClassifier(threshold=threshold)
+        # Split data into training and testing sets
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+        # Train with Random Forest
+        classifier.model = RandomForestClassifier(n_estimators=100, class_weight="balanced", random_state=42)
+        classifier.train(X_train, y_train)
+        y_prob = classifier.predict_proba(X_test)  # Already 1D dropout probabilities
+
+    # Evaluate with the decision threshold
+    y_pred_adjusted = [1 if prob > threshold else 0 for prob in y_prob]
+    accuracy = accuracy_score(y_test, y_pred_adjusted)
+    report = classification_report(y_test, y_pred_adjusted, target_names=["No Dropout", "Dropout"], zero_division=0)
+    print(f"Dropout Classifier Accuracy (threshold={threshold:.3f}): {accuracy:.4f}")
+    print(f"Classification Report (threshold={threshold:.3f}):")
+    print(report)
+
+    classifier.metadata = {
+        "feature_columns": feature_columns,
+        "num_features": len(X[0]) if len(X) else 0,
+        "training_data_hash": data_hash,
+        "training_samples": len(y),
+        "model_version": datetime.now().strftime("%Y%m%d%H%M%S"),
+        "metrics": {
+            "accuracy": accuracy,
+            "report": classification_report(
+                y_test, y_pred_adjusted, target_names=["No Dropout", "Dropout"], output_dict=True, zero_division=0
+            )
+        }
+    }
+    if results:
+        classifier.metadata["selection"] = [result.summary() for result in results]
+    if model_path:
+        classifier.save(model_path)
+    return classifier, classifier.predict_proba(X)
+
+
+class CachedRecommendations(NamedTuple):
+    """A cached result plus what it depends on besides the student's own data."""
+    recommendations: List[Recommendation]
+    neighbor_ids: FrozenSet[str]
+    kth_score: float  # a changed student scoring at least this would join the neighbors
+
 
 class RecommendationService:
-    def __init__(self):
+    def __init__(self, config=Config):
+        self.config = config
         self.similarity_calculator = CosineSimilarity()
+        self.similarity_index = self._create_similarity_index()
+        self.neighbor_search = getattr(config, "COLLABORATIVE_NEIGHBORS", "global")
+        if self.neighbor_search not in ("per_course", "global", "item"):
+            raise ValueError(f"Unknown collaborative neighbor search: {self.neighbor_search}")
+        self._matrix_rows = np.zeros(0, dtype=np.intp)  # similarity matrix row of each table row
+        self._table_rows = np.zeros(0, dtype=np.intp)  # and the reverse, -1 where none
+        self._course_postings: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
         self.recommender = CourseRecommender()
-        self.students: Dict[str, StudentProfile] = {}
+        self.students = StudentTable()
         self.courses: Dict[str, Course] = {}
+        self.course_stats: Dict[str, CourseStats] = {}
+        self._style_weights: Optional[np.ndarray] = None  # learning style x course, rebuilt when courses change
+        self.features = FeatureStore()
+        self.analytics = AnalyticsAggregates()
+        self.roster = RosterIndex()
+        self.cooccurrence = CourseCooccurrence()
         self.preprocessor = DataPreprocessor()
         self.classifier = DropoutClassifier()
+        self._model_lock = threading.Lock()  # guards swapping the classifier and its scores
+        self._features_lock = threading.RLock()  # serializes table writes and refresh_features with background snapshots
+        self.rows_changed_since_training = 0
+        cache_timeout = getattr(config, "CACHE_TIMEOUT", 0) or 0
+        cache_entries = getattr(config, "CACHE_MAX_ENTRIES", 10_000)
+        self.recommendation_cache = TTLCache(cache_entries, cache_timeout)
+        self.profile_cache = TTLCache(cache_entries, cache_timeout)
+        self._index_generation = self.similarity_index.generation
+        self.dropout_batcher = MicroBatcher(
+            lambda X: self.classifier.predict_proba(X),
+            max_rows=getattr(config, "DROPOUT_BATCH_MAX_ROWS", 64),
+            max_wait=getattr(config, "DROPOUT_BATCH_WAIT_MS", 2) / 1000.0,
+            name="dropout_score"
+        )
+
+    def warm_up(self) -> None:
+        """Build everything that is otherwise created lazily on first use.
+
+        Called in a pre-fork server's master so the workers inherit these
+        structures instead of each building a private copy.
+        """
+        self.refresh_features()
+        self.students.index
+        self.students.enrollment_blocks()
+        self.similarity_index.warm_up()
+        self.analytics.summary(self.students, self.courses)
+        self.cooccurrence.matrices(self.students)
+        if self._style_weights is None:
+            self._style_weights = self.recommender.style_weights(list(self.courses.values()))
+        if self.classifier.is_trained:
+            self.classifier.flat_forest  # loads the model too
+
+    def _create_similarity_index(self) -> SimilarityIndex:
+        search = getattr(self.config, "SIMILARITY_SEARCH", "exact")
+        if search == "exact":
+            return SimilarityIndex(self.similarity_calculator)
+        if search == "ivf":
+            return IVFSimilarityIndex(
+                self.similarity_calculator,
+                n_lists=self.config.IVF_NUM_LISTS,
+                n_probe=self.config.IVF_NUM_PROBES
+            )
+        raise ValueError(f"Unknown similarity search method: {search}")
 
     def load_student_from_csv_row(self, row: Dict) -> None:
-        student_id = row["Student_ID"]
-        course_name = row["Course_Name"]
-        engagement_metrics = {
-            "time_spent_on_videos": float(row["Time_Spent_on_Videos"]),
-            "quiz_scores": float(row["Quiz_Scores"]),
-            "forum_participation": float(row["Forum_Participation"]),
-            "assignment_completion_rate": float(row["Assignment_Completion_Rate"])
-        }
+        with self._features_lock:
+            student_id = row["Student_ID"]
+            course_name = row["Course_Name"]
+            engagement_metrics = {
+                "time_spent_on_videos": float(row["Time_Spent_on_Videos"]),
+                "quiz_scores": float(row["Quiz_Scores"]),
+                "forum_participation": float(row["Forum_Participation"]),
+                "assignment_completion_rate": float(row["Assignment_Completion_Rate"])
+            }
 
-        if student_id in self.students:
-            student = self.students[student_id]
-            student.course_history.append(course_name)
-            student.engagement_metrics[course_name] = engagement_metrics
-            student.quiz_attempts[course_name] = int(row["Quiz_Attempts"])
-            student.final_exam_scores[course_name] = float(row["Final_Exam_Score"])
-            student.feedback_scores[course_name] = int(row["Feedback_Score"])
-            student.last_updated = datetime.now()
-        else:
-            student = StudentProfile(
-                student_id=student_id,
-                age=int(row["Age"]),
-                gender=row["Gender"],
-                education_level=row["Education_Level"],
-                learning_style=row["Learning_Style"],
-                course_history=[course_name],
-                engagement_metrics={course_name: engagement_metrics},
-                quiz_attempts={course_name: int(row["Quiz_Attempts"])},
-                engagement_level=row["Engagement_Level"],
-                final_exam_scores={course_name: float(row["Final_Exam_Score"])},
-                feedback_scores={course_name: int(row["Feedback_Score"])},
-                dropout_likelihood=row["Dropout_Likelihood"] == "Yes",
-                last_updated=datetime.now()
+            row_index = self.students.index.get(student_id)
+            if row_index is None:
+                row_index = self.students.append_student(
+                    student_id=student_id,
+                    age=int(row["Age"]),
+                    gender=row["Gender"],
+                    education_level=row["Education_Level"],
+                    learning_style=row["Learning_Style"],
+                    engagement_level=row["Engagement_Level"],
+                    dropout_likelihood=row["Dropout_Likelihood"] == "Yes"
+                )
+            else:
+                self.students.touch(row_index)
+            previous = self.students.set_enrollment(
+                row_index,
+                course_name,
+                engagement_metrics,
+                quiz_attempts=int(row["Quiz_Attempts"]),
+                final_exam_score=float(row["Final_Exam_Score"]),
+                feedback_score=int(row["Feedback_Score"])
             )
-            self.students[student_id] = student
+            if previous is not None:
+                previous = (
+                    previous["assignment_completion_rate"],
+                    previous["quiz_scores"],
+                    previous["time_spent_on_videos"],
+                    previous["final_exam_score"]
+                )
+
+            self._students_changed(row_index)
+            self._update_course_from_row(row, previous)
+
+    def load_student_batch(self, batch: Dict[str, np.ndarray]) -> None:
+        """Apply many CSV rows at once, with the same result as loading them row by row.
+
+        ``batch`` holds one array per ``StudentTable`` column plus
+        ``student_id`` and ``course_name``; enum columns are given as codes.
+        """
+        with self._features_lock:
+            table = self.students
+            student_ids = batch["student_id"]
+            index = table.index
+            rows = np.fromiter((index.get(sid, -1) for sid in student_ids), dtype=np.int64, count=len(student_ids))
+            unknown = np.flatnonzero(rows < 0)
+            if len(unknown):
+                first_seen: Dict[str, int] = {}
+                for position in unknown:
+                    first_seen.setdefault(student_ids[position], position)
+                positions = np.fromiter(first_seen.values(), dtype=np.int64, count=len(first_seen))
+                table.append_students(list(first_seen), {name: batch[name][positions] for name in STUDENT_VALUE_FIELDS})
+                rows[unknown] = [index[student_ids[position]] for position in unknown]
+            touched = np.unique(rows)
+            table.column("last_updated")[touched] = datetime.now().timestamp()
+
+            enrollment_values = {name: batch[name] for name in ENROLLMENT_VALUE_FIELDS}
+            enrollments, previous = table.upsert_enrollments(rows, batch["course_name"], enrollment_values)
+            courses = table.enrollment_column("course")[enrollments]
+            replaced = ~np.isnan(previous["final_exam_score"])
+            for code in np.unique(courses):
+                course_name = table.course_names[code]
+                self._ensure_course(course_name)
+                stats = self.course_stats[course_name]
+                selected = courses == code
+                removed = selected & replaced
+                stats.remove_many(*(previous[name][removed] for name in COURSE_STAT_FIELDS))
+                stats.add_many(*(table.enrollment_column(name)[enrollments[selected]] for name in COURSE_STAT_FIELDS))
+                stats.apply_to(self.courses[course_name])
+
+            self._students_changed(touched)
+
+    def apply_events(self, events: List[Dict]) -> List[str]:
+        """Apply quiz, exam and engagement events in place, without reloading the dataset.
+
+        Each event names a ``student_id`` and ``course_name`` and may set any
+        of ``ENROLLMENT_VALUE_FIELDS`` and ``engagement_level``; fields it
+        leaves out keep their current value (0 on a new enrollment). An event
+        for an unknown student creates it and must also carry
+        ``EVENT_REQUIRED_STUDENT_FIELDS``. Events apply in order. Course
+        aggregates, feature rows, the similarity index, cached results and
+        dropout scores are updated for the touched students only.
+
+        Returns the IDs of the touched students. Raises ValueError, before
+        anything is changed, if an event is malformed. Like every table
+        write, the whole call holds ``_features_lock``, so concurrent calls
+        and background retraining never see a half-applied batch.
+        """
+        with self._features_lock:
+            table = self.students
+            enrollments: Dict[Tuple[str, str], Dict[str, float]] = {}
+            new_students: Dict[str, Dict] = {}
+            engagement: Dict[str, int] = {}
+            for position, event in enumerate(events):
+                try:
+                    student_id, course_name = event["student_id"], event["course_name"]
+                    if not isinstance(student_id, str) or not isinstance(course_name, str) or not student_id or not course_name:
+                        raise ValueError("'student_id' and 'course_name' must be non-empty strings")
+                    if student_id not in table and student_id not in new_students:
+                        missing = [name for name in EVENT_REQUIRED_STUDENT_FIELDS if name not in event]
+                        if missing:
+                            raise ValueError(f"new student {student_id} needs {', '.join(missing)}")
+                        new_students[student_id] = {
+                            "age": int(event["age"]),
+                            "dropout_likelihood": event.get("dropout_likelihood", False) in (True, "Yes"),
+                            **{name: members.index(members[0].__class__(event[name])) for name, members in EVENT_ENUM_FIELDS.items()}
+                        }
+                    if "engagement_level" in event:
+                        engagement[student_id] = ENGAGEMENT_LEVELS.index(EngagementLevel(event["engagement_level"]))
+                    key = (student_id, course_name)
+                    values = enrollments.pop(key, None) or self._enrollment_values(student_id, course_name)
+                    values.update((name, float(event[name])) for name in ENROLLMENT_VALUE_FIELDS if name in event)
+                    enrollments[key] = values
+                except KeyError as error:
+                    raise ValueError(f"Invalid event {position}: missing {error}") from error
+                except (TypeError, ValueError) as error:
+                    raise ValueError(f"Invalid event {position}: {error}") from error
+
+            if not enrollments:
+                return []
+            keys = list(enrollments)
+            student_ids = np.array([student_id for student_id, _ in keys], dtype=object)
+            batch = {
+                "student_id": student_ids,
+                "course_name": np.array([course_name for _, course_name in keys], dtype=object),
+                **{name: np.array([enrollments[key][name] for key in keys]) for name in ENROLLMENT_VALUE_FIELDS},
+                **{
+                    name: np.array([new_students.get(student_id, {}).get(name, 0) for student_id in student_ids])
+                    for name in STUDENT_VALUE_FIELDS
+                }
+            }
+            self.load_student_batch(batch)
+
+            if engagement:
+                rows = np.array([table.index[student_id] for student_id in engagement], dtype=np.int64)
+                table.column("engagement_level")[rows] = list(engagement.values())
+            touched = list(dict.fromkeys(student_ids))
+            rows = np.array([table.index[student_id] for student_id in touched], dtype=np.int64)
+            self.refresh_features()
+            with self._model_lock:
+                if self.classifier.is_trained:
+                    table.column("predicted_dropout_score")[rows] = self.classifier.predict_proba(self.features.classifier[rows])
+            self.analytics.mark_dirty(rows)
+            self.roster.mark_dirty(rows)
+            return touched
+
+    def score_profiles(self, profiles: List[Dict]) -> Tuple[np.ndarray, int]:
+        """Dropout scores for profiles that are not in the dataset, and the size of the batch that scored them.
+
+        Each profile carries ``EVENT_REQUIRED_STUDENT_FIELDS`` and optionally
+        ``courses``, a list of objects with a ``course_name`` and any of
+        ``ENROLLMENT_VALUE_FIELDS`` (0 when left out). The profiles are
+        encoded by ``DataPreprocessor`` and scored through
+        ``dropout_batcher`` together with concurrent callers' profiles.
+        Raises ValueError if a profile is malformed, and
+        ``ModelNotTrainedError`` before the classifier is trained.
+        """
+        if not self.classifier.is_trained:
+            raise ModelNotTrainedError("Dropout model is not trained")
+        students = []
+        for position, profile in enumerate(profiles):
+            try:
+                students.append(self._profile_from_dict(profile))
+            except KeyError as error:
+                raise ValueError(f"Invalid profile {position}: missing {error}") from error
+            except (TypeError, ValueError, AttributeError) as error:
+                raise ValueError(f"Invalid profile {position}: {error}") from error
+        with metrics.stage("vectorize"):
+            X = self.preprocessor.preprocess_students(students)
+        return self.dropout_batcher.submit(X)
+
+    @staticmethod
+    def _profile_from_dict(profile: Dict) -> StudentProfile:
+        courses = profile.get("courses", [])
+        if not isinstance(courses, list):
+            raise ValueError("'courses' must be a list")
+        values = {}
+        for course in courses:
+            course_name = course["course_name"]
+            if not isinstance(course_name, str) or not course_name:
+                raise ValueError("'course_name' must be a non-empty string")
+            values[course_name] = {name: float(course.get(name, 0.0)) for name in ENROLLMENT_VALUE_FIELDS}
+        return StudentProfile(
+            student_id="",
+            age=int(profile["age"]),
+            gender=Gender(profile["gender"]),
+            education_level=EducationLevel(profile["education_level"]),
+            learning_style=LearningStyle(profile["learning_style"]),
+            course_history=list(values),
+            engagement_metrics={course: {name: metric[name] for name in METRIC_FIELDS} for course, metric in values.items()},
+            quiz_attempts={course: int(metric["quiz_attempts"]) for course, metric in values.items()},
+            engagement_level=EngagementLevel(profile["engagement_level"]),
+            final_exam_scores={course: metric["final_exam_score"] for course, metric in values.items()},
+            feedback_scores={course: int(metric["feedback_score"]) for course, metric in values.items()},
+            dropout_likelihood=False,
+            last_updated=datetime.now()
+        )
+
+    def _enrollment_values(self, student_id: str, course_name: str) -> Dict[str, float]:
+        """Current ``ENROLLMENT_VALUE_FIELDS`` of one enrollment, zeros if it does not exist."""
+        table = self.students
+        row, course = table.index.get(student_id), table.course_index.get(course_name)
+        enrollment = table.find_enrollment(row, course) if row is not None and course is not None else -1
+        if enrollment < 0:
+            return dict.fromkeys(ENROLLMENT_VALUE_FIELDS, 0.0)
+        return {name: float(table.enrollment_column(name)[enrollment]) for name in ENROLLMENT_VALUE_FIELDS}
+
+    def _students_changed(self, rows) -> None:
+        """Queue ``rows`` for re-encoding and re-aggregation and drop their cached profiles.
 
-        self._update_course_from_row(row)
+        Cached recommendations are checked against the new vectors once they
+        exist, in ``refresh_features``.
+        """
+        self.features.mark_dirty(rows)
+        self.analytics.mark_dirty(rows)
+        self.roster.mark_dirty(rows)
+        self.cooccurrence.mark_dirty(rows)
+        if len(self.profile_cache):
+            for row in np.atleast_1d(rows):
+                self.profile_cache.invalidate(self.students.ids[row])
 
-    def _update_course_from_row(self, row: Dict) -> None:
+    def refresh_features(self) -> np.ndarray:
+        """Re-encode new and changed students and push them into the similarity index.
+
+        Returns the table rows that were re-encoded.
+        """
+        with self._features_lock:
+            started = time.perf_counter()
+            rows = self.features.refresh(self.students)
+            if len(rows):
+                metrics.observe("vectorize", time.perf_counter() - started)
+            changed_ids = [self.students.ids[row] for row in rows]
+            self.rows_changed_since_training += len(rows)
+            index = self.similarity_index
+            if changed_ids:
+                index.add_vectors(changed_ids, self.features.similarity[rows])
+            if index.generation != self._index_generation:
+                self._index_generation = index.generation
+                self._matrix_rows = np.fromiter(
+                    (index.rows.get(student_id, -1) for student_id in self.students.ids), dtype=np.intp, count=len(self.students)
+                )
+                indexed = np.flatnonzero(self._matrix_rows >= 0)
+                self._table_rows = np.full(len(index), -1, dtype=np.intp)
+                self._table_rows[self._matrix_rows[indexed]] = indexed
+                self._course_postings = {}
+                self.recommendation_cache.clear()
+            elif changed_ids:
+                if len(self._matrix_rows) < len(self.students):
+                    self._matrix_rows = np.resize(self._matrix_rows, max(len(self.students), 2 * len(self._matrix_rows)))
+                self._matrix_rows[rows] = [index.rows[student_id] for student_id in changed_ids]
+                if len(self._table_rows) < len(index):
+                    self._table_rows = np.concatenate((self._table_rows, np.full(len(index) - len(self._table_rows), -1, dtype=np.intp)))
+                self._table_rows[self._matrix_rows[rows]] = rows
+                self._invalidate_recommendations(changed_ids)
+        return rows
+
+    def _invalidate_recommendations(self, changed_ids: List[str]) -> None:
+        """Drop cached recommendations that the changed students can affect.
+
+        An entry is stale if the student itself or one of its neighbors
+        changed, or if a changed student is now at least as similar as the
+        current k-th neighbor.
+        """
+        cache = self.recommendation_cache
+        if not len(cache):
+            return
+        if len(changed_ids) > PRECISE_INVALIDATION_LIMIT:
+            cache.clear()
+            return
+        index = self.similarity_index
+        matrix = index.matrix
+        changed = set(changed_ids)
+        vectors = matrix[[index.rows[student_id] for student_id in changed_ids]]
+
+        def is_stale(key, entry: CachedRecommendations) -> bool:
+            student_id = key[0]
+            if student_id in changed or not changed.isdisjoint(entry.neighbor_ids):
+                return True
+            scores = vectors @ matrix[index.rows[student_id]]
+            return bool((scores >= entry.kth_score - index.SCORE_TOLERANCE).any())
+
+        cache.invalidate_where(is_stale)
+
+    def _update_course_from_row(self, row: Dict, previous: Optional[tuple] = None) -> None:
+        """Fold one CSV row into the course's running statistics.
+
+        ``previous`` holds the values this row replaces when a student's
+        course is loaded again, so they can be taken out of the aggregates.
+        """
         course_name = row["Course_Name"]
+        self._ensure_course(course_name)
+        stats = self.course_stats[course_name]
+        if previous is not None:
+            stats.remove(*previous)
+        stats.add(
+            float(row["Assignment_Completion_Rate"]),
+            float(row["Quiz_Scores"]),
+            float(row["Time_Spent_on_Videos"]),
+            float(row["Final_Exam_Score"])
+        )
+        stats.apply_to(self.courses[course_name])
+
+    def _ensure_course(self, course_name: str) -> None:
         if course_name not in self.courses:
             if course_name == "Machine Learning":
                 content_type_weights = {
@@ -101,91 +552,251 @@ class RecommendationService:
             self.courses[course_name] = Course(
                 course_name=course_name,
                 content_type_weights=content_type_weights,
-                average_completion_rate=float(row["Assignment_Completion_Rate"]),
-                average_quiz_score=float(row["Quiz_Scores"]),
-                average_time_spent=float(row["Time_Spent_on_Videos"])
-            )
-        else:
-            course = self.courses[course_name]
-            n = len([s for s in self.students.values() if course_name in s.course_history])
-            course.average_completion_rate = (
-                (course.average_completion_rate * (n - 1) + float(row["Assignment_Completion_Rate"])) / n
-            )
-            course.average_quiz_score = (
-                (course.average_quiz_score * (n - 1) + float(row["Quiz_Scores"])) / n
-            )
-            course.average_time_spent = (
-                (course.average_time_spent * (n - 1) + float(row["Time_Spent_on_Videos"])) / n
+                average_completion_rate=0.0,
+                average_quiz_score=0.0,
+                average_time_spent=0.0
             )
+            self.course_stats[course_name] = CourseStats()
+            self._style_weights = None
+            self.recommendation_cache.clear()
+
+    def train_classifier(self, model_path: Optional[str] = None) -> None:
+        """Train the dropout classifier and apply its decision threshold.
+
+        With ``Config.MODEL_SELECTION`` the model and threshold are chosen by
+        ``ModelSelector``; otherwise it is a Random Forest at a fixed 0.2.
+
+        If ``model_path`` (or ``Config.MODEL_PATH``) holds an artifact trained
+        on the same features and data, it is reused instead of refitting;
+        otherwise the freshly trained model is saved there. Blocks until the
+        new model is installed; see ``RetrainingScheduler`` for the
+        background variant.
+        """
+        X, y = self.training_snapshot()
+        model_path = model_path or getattr(self.config, "MODEL_PATH", None)
+        classifier, probabilities = fit_dropout_classifier(
+            X, y, self.preprocessor.feature_columns, model_path, self.classifier.threshold,
+            model_selector(self.config)
+        )
 
-    def train_classifier(self) -> None:
-        """Train a Random Forest classifier and apply a custom threshold."""
-        students = list(self.students.values())
-        X = self.preprocessor.preprocess_students(students)
-        y = [student.dropout_likelihood for student in students]
-        
-        # Split data into training and testing sets
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        # Train with Random Forest
-        self.classifier.model = RandomForestClassifier(n_estimators=100, class_weight="balanced", random_state=42)
-        self.classifier.train(X_train, y_train)
-        
-        # Evaluate with custom threshold (0.2)
-        y_prob = self.classifier.predict_proba(X_test)  # Already 1D dropout probabilities
-        y_pred_adjusted = [1 if prob > 0.2 else 0 for prob in y_prob]
-        accuracy = accuracy_score(y_test, y_pred_adjusted)
-        report = classification_report(y_test, y_pred_adjusted, target_names=["No Dropout", "Dropout"])
-        print(f"Dropout Classifier Accuracy (threshold=0.2): {accuracy:.4f}")
-        print("Classification Report (threshold=0.2):")
-        print(report)
-        
         # Update student profiles with probabilities
-        probabilities = self.classifier.predict_proba(X)
         print("Sample Predicted Dropout Scores:")
-        for student, prob in list(zip(students, probabilities))[:5]:
-            print(f"- {student.student_id}: {prob:.4f} (Actual: {student.dropout_likelihood})")
-        s00027_idx = next(i for i, s in enumerate(students) if s.student_id == "S00027")
-        print(f"- S00027: {probabilities[s00027_idx]:.4f} (Actual: True)")
-        
-        for student, prob in zip(students, probabilities):
-            student.predicted_dropout_score = prob
-
-    def get_similar_students(self, student_id: str, limit: int = 5) -> List[StudentProfile]:
+        for student_id, prob, actual in list(zip(self.students.ids, probabilities, y))[:5]:
+            print(f"- {student_id}: {prob:.4f} (Actual: {bool(actual)})")
+        s00027_idx = self.students.index.get("S00027")
+        if s00027_idx is not None:
+            print(f"- S00027: {probabilities[s00027_idx]:.4f} (Actual: {bool(y[s00027_idx])})")
+
+        self.install_classifier(classifier, X, probabilities)
+
+    def training_snapshot(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Copies of the classifier features and labels, and restart the drift count."""
+        with self._features_lock:
+            self.refresh_features()
+            self.rows_changed_since_training = 0
+            return self.features.classifier.copy(), self.students.column("dropout_likelihood").copy()
+
+    def install_classifier(self, classifier: DropoutClassifier, X: np.ndarray, probabilities: np.ndarray) -> None:
+        """Swap in a model trained on the snapshot ``X`` and its scores for those rows.
+
+        Students whose features changed or who were added after the snapshot
+        are rescored with the new model first. Readers see either the old
+        model and scores or the new ones, never a mix.
+        """
+        with self._features_lock, self._model_lock:
+            current = self.features.classifier
+            scores = np.empty(len(current))
+            scores[:len(X)] = probabilities
+            stale = np.flatnonzero((current[:len(X)] != X).any(axis=1))
+            stale = np.concatenate([stale, np.arange(len(X), len(current))])
+            if len(stale):
+                scores[stale] = classifier.predict_proba(current[stale])
+            self.students.replace_column("predicted_dropout_score", scores)
+            self.classifier = classifier
+            self.analytics.mark_dirty(np.arange(len(scores)))
+            self.roster.mark_dirty(np.arange(len(scores)))
+        # Every profile and dropout adjustment may have changed
+        self.recommendation_cache.clear()
+        self.profile_cache.clear()
+
+    def get_similar_students(self, student_id: str, limit: int = SIMILAR_STUDENTS) -> List[StudentView]:
         target = self._get_student(student_id)
         if not target:
             return []
-        similarities = []
-        for student in self.students.values():
-            if student.student_id != student_id:
-                score = self.similarity_calculator.calculate_profile_similarity(target, student)
-                similarities.append((student, score))
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        top_similar = similarities[:limit]
-        print(f"Similar students to {student_id}:")
-        for student, score in top_similar:
-            print(f"- {student.student_id}: Similarity Score = {score:.4f}")
-        return [student for student, _ in top_similar]
+        return [self.students[similar_id] for similar_id, _ in self._top_similar(student_id, limit)]
+
+    def _top_similar(self, student_id: str, limit: int) -> List[Tuple[str, float]]:
+        self.refresh_features()
+        with metrics.stage("neighbor_search"):
+            return self.similarity_index.top_k(student_id, limit)
 
     def generate_recommendations(self, student_id: str, num_recommendations: int = 3) -> List[Recommendation]:
+        """Course recommendations for one student, cached for ``Config.CACHE_TIMEOUT`` seconds."""
         student = self._get_student(student_id)
         if not student:
             return []
-        similar_students = self.get_similar_students(student_id)
-        available_courses = [
-            course for course in self.courses.values()
-            if course.course_name not in student.course_history
-        ]
-        return self.recommender.generate_recommendations(
-            student=student,
-            similar_students=similar_students,
-            available_courses=available_courses,
-            num_recommendations=num_recommendations
+        self.refresh_features()  # applies pending invalidations before the lookup
+        entry = self.recommendation_cache.get_or_compute(
+            (student_id, num_recommendations),
+            lambda: self._compute_recommendations(student, num_recommendations)
+        )
+        return list(entry.recommendations)
+
+    def _compute_recommendations(self, student: StudentView, num_recommendations: int) -> CachedRecommendations:
+        if self.neighbor_search == "item":
+            # Any changed student can move the co-enrollment counts
+            return CachedRecommendations(
+                recommendations=self._rank_rows(np.array([student.row]), None, num_recommendations)[0],
+                neighbor_ids=frozenset(),
+                kth_score=-np.inf
+            )
+        if self.neighbor_search == "per_course":
+            rows = np.array([student.row])
+            taken = ~np.isnan(self.students.course_scores(rows))
+            neighbor_rows, scores, available = self._course_neighbors(rows, taken)
+            kth_scores = scores[0, -1, available[0]]  # NaN for a course with fewer than k other students
+            return CachedRecommendations(
+                recommendations=self._rank_rows(rows, neighbor_rows, num_recommendations, taken)[0],
+                neighbor_ids=frozenset(self.students.ids[row] for row in neighbor_rows[neighbor_rows >= 0]),
+                kth_score=-np.inf if np.isnan(kth_scores).any() else float(kth_scores.min(initial=np.inf))
+            )
+        top_similar = self._top_similar(student.student_id, SIMILAR_STUDENTS)
+        neighbor_rows = np.array([[self.students.index[similar_id] for similar_id, _ in top_similar]], dtype=np.int64)
+        recommendations = self._rank_rows(np.array([student.row]), neighbor_rows, num_recommendations)[0]
+        return CachedRecommendations(
+            recommendations=recommendations,
+            neighbor_ids=frozenset(similar_id for similar_id, _ in top_similar),
+            kth_score=top_similar[-1][1] if len(top_similar) == SIMILAR_STUDENTS else -np.inf
         )
 
-    def _get_student(self, student_id: str) -> Optional[StudentProfile]:
+    def generate_recommendations_batch(
+        self,
+        student_ids: List[str],
+        num_recommendations: int = 3,
+        chunk_size: Optional[int] = None
+    ) -> Iterator[Tuple[str, Optional[List[Recommendation]]]]:
+        """Recommendations for many students, in input order; ``None`` for unknown IDs.
+
+        Students are processed ``chunk_size`` (``Config.RECOMMENDATION_BATCH_SIZE``)
+        at a time: one batched neighbor search and one array scoring pass per
+        chunk. Results are yielded as each chunk finishes, and match
+        ``generate_recommendations`` for every student.
+        """
+        chunk_size = chunk_size or getattr(self.config, "RECOMMENDATION_BATCH_SIZE", 1024)
+        table = self.students
+        self.refresh_features()
+        for start in range(0, len(student_ids), chunk_size):
+            chunk = [student_id for student_id in student_ids[start:start + chunk_size] if student_id in table]
+            rows = np.array([table.index[student_id] for student_id in chunk], dtype=np.int64)
+            taken = ~np.isnan(table.course_scores(rows))
+            if self.neighbor_search == "item":
+                neighbor_rows = None
+            elif self.neighbor_search == "per_course":
+                neighbor_rows = self._course_neighbors(rows, taken)[0]
+            else:
+                neighbor_rows = np.full((len(chunk), SIMILAR_STUDENTS), -1, dtype=np.int64)
+                with metrics.stage("neighbor_search"):
+                    neighbors = self.similarity_index.top_k_batch(chunk, SIMILAR_STUDENTS)
+                for position, similar in enumerate(neighbors):
+                    for rank, (similar_id, _) in enumerate(similar or []):
+                        neighbor_rows[position, rank] = table.index[similar_id]
+            by_id = dict(zip(chunk, self._rank_rows(rows, neighbor_rows, num_recommendations, taken)))
+            for student_id in student_ids[start:start + chunk_size]:
+                yield student_id, by_id.get(student_id)
+
+    def _course_neighbors(self, rows: np.ndarray, taken: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Each student's most similar students among those enrolled in each course.
+
+        ``taken`` masks each student's courses, by table course code. For
+        every course in ``self.courses`` order that a student has not
+        taken, its ``SIMILAR_STUDENTS`` nearest neighbors are searched in the
+        course's roster list only, so each course gets its own evidence.
+        Returns neighbor table rows and scores, shape ``(students, k,
+        courses)`` and padded with -1 and NaN, plus the ``(students,
+        courses)`` mask of courses searched.
+        """
+        self.refresh_features()
+        course_codes = self._course_codes()
+        available = ~taken[:, course_codes]
+        with metrics.stage("neighbor_search"):
+            found, scores = self.similarity_index.top_k_among(
+                self._matrix_rows[rows], self._postings(course_codes), SIMILAR_STUDENTS, available
+            )
+            neighbor_rows = np.where(found >= 0, self._table_rows[found], -1).astype(np.int64)
+        return neighbor_rows, scores, available
+
+    def _postings(self, course_codes: np.ndarray) -> List[np.ndarray]:
+        """Per course, its students' similarity matrix rows, sorted.
+
+        Cached until the roster replaces the course's row list.
+        """
+        enrolled = self.roster.course_rows(self.students)
+        postings = []
+        for code in course_codes:
+            students = enrolled.get(int(code), np.zeros(0, dtype=np.int64))
+            cached = self._course_postings.get(int(code))
+            if cached is None or cached[0] is not students:
+                cached = self._course_postings[int(code)] = (students, np.sort(self._matrix_rows[students]))
+            postings.append(cached[1])
+        return postings
+
+    def _course_codes(self) -> np.ndarray:
+        """Table course codes of ``self.courses``, in the same order."""
+        return np.array([self.students.course_index[name] for name in self.courses], dtype=np.int64)
+
+    def _rank_rows(
+        self, rows: np.ndarray, neighbor_rows: Optional[np.ndarray], num_recommendations: int,
+        taken: Optional[np.ndarray] = None
+    ) -> List[List[Recommendation]]:
+        """Recommendations for table ``rows`` given each one's neighbor rows (padded with -1).
+
+        ``neighbor_rows`` is ``(students, neighbors)`` when the same
+        neighbors vouch for every course, or ``(students, neighbors,
+        courses)`` with separate neighbors per course. Without neighbors
+        (None), the success of students who took the same courses is read
+        from ``cooccurrence`` instead. ``taken`` is the mask of each
+        student's courses if the caller has it already.
+        """
+        with metrics.stage("scoring"):
+            table = self.students
+            courses = list(self.courses.values())
+            course_codes = self._course_codes()
+            if self._style_weights is None:
+                self._style_weights = self.recommender.style_weights(courses)
+
+            if taken is None:
+                taken = ~np.isnan(table.course_scores(rows))
+            if neighbor_rows is None:
+                counts, scores, overall = self.cooccurrence.collaborative(table, taken, course_codes)
+                evidence = {
+                    "neighbor_exam_scores": None,
+                    "collaborative": (counts, scores),
+                    "evidence": np.where(overall, "students of the course", "students who took the same courses")
+                }
+            else:
+                if neighbor_rows.ndim == 2:
+                    neighbor_rows = np.repeat(neighbor_rows[:, :, np.newaxis], len(courses), axis=2)
+                found = neighbor_rows >= 0
+                columns = np.broadcast_to(course_codes, neighbor_rows.shape)[found]
+                neighbor_scores = np.zeros(neighbor_rows.shape)
+                neighbor_scores[found] = np.nan_to_num(table.course_scores(neighbor_rows[found])[np.arange(len(columns)), columns])
+                evidence = {"neighbor_exam_scores": neighbor_scores}
+
+            return self.recommender.rank_courses(
+                learning_styles=table.column("learning_style")[rows],
+                dropout_scores=table.column("predicted_dropout_score")[rows],
+                available=~taken[:, course_codes],
+                courses=courses,
+                num_recommendations=num_recommendations,
+                weights=self._style_weights,
+                **evidence
+            )
+
+    def _get_student(self, student_id: str) -> Optional[StudentView]:
         return self.students.get(student_id)
 
     def update_course_weights(self, course_name: str, weights: Dict[LearningStyle, float]) -> None:
         if course_name in self.courses:
-            self.courses[course_name].content_type_weights = weights
\ No newline at end of file
+            self.courses[course_name].content_type_weights = weights
+            self._style_weights = None
+            self.recommendation_cache.clear()
\ No newline at end of file
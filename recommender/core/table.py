@@ -0,0 +1,573 @@
+import threading
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import numpy as np
+from .models import StudentProfile, Gender, EducationLevel, EngagementLevel, LearningStyle
+
+# Enum members are stored as their position in these tuples
+GENDERS = tuple(Gender)
+EDUCATION_LEVELS = tuple(EducationLevel)
+LEARNING_STYLES = tuple(LearningStyle)
+ENGAGEMENT_LEVELS = tuple(EngagementLevel)
+
+METRIC_FIELDS = ("time_spent_on_videos", "quiz_scores", "forum_participation", "assignment_completion_rate")
+
+STUDENT_COLUMNS = {
+    "age": np.int16,
+    "gender": np.int8,
+    "education_level": np.int8,
+    "learning_style": np.int8,
+    "engagement_level": np.int8,
+    "dropout_likelihood": np.bool_,
+    "predicted_dropout_score": np.float64,  # NaN until the classifier has scored the student
+    "last_updated": np.float64,  # POSIX timestamp
+    "first_enrollment": np.int32,  # -1 when the student has no enrollment yet
+    "last_enrollment": np.int32,
+}
+
+# Per-student fields supplied by callers (the rest is bookkeeping)
+STUDENT_VALUE_FIELDS = ("age", "gender", "education_level", "learning_style", "engagement_level", "dropout_likelihood")
+
+ENROLLMENT_COLUMNS = {
+    "student": np.int32,
+    "course": np.int32,
+    "time_spent_on_videos": np.float64,
+    "quiz_scores": np.float64,
+    "forum_participation": np.float64,
+    "assignment_completion_rate": np.float64,
+    "quiz_attempts": np.int32,
+    "final_exam_score": np.float64,
+    "feedback_score": np.int16,
+    "next": np.int32,  # next enrollment of the same student, -1 at the end
+}
+
+
+def _code(members: tuple, value) -> int:
+    if not isinstance(value, members[0].__class__):
+        value = members[0].__class__(value)
+    return members.index(value)
+
+
+class StudentTable(Mapping):
+    """Structure-of-arrays store for student profiles.
+
+    Demographics and encoded enums live in one NumPy column per field, indexed
+    by row. Per-course data is kept in append-only enrollment columns; each
+    student's enrollments are chained through ``next`` for O(1) point updates,
+    and ``enrollment_blocks`` groups them into CSR-style blocks for vectorized
+    code. Indexing by student ID returns a lightweight ``StudentView``.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        self.ids: List[str] = []
+        self._index: Optional[Dict[str, int]] = {}
+        self.course_names: List[str] = []
+        self.course_index: Dict[str, int] = {}
+        self._students = {name: np.zeros(initial_capacity, dtype) for name, dtype in STUDENT_COLUMNS.items()}
+        self._enrollments = {name: np.zeros(initial_capacity, dtype) for name, dtype in ENROLLMENT_COLUMNS.items()}
+        self._num_enrollments = 0
+        self._blocks: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @classmethod
+    def from_columns(
+        cls,
+        ids: List[str],
+        course_names: List[str],
+        student_columns: Dict[str, np.ndarray],
+        enrollment_columns: Dict[str, np.ndarray]
+    ) -> "StudentTable":
+        """Wrap existing column arrays (e.g. memory-mapped) without copying them."""
+        table = cls(initial_capacity=0)
+        table.ids = list(ids)
+        table._index = None  # built on first lookup; hashing millions of IDs dominates a warm start
+        table.course_names = list(course_names)
+        table.course_index = {name: i for i, name in enumerate(table.course_names)}
+        table._students = {name: student_columns[name] for name in STUDENT_COLUMNS}
+        table._enrollments = {name: enrollment_columns[name] for name in ENROLLMENT_COLUMNS}
+        table._num_enrollments = len(table._enrollments["student"])
+        return table
+
+    @property
+    def index(self) -> Dict[str, int]:
+        """Student ID to row."""
+        if self._index is None:
+            self._index = dict(zip(self.ids, range(len(self.ids))))
+        return self._index
+
+    # Mapping interface -------------------------------------------------
+
+    def __getitem__(self, student_id: str) -> "StudentView":
+        return StudentView(self, self.index[student_id])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, student_id) -> bool:
+        return student_id in self.index
+
+    # Columns -----------------------------------------------------------
+
+    @property
+    def num_enrollments(self) -> int:
+        return self._num_enrollments
+
+    def column(self, name: str) -> np.ndarray:
+        """Writable view of a per-student column, one entry per row."""
+        return self._students[name][:len(self.ids)]
+
+    def enrollment_column(self, name: str) -> np.ndarray:
+        """Writable view of a per-enrollment column, in insertion order."""
+        return self._enrollments[name][:self._num_enrollments]
+
+    def enrollment_blocks(self) -> Tuple[np.ndarray, np.ndarray]:
+        """CSR layout of the enrollments as ``(order, indptr)``.
+
+        ``order[indptr[r]:indptr[r + 1]]`` are the enrollment indices of row
+        ``r`` in the order the courses were first loaded.
+        """
+        if self._blocks is None:
+            students = self.enrollment_column("student")
+            order = np.argsort(students, kind="stable")
+            counts = np.bincount(students, minlength=len(self.ids))
+            indptr = np.zeros(len(self.ids) + 1, dtype=np.int64)
+            np.cumsum(counts, out=indptr[1:])
+            self._blocks = (order, indptr)
+        return self._blocks
+
+    def enrollments_of(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Enrollment indices of distinct ``rows`` and the position in ``rows`` each belongs to.
+
+        Each student's enrollments come out in the order the courses were
+        first loaded. Small row sets walk the per-student chains; larger ones
+        scan the enrollment columns once.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) * 8 < len(self.ids):
+            enrollments, positions = [], []
+            for position, row in enumerate(rows):
+                for enrollment in self.student_enrollments(row):
+                    enrollments.append(enrollment)
+                    positions.append(position)
+            return np.array(enrollments, dtype=np.int64), np.array(positions, dtype=np.int64)
+        local = np.full(len(self.ids), -1, dtype=np.int64)
+        local[rows] = np.arange(len(rows))
+        positions = local[self.enrollment_column("student")]
+        enrollments = np.flatnonzero(positions >= 0)
+        return enrollments, positions[enrollments]
+
+    def course_scores(self, rows: np.ndarray, name: str = "final_exam_score") -> np.ndarray:
+        """Dense ``(len(rows), len(course_names))`` slice of the sparse student x course data.
+
+        Holds the enrollment column ``name``, NaN where a student is not
+        enrolled. ``rows`` may repeat.
+        """
+        unique_rows, inverse = np.unique(np.asarray(rows, dtype=np.int64), return_inverse=True)
+        enrollments, positions = self.enrollments_of(unique_rows)
+        matrix = np.full((len(unique_rows), len(self.course_names)), np.nan)
+        matrix[positions, self.enrollment_column("course")[enrollments]] = self.enrollment_column(name)[enrollments]
+        return matrix[inverse.ravel()]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the NumPy columns (excluding the ID list and index)."""
+        return sum(a.nbytes for a in self._students.values()) + sum(a.nbytes for a in self._enrollments.values())
+
+    # Mutation ----------------------------------------------------------
+
+    def append_student(
+        self,
+        student_id: str,
+        age: int,
+        gender,
+        education_level,
+        learning_style,
+        engagement_level,
+        dropout_likelihood: bool,
+        last_updated: Optional[datetime] = None
+    ) -> int:
+        """Add a student without enrollments and return its row."""
+        if student_id in self.index:
+            raise ValueError(f"Student {student_id} already exists")
+        row = len(self.ids)
+        self._ensure_capacity(self._students, row + 1)
+        columns = self._students
+        columns["age"][row] = age
+        columns["gender"][row] = _code(GENDERS, gender)
+        columns["education_level"][row] = _code(EDUCATION_LEVELS, education_level)
+        columns["learning_style"][row] = _code(LEARNING_STYLES, learning_style)
+        columns["engagement_level"][row] = _code(ENGAGEMENT_LEVELS, engagement_level)
+        columns["dropout_likelihood"][row] = dropout_likelihood
+        columns["predicted_dropout_score"][row] = np.nan
+        columns["last_updated"][row] = (last_updated or datetime.now()).timestamp()
+        columns["first_enrollment"][row] = -1
+        columns["last_enrollment"][row] = -1
+        self.ids.append(student_id)
+        self.index[student_id] = row
+        self._blocks = None
+        return row
+
+    def set_enrollment(
+        self,
+        row: int,
+        course_name: str,
+        metrics: Dict[str, float],
+        quiz_attempts: int,
+        final_exam_score: float,
+        feedback_score: int
+    ) -> Optional[Dict[str, float]]:
+        """Insert or overwrite one student's course data.
+
+        Returns the values that were overwritten, or None for a new course.
+        """
+        course = self.course_index.get(course_name)
+        if course is None:
+            course = len(self.course_names)
+            self.course_names.append(course_name)
+            self.course_index[course_name] = course
+
+        enrollment = self.find_enrollment(row, course)
+        previous = None
+        if enrollment < 0:
+            enrollment = self._num_enrollments
+            self._ensure_capacity(self._enrollments, enrollment + 1)
+            self._num_enrollments += 1
+            self._enrollments["student"][enrollment] = row
+            self._enrollments["course"][enrollment] = course
+            self._enrollments["next"][enrollment] = -1
+            last = self._students["last_enrollment"][row]
+            if last < 0:
+                self._students["first_enrollment"][row] = enrollment
+            else:
+                self._enrollments["next"][last] = enrollment
+            self._students["last_enrollment"][row] = enrollment
+            self._blocks = None
+        else:
+            previous = self.enrollment_values(enrollment)
+
+        columns = self._enrollments
+        for name in METRIC_FIELDS:
+            columns[name][enrollment] = metrics[name]
+        columns["quiz_attempts"][enrollment] = quiz_attempts
+        columns["final_exam_score"][enrollment] = final_exam_score
+        columns["feedback_score"][enrollment] = feedback_score
+        return previous
+
+    def append_students(self, student_ids: List[str], columns: Dict[str, np.ndarray], last_updated: Optional[datetime] = None) -> np.ndarray:
+        """Vectorized ``append_student`` for new IDs; enum columns are given as codes."""
+        start = len(self.ids)
+        count = len(student_ids)
+        for student_id in student_ids:
+            if student_id in self.index:
+                raise ValueError(f"Student {student_id} already exists")
+        self._ensure_capacity(self._students, start + count)
+        rows = slice(start, start + count)
+        for name in STUDENT_VALUE_FIELDS:
+            self._students[name][rows] = columns[name]
+        self._students["predicted_dropout_score"][rows] = np.nan
+        self._students["last_updated"][rows] = (last_updated or datetime.now()).timestamp()
+        self._students["first_enrollment"][rows] = -1
+        self._students["last_enrollment"][rows] = -1
+        self.ids.extend(student_ids)
+        self.index.update(zip(student_ids, range(start, start + count)))
+        self._blocks = None
+        return np.arange(start, start + count)
+
+    def upsert_enrollments(self, rows: np.ndarray, course_names: np.ndarray, values: Dict[str, np.ndarray]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Vectorized ``set_enrollment`` for many (row, course) pairs.
+
+        Pairs repeated within the call keep the position of their first
+        occurrence and the values of their last, exactly as calling
+        ``set_enrollment`` once per pair would. Returns the touched enrollment
+        indices (one per distinct pair) and the overwritten values, NaN for
+        enrollments created by this call.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        codes = self._course_codes(course_names)
+        count = len(rows)
+        keys = rows * max(1, len(self.course_names)) + codes
+        unique_keys, first = np.unique(keys, return_index=True)
+        _, last_reversed = np.unique(keys[::-1], return_index=True)
+        last = count - 1 - last_reversed
+        order = np.argsort(first, kind="stable")
+        first, last = first[order], last[order]
+        pair_rows, pair_codes = rows[first], codes[first]
+
+        enrollments = self._find_enrollments(pair_rows, pair_codes)
+        existing = enrollments >= 0
+        tracked = METRIC_FIELDS + ("quiz_attempts", "final_exam_score", "feedback_score")
+        previous = {name: np.full(len(first), np.nan) for name in tracked}
+        for name in tracked:
+            previous[name][existing] = self._enrollments[name][enrollments[existing]]
+
+        is_new = ~existing
+        start = self._num_enrollments
+        added = int(is_new.sum())
+        if added:
+            self._ensure_capacity(self._enrollments, start + added)
+            new_enrollments = np.arange(start, start + added)
+            enrollments[is_new] = new_enrollments
+            new_rows = pair_rows[is_new]
+            self._enrollments["student"][new_enrollments] = new_rows
+            self._enrollments["course"][new_enrollments] = pair_codes[is_new]
+            self._link(new_rows, new_enrollments)
+            self._num_enrollments += added
+            self._blocks = None
+
+        for name, column in values.items():
+            self._enrollments[name][enrollments] = column[last]
+        return enrollments, previous
+
+    def _find_enrollments(self, rows: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Vectorized ``find_enrollment``: enrollment index per pair, -1 if absent."""
+        result = np.full(len(rows), -1, dtype=np.int64)
+        candidates = np.flatnonzero(self._students["first_enrollment"][rows] >= 0)
+        if len(candidates) <= 64:
+            for i in candidates:
+                result[i] = self.find_enrollment(rows[i], codes[i])
+            return result
+        width = max(1, len(self.course_names))
+        existing_keys = self.enrollment_column("student").astype(np.int64) * width + self.enrollment_column("course")
+        order = np.argsort(existing_keys)
+        sorted_keys = existing_keys[order]
+        keys = rows[candidates] * width + codes[candidates]
+        positions = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+        found = sorted_keys[positions] == keys
+        result[candidates[found]] = order[positions[found]]
+        return result
+
+    def _link(self, rows: np.ndarray, enrollments: np.ndarray) -> None:
+        """Chain newly appended enrollments onto their students' lists."""
+        order = np.argsort(rows, kind="stable")
+        rows, enrollments = rows[order], enrollments[order]
+        same_student = rows[1:] == rows[:-1]
+        next_enrollment = np.full(len(rows), -1, dtype=np.int64)
+        next_enrollment[:-1][same_student] = enrollments[1:][same_student]
+        self._enrollments["next"][enrollments] = next_enrollment
+        head = np.concatenate(([True], ~same_student))
+        tail = np.concatenate((~same_student, [True]))
+        head_rows = rows[head]
+        previous_last = self._students["last_enrollment"][head_rows]
+        linked = previous_last >= 0
+        self._enrollments["next"][previous_last[linked]] = enrollments[head][linked]
+        self._students["first_enrollment"][head_rows[~linked]] = enrollments[head][~linked]
+        self._students["last_enrollment"][head_rows] = enrollments[tail]
+
+    def _course_codes(self, course_names: np.ndarray) -> np.ndarray:
+        names, first, inverse = np.unique(np.asarray(course_names, dtype=object), return_index=True, return_inverse=True)
+        for i in np.argsort(first, kind="stable"):
+            if names[i] not in self.course_index:
+                self.course_index[names[i]] = len(self.course_names)
+                self.course_names.append(names[i])
+        lookup = np.array([self.course_index[name] for name in names], dtype=np.int64)
+        return lookup[inverse.ravel()]
+
+    def replace_column(self, name: str, values: np.ndarray) -> None:
+        """Swap in a new array for a student column in one step; readers see old or new values, never a mix."""
+        column = self._students[name].copy()
+        column[:len(values)] = values
+        self._students[name] = column
+
+    def touch(self, row: int, when: Optional[datetime] = None) -> None:
+        self._students["last_updated"][row] = (when or datetime.now()).timestamp()
+
+    def add_profile(self, profile: StudentProfile, student_id: Optional[str] = None) -> int:
+        """Copy a ``StudentProfile`` into the table (optionally under another ID) and return its row."""
+        row = self.append_student(
+            student_id or profile.student_id, profile.age, profile.gender, profile.education_level,
+            profile.learning_style, profile.engagement_level, profile.dropout_likelihood,
+            profile.last_updated
+        )
+        for course_name in profile.course_history:
+            self.set_enrollment(
+                row, course_name, profile.engagement_metrics[course_name],
+                profile.quiz_attempts[course_name], profile.final_exam_scores[course_name],
+                profile.feedback_scores[course_name]
+            )
+        if profile.predicted_dropout_score is not None:
+            self._students["predicted_dropout_score"][row] = profile.predicted_dropout_score
+        return row
+
+    # Point access ------------------------------------------------------
+
+    def student_enrollments(self, row: int) -> List[int]:
+        enrollments = []
+        enrollment = self._students["first_enrollment"][row]
+        next_enrollment = self._enrollments["next"]
+        while enrollment >= 0:
+            enrollments.append(int(enrollment))
+            enrollment = next_enrollment[enrollment]
+        return enrollments
+
+    def find_enrollment(self, row: int, course: int) -> int:
+        courses = self._enrollments["course"]
+        for enrollment in self.student_enrollments(row):
+            if courses[enrollment] == course:
+                return enrollment
+        return -1
+
+    def enrollment_values(self, enrollment: int) -> Dict[str, float]:
+        columns = self._enrollments
+        values = {name: float(columns[name][enrollment]) for name in METRIC_FIELDS}
+        values["final_exam_score"] = float(columns["final_exam_score"][enrollment])
+        return values
+
+    def _ensure_capacity(self, columns: Dict[str, np.ndarray], size: int) -> None:
+        capacity = len(next(iter(columns.values())))
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity, 16)
+        for name, array in columns.items():
+            grown = np.zeros(capacity, array.dtype)
+            grown[:len(array)] = array
+            columns[name] = grown
+
+
+class DirtyRows:
+    """Rows marked for re-processing by a lazily refreshed derived structure.
+
+    ``add`` may be called from any thread while a refresh runs: ``take``
+    swaps the set out under the lock, so a row marked during a refresh is
+    kept for the next one instead of being cleared unseen.
+    """
+
+    def __init__(self):
+        self._rows: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self._rows)
+
+    def add(self, rows: Iterable[int]) -> None:
+        rows = [int(row) for row in np.atleast_1d(rows)]
+        with self._lock:
+            self._rows.update(rows)
+
+    def take(self, size: int) -> np.ndarray:
+        """Remove every marked row; return those below ``size``, ascending."""
+        with self._lock:
+            rows, self._rows = self._rows, set()
+        return np.sort(np.fromiter((row for row in rows if row < size), dtype=np.int64))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows = set()
+
+
+class StudentView:
+    """Read-mostly view of one table row with the ``StudentProfile`` attributes.
+
+    Per-course dicts are rebuilt from the enrollment columns on each access;
+    only ``predicted_dropout_score`` can be assigned through the view.
+    """
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: StudentTable, row: int):
+        self._table = table
+        self._row = row
+
+    def __repr__(self) -> str:
+        return f"StudentView({self.student_id!r})"
+
+    @property
+    def row(self) -> int:
+        return self._row
+
+    @property
+    def student_id(self) -> str:
+        return self._table.ids[self._row]
+
+    @property
+    def age(self) -> int:
+        return int(self._table._students["age"][self._row])
+
+    @property
+    def gender(self) -> Gender:
+        return GENDERS[self._table._students["gender"][self._row]]
+
+    @property
+    def education_level(self) -> EducationLevel:
+        return EDUCATION_LEVELS[self._table._students["education_level"][self._row]]
+
+    @property
+    def learning_style(self) -> LearningStyle:
+        return LEARNING_STYLES[self._table._students["learning_style"][self._row]]
+
+    @property
+    def engagement_level(self) -> EngagementLevel:
+        return ENGAGEMENT_LEVELS[self._table._students["engagement_level"][self._row]]
+
+    @property
+    def dropout_likelihood(self) -> bool:
+        return bool(self._table._students["dropout_likelihood"][self._row])
+
+    @property
+    def last_updated(self) -> datetime:
+        return datetime.fromtimestamp(self._table._students["last_updated"][self._row])
+
+    @property
+    def predicted_dropout_score(self) -> Optional[float]:
+        score = self._table._students["predicted_dropout_score"][self._row]
+        return None if np.isnan(score) else float(score)
+
+    @predicted_dropout_score.setter
+    def predicted_dropout_score(self, value: Optional[float]) -> None:
+        self._table._students["predicted_dropout_score"][self._row] = np.nan if value is None else value
+
+    @property
+    def course_history(self) -> List[str]:
+        courses = self._table._enrollments["course"]
+        names = self._table.course_names
+        return [names[courses[e]] for e in self._table.student_enrollments(self._row)]
+
+    @property
+    def engagement_metrics(self) -> Dict[str, Dict[str, float]]:
+        columns = self._table._enrollments
+        names = self._table.course_names
+        return {
+            names[columns["course"][e]]: {name: float(columns[name][e]) for name in METRIC_FIELDS}
+            for e in self._table.student_enrollments(self._row)
+        }
+
+    @property
+    def quiz_attempts(self) -> Dict[str, int]:
+        return self._per_course("quiz_attempts", int)
+
+    @property
+    def final_exam_scores(self) -> Dict[str, float]:
+        return self._per_course("final_exam_score", float)
+
+    @property
+    def feedback_scores(self) -> Dict[str, int]:
+        return self._per_course("feedback_score", int)
+
+    def _per_course(self, column: str, cast) -> Dict:
+        columns = self._table._enrollments
+        names = self._table.course_names
+        return {
+            names[columns["course"][e]]: cast(columns[column][e])
+            for e in self._table.student_enrollments(self._row)
+        }
+
+    def to_profile(self) -> StudentProfile:
+        """Materialize the row as a standalone ``StudentProfile``."""
+        return StudentProfile(
+            student_id=self.student_id,
+            age=self.age,
+            gender=self.gender,
+            education_level=self.education_level,
+            learning_style=self.learning_style,
+            course_history=self.course_history,
+            engagement_metrics=self.engagement_metrics,
+            quiz_attempts=self.quiz_attempts,
+            engagement_level=self.engagement_level,
+            final_exam_scores=self.final_exam_scores,
+            feedback_scores=self.feedback_scores,
+            dropout_likelihood=self.dropout_likelihood,
+            last_updated=self.last_updated,
+            predicted_dropout_score=self.predicted_dropout_score
+        )
@@ -1,23 +1,170 @@
 import csv
-from typing import List, Dict
+import io
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Iterator, Tuple
 from pathlib import Path
+import numpy as np
+import pandas as pd
 from ..core.services import RecommendationService
+from ..core.metrics import registry as metrics
+from ..core.table import GENDERS, EDUCATION_LEVELS, LEARNING_STYLES, ENGAGEMENT_LEVELS
+from config.settings import Config
+
+# CSV column -> field name used by RecommendationService.load_student_batch
+CSV_FIELDS = {
+    "Student_ID": "student_id",
+    "Age": "age",
+    "Gender": "gender",
+    "Education_Level": "education_level",
+    "Course_Name": "course_name",
+    "Time_Spent_on_Videos": "time_spent_on_videos",
+    "Quiz_Attempts": "quiz_attempts",
+    "Quiz_Scores": "quiz_scores",
+    "Forum_Participation": "forum_participation",
+    "Assignment_Completion_Rate": "assignment_completion_rate",
+    "Engagement_Level": "engagement_level",
+    "Final_Exam_Score": "final_exam_score",
+    "Learning_Style": "learning_style",
+    "Feedback_Score": "feedback_score",
+    "Dropout_Likelihood": "dropout_likelihood",
+}
+
+CSV_DTYPES = {
+    "Student_ID": str,
+    "Age": np.int64,
+    "Gender": str,
+    "Education_Level": str,
+    "Course_Name": str,
+    "Time_Spent_on_Videos": np.float64,
+    "Quiz_Attempts": np.int64,
+    "Quiz_Scores": np.float64,
+    "Forum_Participation": np.float64,
+    "Assignment_Completion_Rate": np.float64,
+    "Engagement_Level": str,
+    "Final_Exam_Score": np.float64,
+    "Learning_Style": str,
+    "Feedback_Score": np.int64,
+    "Dropout_Likelihood": str,
+}
+
+ENUM_COLUMNS = {
+    "Gender": GENDERS,
+    "Education_Level": EDUCATION_LEVELS,
+    "Learning_Style": LEARNING_STYLES,
+    "Engagement_Level": ENGAGEMENT_LEVELS,
+}
+
+
+def frame_to_batch(frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Convert a typed CSV chunk into the column arrays ``load_student_batch`` expects."""
+    batch = {}
+    for column, field in CSV_FIELDS.items():
+        if column in ENUM_COLUMNS:
+            categories = pd.Index([member.value for member in ENUM_COLUMNS[column]])
+            codes = categories.get_indexer(frame[column])
+            if (codes < 0).any():
+                unknown = sorted(set(frame[column][codes < 0].astype(str)))
+                raise ValueError(f"Unknown {column} value(s): {', '.join(unknown)}")
+            batch[field] = codes
+        elif column == "Dropout_Likelihood":
+            batch[field] = (frame[column] == "Yes").to_numpy()
+        elif CSV_DTYPES[column] is str:
+            batch[field] = frame[column].to_numpy(dtype=object)
+        else:
+            batch[field] = frame[column].to_numpy(dtype=CSV_DTYPES[column])
+    return batch
+
+
+def read_byte_range(file_path: str, start: int, end: int, names: List[str]) -> Dict[str, np.ndarray]:
+    """Parse the complete lines in ``[start, end)`` of a CSV file (process pool worker)."""
+    with open(file_path, mode='rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    frame = pd.read_csv(io.BytesIO(data), header=None, names=names, dtype=CSV_DTYPES, encoding='utf-8')
+    return frame_to_batch(frame)
+
 
 class DataLoader:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, config=Config):
         self.file_path = Path(file_path)
-        self.service = RecommendationService()
+        self.config = config
+        self.service = RecommendationService(config)
 
     def load_dataset(self) -> None:
         """Load the CSV dataset and populate the RecommendationService."""
         if not self.file_path.exists():
             raise FileNotFoundError(f"Dataset file not found at {self.file_path}")
+        if getattr(self.config, "BULK_LOAD", False):
+            self.load_dataset_bulk()
+            return
 
-        with open(self.file_path, mode='r', encoding='utf-8') as file:
+        with metrics.stage("load"), open(self.file_path, mode='r', encoding='utf-8') as file:
             reader = csv.DictReader(file)
             for row in reader:
                 self.service.load_student_from_csv_row(row)
+        self.service.refresh_features()
+
+    def load_dataset_bulk(self, chunksize: int = None, workers: int = None) -> None:
+        """Load the CSV in typed chunks, streaming so the file never has to fit in memory.
+
+        With ``workers > 1`` the file is split into line-aligned byte ranges
+        that are parsed in a process pool; chunks are still applied in file
+        order, so the result matches ``load_dataset``. Byte-range splitting
+        assumes no quoted field spans several lines.
+        """
+        if not self.file_path.exists():
+            raise FileNotFoundError(f"Dataset file not found at {self.file_path}")
+        chunksize = chunksize or getattr(self.config, "LOAD_CHUNK_SIZE", 100_000)
+        workers = workers or getattr(self.config, "LOAD_WORKERS", 1)
+        if workers > 1:
+            batches = self._parse_in_processes(chunksize, workers)
+        else:
+            batches = self._parse_chunks(chunksize)
+        with metrics.stage("load"):
+            for batch in batches:
+                self.service.load_student_batch(batch)
+        self.service.refresh_features()
+
+    def _parse_chunks(self, chunksize: int) -> Iterator[Dict[str, np.ndarray]]:
+        with pd.read_csv(self.file_path, dtype=CSV_DTYPES, chunksize=chunksize, encoding='utf-8') as reader:
+            for frame in reader:
+                yield frame_to_batch(frame)
+
+    def _parse_in_processes(self, chunksize: int, workers: int) -> Iterator[Dict[str, np.ndarray]]:
+        names, ranges = self._byte_ranges(chunksize)
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for start, end in ranges:
+                pending.append(pool.submit(read_byte_range, str(self.file_path), start, end, names))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _byte_ranges(self, chunksize: int) -> Tuple[List[str], Iterator[Tuple[int, int]]]:
+        """Header names and a lazy sequence of line-aligned ``(start, end)`` offsets."""
+        with open(self.file_path, mode='rb') as file:
+            header = file.readline()
+            data_start = file.tell()
+            sample = file.read(1 << 16)
+        names = next(csv.reader([header.decode('utf-8-sig')]))
+        lines = max(1, sample.count(b"\n"))
+        chunk_bytes = max(1, len(sample) // lines) * chunksize
+        size = self.file_path.stat().st_size
+
+        def ranges() -> Iterator[Tuple[int, int]]:
+            with open(self.file_path, mode='rb') as file:
+                start = data_start
+                while start < size:
+                    file.seek(min(size, start + chunk_bytes))
+                    file.readline()
+                    end = min(size, file.tell())
+                    yield start, end
+                    start = end
+
+        return names, ranges()
 
     def get_service(self) -> RecommendationService:
         """Return the populated RecommendationService."""
-        return self.service
\ No newline at end of file
+        return self.service
@@ -1,78 +1,256 @@
-from typing import Optional, List, Dict
-from ..core.models import StudentProfile, Recommendation
+import base64
+import binascii
+from typing import IO, Iterator, Optional, List, Dict, Tuple, Union
+from ..core.models import Recommendation
 from ..core.services import RecommendationService
+from ..core.retraining import ModelWatcher, RetrainingScheduler, try_lock
+from ..core.metrics import Metric, registry as metrics
+from ..core.table import StudentView
 from .loader import DataLoader
+from .snapshot import file_checksum, is_current, load_snapshot, read_header, save_snapshot
+from ..ai.classifier import DropoutClassifier
+from config.settings import Config
 
 class DataManager:
-    def __init__(self, dataset_path: str):
-        self.loader = DataLoader(dataset_path)
+    def __init__(self, dataset_path: str, config=Config):
+        self.config = config
+        self.loader = DataLoader(dataset_path, config)
         self.service: Optional[RecommendationService] = None
+        self.retraining: Optional[Union[RetrainingScheduler, ModelWatcher]] = None
+        self._retraining_lock: Optional[IO] = None
 
-    def initialize(self) -> None:
+    def initialize(self, snapshot_path: Optional[str] = None) -> None:
+        """Load the dataset and train the classifier.
+
+        When a snapshot path is given (or ``Config.SNAPSHOT_PATH`` is set) and
+        the snapshot was taken from an unchanged dataset file, the CSV parse
+        and training are skipped; otherwise a fresh snapshot is written. A
+        snapshot without a usable dropout model is reused for the data, and
+        the model is trained and the snapshot rewritten.
+        Background retraining starts if ``Config.RETRAIN_INTERVAL`` or
+        ``Config.RETRAIN_DRIFT_THRESHOLD`` is set.
+        """
+        snapshot_path = snapshot_path or getattr(self.config, "SNAPSHOT_PATH", None)
+        checksum = None
+        if snapshot_path:
+            checksum = file_checksum(self.loader.file_path)
+            if is_current(snapshot_path, checksum):
+                self.load_snapshot(snapshot_path)
+                if not self.service.classifier.is_trained:
+                    self.service.train_classifier()
+                    save_snapshot(self.service, snapshot_path, checksum)
+                self.start_retraining()
+                return
         self.loader.load_dataset()
         self.service = self.loader.get_service()
         self.service.train_classifier()
+        if snapshot_path:
+            save_snapshot(self.service, snapshot_path, checksum)
+        self.start_retraining()
+
+    def start_retraining(self, shared: bool = False) -> None:
+        """Start the background retraining scheduler if the config enables one.
+
+        With ``shared`` (one of several server processes), only the process
+        that holds the lock next to ``Config.MODEL_PATH`` retrains; the
+        others run a ``ModelWatcher`` that installs each model it saves
+        there. Without a ``MODEL_PATH`` they have no model to share, so
+        shared processes do not retrain at all.
+        """
+        self.stop_retraining()
+        scheduler = RetrainingScheduler.from_config(self.service, self.config)
+        if not scheduler.enabled:
+            return
+        if shared:
+            model_path = getattr(self.config, "MODEL_PATH", None)
+            if not model_path:
+                print("Background retraining is off: several processes need Config.MODEL_PATH to share a model")
+                return
+            if self._retraining_lock is None:
+                self._retraining_lock = try_lock(f"{model_path}.retrain.lock")
+            if self._retraining_lock is None:
+                scheduler = ModelWatcher(self.service, model_path, scheduler.check_interval)
+        scheduler.start()
+        self.retraining = scheduler
+
+    def stop_retraining(self) -> None:
+        """Stop the background retraining scheduler, if one is running, and wait for it."""
+        if self.retraining is not None:
+            self.retraining.stop()
+            self.retraining = None
+
+    def warm_up(self) -> None:
+        if not self.service:
+            raise ValueError("DataManager not initialized. Call initialize() first.")
+        self.service.warm_up()
+
+    def save_snapshot(self, snapshot_path: str) -> None:
+        if not self.service:
+            raise ValueError("DataManager not initialized. Call initialize() first.")
+        save_snapshot(self.service, snapshot_path, file_checksum(self.loader.file_path))
+
+    def load_snapshot(self, snapshot_path: str) -> None:
+        """Restore the service from a snapshot, with the model saved in it or, if it matches, ``MODEL_PATH``'s."""
+        with metrics.stage("load"):
+            self.service = load_snapshot(snapshot_path, self.config)
+        model_path = getattr(self.config, "MODEL_PATH", None)
+        data_hash = read_header(snapshot_path).get("model_training_data_hash")
+        if not self.service.classifier.is_trained and model_path and data_hash and DropoutClassifier.is_compatible(
+            model_path, self.service.preprocessor.feature_columns, data_hash
+        ):
+            self.service.classifier = DropoutClassifier.load(model_path)
 
-    def get_student_profile(self, student_id: str) -> Optional[StudentProfile]:
+    def get_student_profile(self, student_id: str) -> Optional[StudentView]:
         if not self.service:
             raise ValueError("DataManager not initialized. Call initialize() first.")
         return self.service._get_student(student_id)
 
-    def get_recommendations(self, student_id: str, num_recommendations: int = 3) -> List[Recommendation]:
+    def get_student_data(self, student_id: str) -> Optional[Dict]:
+        """Serialized student profile, cached until the student or the model changes."""
         if not self.service:
             raise ValueError("DataManager not initialized. Call initialize() first.")
+        if student_id not in self.service.students:
+            return None
+        return self.service.profile_cache.get_or_compute(student_id, lambda: self._serialize_student(student_id))
+
+    def _serialize_student(self, student_id: str) -> Dict:
+        with metrics.stage("serialization"):
+            student = self.service.students[student_id]
+            return {
+                "student_id": student.student_id,
+                "age": student.age,
+                "gender": student.gender.value,
+                "education_level": student.education_level.value,
+                "learning_style": student.learning_style.value,
+                "course_history": student.course_history,
+                "engagement_level": student.engagement_level.value,
+                "dropout_likelihood": student.dropout_likelihood,
+                "predicted_dropout_score": round(student.predicted_dropout_score, 4) if student.predicted_dropout_score is not None else None
+            }
+
+    def get_recommendations(self, student_id: str, num_recommendations: int = 3) -> Optional[List[Recommendation]]:
+        """Recommendations for a student, or None if the student does not exist."""
+        if not self.service:
+            raise ValueError("DataManager not initialized. Call initialize() first.")
+        if student_id not in self.service.students:
+            return None
         return self.service.generate_recommendations(student_id, num_recommendations)
 
-    def get_all_students(self) -> List[StudentProfile]:
+    def get_recommendations_batch(
+        self, student_ids: List[str], num_recommendations: int = 3
+    ) -> Iterator[Tuple[str, Optional[List[Recommendation]]]]:
         if not self.service:
             raise ValueError("DataManager not initialized. Call initialize() first.")
-        return list(self.service.students.values())
+        return self.service.generate_recommendations_batch(student_ids, num_recommendations)
+
+    def apply_events(self, events: List[Dict]) -> List[str]:
+        if not self.service:
+            raise ValueError("DataManager not initialized. Call initialize() first.")
+        return self.service.apply_events(events)
+
+    def score_profiles(self, profiles: List[Dict]) -> Tuple[List[float], int]:
+        """Dropout scores for unseen profiles, and the size of the micro-batch that scored them."""
+        if not self.service:
+            raise ValueError("DataManager not initialized. Call initialize() first.")
+        scores, batch_size = self.service.score_profiles(profiles)
+        return [float(score) for score in scores], batch_size
+
+    def get_metrics(self) -> str:
+        """Stage histograms plus service counters, in the Prometheus text format."""
+        if not self.service:
+            raise ValueError("DataManager not initialized. Call initialize() first.")
+        service = self.service
+        caches = {"recommendations": service.recommendation_cache.stats(), "profiles": service.profile_cache.stats()}
+        extra = [
+            Metric("recommender_cache_" + name + "_total", "counter", f"Cache {name} per cache.",
+                   [({"cache": cache}, stats[name]) for cache, stats in caches.items()])
+            for name in ("hits", "misses", "evictions", "expirations", "invalidations")
+        ]
+        extra += [
+            Metric("recommender_cache_entries", "gauge", "Entries currently cached.",
+                   [({"cache": cache}, stats["size"]) for cache, stats in caches.items()]),
+            Metric("recommender_students", "gauge", "Students loaded.", [({}, len(service.students))]),
+            Metric("recommender_courses", "gauge", "Courses known.", [({}, len(service.courses))]),
+            Metric("recommender_model_info", "gauge", "Dropout model in use (value is always 1).", [({
+                "version": str(service.classifier.metadata.get("model_version", "untrained" if not service.classifier.is_trained else "unknown")),
+                "training_samples": str(service.classifier.metadata.get("training_samples", 0)),
+            }, 1)]),
+        ]
+        if self.retraining is not None:
+            extra.append(Metric("recommender_model_retrains_total", "counter", "Background retrains installed (trained here or reloaded).",
+                                [({}, self.retraining.retrains)]))
+        return metrics.render(extra)
+
+    def get_all_students(self) -> Iterator[StudentView]:
+        """Every student, one view at a time."""
+        if not self.service:
+            raise ValueError("DataManager not initialized. Call initialize() first.")
+        return iter(self.service.students.values())
+
+    def count_students(self) -> int:
+        if not self.service:
+            raise ValueError("DataManager not initialized. Call initialize() first.")
+        return len(self.service.students)
+
+    def list_students(
+        self, limit: int = 100, cursor: Optional[str] = None, filters: Optional[Dict[str, str]] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """One page of serialized students matching ``filters`` (``ROSTER_FILTERS`` field -> value).
+
+        Pages are in load order. Pass the returned cursor to get the next
+        page; it is None after the last one. Students added meanwhile show
+        up on later pages. Raises ValueError for a bad cursor or filter.
+        """
+        if not self.service:
+            raise ValueError("DataManager not initialized. Call initialize() first.")
+        after = _decode_cursor(cursor) if cursor else -1
+        rows: List[int] = []
+        for chunk in self.service.roster.iter_rows(self.service.students, filters, after, chunk_size=limit + 1):
+            rows.extend(chunk[:limit + 1 - len(rows)].tolist())
+            if len(rows) > limit:
+                break
+        ids = self.service.students.ids
+        page = [self._serialize_student(ids[row]) for row in rows[:limit]]
+        return page, _encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+
+    def export_students(self, filters: Optional[Dict[str, str]] = None) -> Iterator[Dict]:
+        """Every serialized student matching ``filters``, generated in chunks.
+
+        Filters are validated up front (ValueError); memory use does not
+        depend on how many students match.
+        """
+        if not self.service:
+            raise ValueError("DataManager not initialized. Call initialize() first.")
+        chunks = self.service.roster.iter_rows(self.service.students, filters)
+        ids = self.service.students.ids
+        return (self._serialize_student(ids[row]) for chunk in chunks for row in chunk)
 
     def get_all_courses(self) -> List[str]:
         if not self.service:
             raise ValueError("DataManager not initialized. Call initialize() first.")
         return list(self.service.courses.keys())
 
-    def get_analysis_data(self) -> Dict:
-        """Generate detailed analysis data for dashboard service."""
+    def get_analysis_data(self, filters: Optional[Dict[str, str]] = None) -> Dict:
+        """Generate detailed analysis data for dashboard service.
+
+        ``filters`` restricts it to students with the given learning style,
+        education level or gender. Answered from ``service.analytics``, so
+        the cost depends on the number of courses, not students.
+        """
         if not self.service:
             raise ValueError("DataManager not initialized. Call initialize() first.")
-        students = self.get_all_students()
-        dropout_risk = [s.predicted_dropout_score for s in students if s.predicted_dropout_score is not None]
-        engagement_levels = [s.engagement_level.value for s in students]
-        
-        # Dropout risk distribution
-        dropout_bins = {"0-0.25": 0, "0.25-0.5": 0, "0.5-0.75": 0, "0.75-1.0": 0}
-        for risk in dropout_risk:
-            if risk <= 0.25:
-                dropout_bins["0-0.25"] += 1
-            elif risk <= 0.5:
-                dropout_bins["0.25-0.5"] += 1
-            elif risk <= 0.75:
-                dropout_bins["0.5-0.75"] += 1
-            else:
-                dropout_bins["0.75-1.0"] += 1
-        
-        # Per-course statistics
-        course_stats = {}
-        for course_name, course in self.service.courses.items():
-            course_students = [s for s in students if course_name in s.course_history]
-            if course_students:
-                course_dropout_risk = [s.predicted_dropout_score for s in course_students if s.predicted_dropout_score is not None]
-                course_stats[course_name] = {
-                    "student_count": len(course_students),
-                    "avg_dropout_risk": sum(course_dropout_risk) / len(course_dropout_risk) if course_dropout_risk else 0.0,
-                    "avg_final_exam_score": sum(s.final_exam_scores.get(course_name, 0.0) for s in course_students) / len(course_students)
-                }
-
-        return {
-            "total_students": len(students),
-            "avg_dropout_risk": sum(dropout_risk) / len(dropout_risk) if dropout_risk else 0.0,
-            "engagement_distribution": {
-                "Low": engagement_levels.count("Low"),
-                "Medium": engagement_levels.count("Medium"),
-                "High": engagement_levels.count("High")
-            },
-            "dropout_risk_distribution": dropout_bins,
-            "course_statistics": course_stats
-        }
\ No newline at end of file
+        return self.service.analytics.summary(self.service.students, self.service.courses, filters)
+
+
+def _encode_cursor(row: int) -> str:
+    return base64.urlsafe_b64encode(f"row:{row}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        kind, _, row = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().partition(":")
+        if kind != "row":
+            raise ValueError
+        return int(row)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid cursor {cursor}") from None
@@ -0,0 +1,152 @@
+"""Versioned binary snapshots of a loaded ``RecommendationService``.
+
+A snapshot is a directory holding one ``.npy`` file per array, a small
+``header.json`` and, once trained, the dropout model artifact. Arrays are memory-mapped copy-on-write when loaded, so a
+restart only touches the pages it actually reads and never writes back to
+the snapshot.
+"""
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Optional
+import numpy as np
+from ..ai.classifier import DropoutClassifier
+from ..core.models import Course, CourseStats, RunningStats, LearningStyle
+from ..core.services import RecommendationService
+from ..core.table import StudentTable, STUDENT_COLUMNS, ENROLLMENT_COLUMNS
+from config.settings import Config
+
+SNAPSHOT_VERSION = 4
+HEADER_FILE = "header.json"
+MODEL_DIR = "model"
+
+
+def file_checksum(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, mode='rb') as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_header(path: str) -> Optional[Dict]:
+    """Return the snapshot header, or None if there is no readable snapshot at ``path``."""
+    try:
+        with open(Path(path) / HEADER_FILE, encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def is_current(path: str, source_checksum: str) -> bool:
+    header = read_header(path)
+    return bool(header) and header.get("version") == SNAPSHOT_VERSION and header.get("source_checksum") == source_checksum
+
+
+def save_snapshot(service: RecommendationService, path: str, source_checksum: str) -> None:
+    """Write ``service`` to ``path``, replacing any previous snapshot atomically."""
+    target = Path(path)
+    staging = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    table = service.students
+    service.refresh_features()
+    arrays = {f"student.{name}": table.column(name) for name in STUDENT_COLUMNS}
+    arrays.update({f"enrollment.{name}": table.enrollment_column(name) for name in ENROLLMENT_COLUMNS})
+    arrays["student_ids"] = np.array(table.ids, dtype=str)
+    arrays["feature_ids"] = np.array(service.similarity_index.ids, dtype=str)
+    arrays["features"] = service.similarity_index.matrix
+    arrays["features.classifier"] = service.features.classifier
+    arrays["features.similarity"] = service.features.similarity
+    for name, array in arrays.items():
+        np.save(staging / f"{name}.npy", np.ascontiguousarray(array))
+    classifier = service.classifier
+    if classifier.is_trained:
+        classifier.export(str(staging / MODEL_DIR))
+
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "source_checksum": source_checksum,
+        "num_students": len(table),
+        "num_enrollments": table.num_enrollments,
+        "course_names": table.course_names,
+        "courses": [
+            {
+                "course_name": course.course_name,
+                "content_type_weights": {style.value: weight for style, weight in course.content_type_weights.items()},
+                "difficulty": course.difficulty,
+                "stats": {
+                    metric: [stats.count, stats.mean, stats.squared_deviations]
+                    for metric, stats in vars(service.course_stats[course.course_name]).items()
+                }
+            }
+            for course in service.courses.values()
+        ],
+        "arrays": sorted(arrays),
+        "model": MODEL_DIR if classifier.is_trained else None,
+        "model_training_data_hash": classifier.metadata.get("training_data_hash"),
+    }
+    with open(staging / HEADER_FILE, "w", encoding='utf-8') as file:
+        json.dump(header, file)
+
+    retired = target.with_name(f"{target.name}.old-{os.getpid()}")
+    if target.exists():
+        target.rename(retired)
+    staging.rename(target)
+    shutil.rmtree(retired, ignore_errors=True)
+
+
+def load_snapshot(path: str, config=Config, mmap_mode: Optional[str] = "c") -> RecommendationService:
+    """Rebuild a ``RecommendationService`` from a snapshot without parsing the CSV.
+
+    The dropout model saved with the snapshot, if any, is unpickled here
+    rather than lazily, so replacing the snapshot later cannot pull it away.
+    """
+    source = Path(path)
+    header = read_header(path)
+    if not header or header.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"No compatible snapshot at {path}")
+
+    def load(name: str) -> np.ndarray:
+        return np.load(source / f"{name}.npy", mmap_mode=mmap_mode)
+
+    student_ids, feature_ids = load("student_ids"), load("feature_ids")
+    student_id_list = student_ids.tolist()
+    if np.array_equal(student_ids, feature_ids):
+        feature_id_list = list(student_id_list)
+    else:
+        feature_id_list = feature_ids.tolist()
+
+    service = RecommendationService(config)
+    service.students = StudentTable.from_columns(
+        student_id_list,
+        header["course_names"],
+        {name: load(f"student.{name}") for name in STUDENT_COLUMNS},
+        {name: load(f"enrollment.{name}") for name in ENROLLMENT_COLUMNS}
+    )
+    for entry in header["courses"]:
+        stats = CourseStats(**{
+            metric: RunningStats(count, mean, squared_deviations)
+            for metric, (count, mean, squared_deviations) in entry["stats"].items()
+        })
+        course = Course(
+            course_name=entry["course_name"],
+            content_type_weights={LearningStyle(style): weight for style, weight in entry["content_type_weights"].items()},
+            average_completion_rate=0.0,
+            average_quiz_score=0.0,
+            average_time_spent=0.0,
+            difficulty=entry["difficulty"]
+        )
+        stats.apply_to(course)
+        service.courses[course.course_name] = course
+        service.course_stats[course.course_name] = stats
+    service.features.load_arrays(load("features.classifier"), load("features.similarity"))
+    service.similarity_index.load_matrix(feature_id_list, load("features"))
+    if header.get("model"):
+        service.classifier = DropoutClassifier.load(str(source / header["model"]))
+        service.classifier.model
+    return service
@@ -1,7 +1,10 @@
-from data.manager import DataManager
+import os
+from recommender.data.manager import DataManager
 
 def test_data_loading():
-    dataset_path = "/Users/mac/Desktop/Adaptative-courses/adaptative-course/personalized_learning_dataset.csv"
+    dataset_path = os.environ.get(
+        "DATASET_PATH", os.path.join(os.path.dirname(__file__), "..", "personalized_learning_dataset.csv")
+    )
     data_manager = DataManager(dataset_path)
     
     try:
@@ -20,9 +23,8 @@ def test_data_loading():
             print("Student S00001 not found in dataset.")
         
         # Check total students and courses
-        students = data_manager.get_all_students()
         courses = data_manager.get_all_courses()
-        print(f"Total students loaded: {len(students)}")
+        print(f"Total students loaded: {data_manager.count_students()}")
         print(f"Total courses loaded: {len(courses)}")
         
         # Test a recommendation
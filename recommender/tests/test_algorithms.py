@@ -1,26 +1,37 @@
+import random
 import unittest
-from recommender.algorithms.collaborative_filtering import CollaborativeFiltering
-from recommender.algorithms.content_based import ContentBasedFiltering
+from recommender.algorithms.similarity import CosineSimilarity
+from recommender.algorithms.recommender import CourseRecommender
+from recommender.core.models import Course, LearningStyle
+from recommender.tests.test_similarity import make_student
+
 
 class TestAlgorithms(unittest.TestCase):
 
     def setUp(self):
-        self.collab_filter = CollaborativeFiltering()
-        self.content_filter = ContentBasedFiltering()
+        rng = random.Random(2)
+        self.students = [make_student(f"S{i:05d}", rng) for i in range(6)]
+        self.similarity = CosineSimilarity()
+        self.recommender = CourseRecommender()
 
     def test_collaborative_filtering(self):
-        # Example test case for collaborative filtering
-        user_id = 1
-        recommendations = self.collab_filter.get_recommendations(user_id)
+        courses = [
+            Course(name, {style: 0.25 for style in LearningStyle}, 0.0, 0.0, 0.0)
+            for name in ("Python Basics", "Data Science", "Cybersecurity", "Web Development", "Machine Learning")
+        ]
+        student = self.students[0]
+        available = [course for course in courses if course.course_name not in student.course_history]
+        recommendations = self.recommender.generate_recommendations(student, self.students[1:], available)
         self.assertIsInstance(recommendations, list)
         self.assertGreater(len(recommendations), 0)
+        self.assertTrue({rec.course_name for rec in recommendations} <= {course.course_name for course in available})
 
     def test_content_based_filtering(self):
-        # Example test case for content-based filtering
-        item_id = 1
-        recommendations = self.content_filter.get_recommendations(item_id)
-        self.assertIsInstance(recommendations, list)
-        self.assertGreater(len(recommendations), 0)
+        first, second = self.students[:2]
+        self.assertAlmostEqual(self.similarity.calculate_profile_similarity(first, first), 1.0)
+        score = self.similarity.calculate_profile_similarity(first, second)
+        self.assertGreaterEqual(score, 0.0)
+        self.assertLessEqual(score, 1.0 + 1e-9)
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+from recommender.tests.test_services import make_service
+
+
+def brute_force(service, **filters):
+    students = [s for s in service.students.values() if all(getattr(s, name).value == value for name, value in filters.items())]
+    scores = [s.predicted_dropout_score for s in students]
+    courses = {}
+    for course_name in service.courses:
+        enrolled = [s for s in students if course_name in s.course_history]
+        if enrolled:
+            courses[course_name] = (
+                len(enrolled),
+                np.mean([s.predicted_dropout_score for s in enrolled]),
+                np.mean([s.final_exam_scores[course_name] for s in enrolled])
+            )
+    return len(students), np.mean(scores), np.histogram(scores, [0, 0.25, 0.5, 0.75, 1.0])[0], courses
+
+
+class TestAnalyticsAggregates(unittest.TestCase):
+
+    def setUp(self):
+        self.service = make_service()
+
+    def assertMatchesBruteForce(self, **filters):
+        summary = self.service.analytics.summary(self.service.students, self.service.courses, filters)
+        total, risk, histogram, courses = brute_force(self.service, **filters)
+        self.assertEqual(summary["total_students"], total)
+        self.assertAlmostEqual(summary["avg_dropout_risk"], risk)
+        self.assertEqual(list(summary["dropout_risk_distribution"].values()), list(histogram))
+        self.assertEqual(list(summary["course_statistics"]), list(courses))
+        for course_name, (count, course_risk, exam) in courses.items():
+            stats = summary["course_statistics"][course_name]
+            self.assertEqual(stats["student_count"], count)
+            self.assertAlmostEqual(stats["avg_dropout_risk"], course_risk)
+            self.assertAlmostEqual(stats["avg_final_exam_score"], exam)
+
+    def test_matches_a_full_scan_after_events(self):
+        self.assertMatchesBruteForce()
+        self.service.apply_events([
+            {"student_id": "S003", "course_name": "Data Science", "final_exam_score": 12.0, "engagement_level": "High"},
+            {"student_id": "S300", "course_name": "Cybersecurity", "final_exam_score": 88.0, "age": 22, "gender": "Other",
+             "education_level": "Postgraduate", "learning_style": "Auditory", "engagement_level": "Low"},
+        ])
+        scores = self.service.students.column("predicted_dropout_score")
+        scores[-1] = 0.9
+        self.service.analytics.mark_dirty(len(scores) - 1)
+        self.assertMatchesBruteForce()
+        self.assertMatchesBruteForce(learning_style="Auditory")
+
+    def test_filters_select_group_by_cells(self):
+        self.assertMatchesBruteForce(learning_style="Visual", education_level="Undergraduate")
+        summary = self.service.analytics.summary(self.service.students, self.service.courses, {"gender": "Male"})
+        self.assertEqual(summary["total_students"], 0)
+        self.assertEqual(summary["course_statistics"], {})
+
+    def test_rejects_unknown_filters(self):
+        with self.assertRaises(ValueError):
+            self.service.analytics.summary(self.service.students, self.service.courses, {"age": "20"})
+        with self.assertRaises(ValueError):
+            self.service.analytics.summary(self.service.students, self.service.courses, {"gender": "Robot"})
+
+
+if __name__ == '__main__':
+    unittest.main()
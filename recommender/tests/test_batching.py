@@ -0,0 +1,96 @@
+import threading
+import time
+import unittest
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from recommender.ai.classifier import ModelNotTrainedError
+from recommender.core.batching import MicroBatcher
+from recommender.tests.test_services import make_service
+
+
+class TestMicroBatcher(unittest.TestCase):
+
+    def test_concurrent_calls_share_batches_and_get_their_own_rows(self):
+        calls = []
+        release = threading.Event()
+
+        def score(X):
+            calls.append(len(X))
+            release.wait()  # hold the first batch so the others queue up behind it
+            return X[:, 0] * 2
+
+        batcher = MicroBatcher(score, max_rows=64, max_wait=0.05)
+        results = {}
+
+        def call(value):
+            results[value] = batcher.submit(np.array([[value, 0.0], [value + 0.5, 0.0]]))
+
+        threads = [threading.Thread(target=call, args=(float(value),)) for value in range(10)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sum(calls), 20)
+        self.assertLess(len(calls), 10)
+        for value, (scores, batch_size) in results.items():
+            np.testing.assert_array_equal(scores, [value * 2, value * 2 + 1])
+            self.assertIn(batch_size, calls)
+
+    def test_lone_call_does_not_wait_for_the_window(self):
+        batcher = MicroBatcher(lambda X: X.sum(axis=1), max_wait=5.0)
+        start = time.perf_counter()
+        scores, batch_size = batcher.submit(np.ones((1, 3)))
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual((scores.tolist(), batch_size), ([3.0], 1))
+
+    def test_errors_reach_the_caller(self):
+        def fail(X):
+            raise RuntimeError("model failed")
+        with self.assertRaisesRegex(RuntimeError, "model failed"):
+            MicroBatcher(fail).submit(np.ones((1, 2)))
+
+
+class TestScoreProfiles(unittest.TestCase):
+
+    def setUp(self):
+        self.service = make_service()
+        self.service.refresh_features()
+        self.service.classifier.model = RandomForestClassifier(n_estimators=5, random_state=0)
+        self.service.classifier.train(self.service.features.classifier, np.arange(len(self.service.students)) % 3 == 0)
+
+    def test_profile_scores_like_the_same_student_in_the_table(self):
+        student = self.service.students["S004"]
+        profile = {
+            "age": student.age, "gender": student.gender.value, "education_level": student.education_level.value,
+            "learning_style": student.learning_style.value, "engagement_level": student.engagement_level.value,
+            "courses": [
+                dict(course_name=course, **student.engagement_metrics[course], quiz_attempts=student.quiz_attempts[course],
+                     final_exam_score=student.final_exam_scores[course], feedback_score=student.feedback_scores[course])
+                for course in student.course_history
+            ]
+        }
+        scores, batch_size = self.service.score_profiles([profile, dict(profile, courses=[])])
+        expected = self.service.classifier.predict_proba(self.service.features.classifier[[student.row]])[0]
+        self.assertEqual(scores[0], expected)
+        self.assertEqual(batch_size, 2)
+
+    def test_invalid_profile_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, "Invalid profile 1: missing 'age'"):
+            self.service.score_profiles([
+                {"age": 20, "gender": "Male", "education_level": "Undergraduate",
+                 "learning_style": "Visual", "engagement_level": "Low"},
+                {"gender": "Male"},
+            ])
+
+
+    def test_untrained_model_is_reported_separately(self):
+        service = make_service()
+        with self.assertRaises(ModelNotTrainedError):
+            service.score_profiles([{"age": 20, "gender": "Male", "education_level": "Undergraduate",
+                                     "learning_style": "Visual", "engagement_level": "Low"}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from recommender.core.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache(max_size=2, ttl=10, clock=self.clock)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.cache.set("c", 3)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.set("a", 1)
+        self.clock.now = 9.9
+        self.assertEqual(self.cache.get("a"), 1)
+        self.clock.now = 10.0
+        self.assertIsNone(self.cache.get("a"))
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["expirations"]), (1, 1, 1))
+
+    def test_result_computed_across_an_invalidation_is_not_stored(self):
+        def compute():
+            self.cache.invalidate("other")
+            return "stale"
+        self.assertEqual(self.cache.get_or_compute("a", compute), "stale")
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.get_or_compute("a", lambda: "fresh"), "fresh")
+        self.assertEqual(self.cache.get_or_compute("a", lambda: "unused"), "fresh")
+
+    def test_invalidate_where_and_disabled_cache(self):
+        self.cache.set(("a", 3), 1)
+        self.cache.set(("b", 3), 2)
+        self.assertEqual(self.cache.invalidate_where(lambda key, value: key[0] == "a"), 1)
+        self.assertEqual([key for key, _ in self.cache.items()], [("b", 3)])
+        disabled = TTLCache(max_size=10, ttl=0)
+        disabled.set("a", 1)
+        self.assertEqual(len(disabled), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
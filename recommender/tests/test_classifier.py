@@ -0,0 +1,52 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from recommender.ai.classifier import DropoutClassifier, training_data_hash
+
+FEATURES = ["age", "gender"]
+
+
+class TestClassifierArtifacts(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.path = str(self.directory / "model")
+        rng = np.random.default_rng(0)
+        self.X = rng.random((200, 2))
+        self.y = list(self.X[:, 0] > 0.7)
+        self.classifier = DropoutClassifier()
+        self.classifier.model = RandomForestClassifier(n_estimators=10, random_state=0)
+        self.classifier.train(self.X, self.y)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_saved_model_loads_lazily_with_same_predictions(self):
+        data_hash = training_data_hash(self.X, self.y)
+        self.classifier.save(self.path, {"feature_columns": FEATURES, "training_data_hash": data_hash, "metrics": {"accuracy": 1.0}})
+        loaded = DropoutClassifier.load(self.path)
+        self.assertFalse(loaded.is_loaded)
+        self.assertEqual(loaded.metadata["metrics"], {"accuracy": 1.0})
+        self.assertEqual(loaded.threshold, self.classifier.threshold)
+        np.testing.assert_array_equal(loaded.predict_proba(self.X), self.classifier.predict_proba(self.X))
+        self.assertTrue(loaded.is_loaded)
+
+    def test_compatibility_requires_same_features_and_data(self):
+        data_hash = training_data_hash(self.X, self.y)
+        self.assertFalse(DropoutClassifier.is_compatible(self.path, FEATURES, data_hash))
+        self.classifier.save(self.path, {"feature_columns": FEATURES, "training_data_hash": data_hash})
+        self.assertTrue(DropoutClassifier.is_compatible(self.path, FEATURES, data_hash))
+        self.assertFalse(DropoutClassifier.is_compatible(self.path, FEATURES + ["age2"], data_hash))
+        changed = self.X.copy()
+        changed[0, 0] += 1e-9
+        self.assertFalse(DropoutClassifier.is_compatible(self.path, FEATURES, training_data_hash(changed, self.y)))
+
+    def test_untrained_classifier_cannot_be_saved(self):
+        with self.assertRaises(ValueError):
+            DropoutClassifier().save(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
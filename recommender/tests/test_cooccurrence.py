@@ -0,0 +1,86 @@
+import unittest
+import numpy as np
+from recommender.core.cooccurrence import CourseCooccurrence
+from recommender.tests.test_services import make_row, make_service
+from config.settings import Config
+
+
+class ItemConfig(Config):
+    COLLABORATIVE_NEIGHBORS = 'item'
+
+
+def brute_force(table):
+    exams = table.course_scores(np.arange(len(table)))
+    taken = ~np.isnan(exams)
+    passed = np.nan_to_num(exams) > 0
+    return (
+        taken.T.astype(int) @ taken.astype(int),
+        taken.T.astype(int) @ passed.astype(int),
+        taken.T.astype(float) @ np.where(passed, exams / 100.0, 0.0)
+    )
+
+
+class TestCourseCooccurrence(unittest.TestCase):
+
+    def setUp(self):
+        self.service = make_service(config=ItemConfig)
+
+    def assertMatchesBruteForce(self):
+        matrices = self.service.cooccurrence.matrices(self.service.students)
+        together, passed, success = brute_force(self.service.students)
+        np.testing.assert_array_equal(matrices.together, together)
+        np.testing.assert_array_equal(matrices.passed, passed)
+        np.testing.assert_allclose(matrices.success, success)
+
+    def test_incremental_updates_match_a_full_scan(self):
+        self.assertMatchesBruteForce()
+        self.service.load_student_from_csv_row(make_row("S003", "Machine Learning", 80, 80, 100, exam=91))
+        self.service.load_student_from_csv_row(make_row("S004", "Python Basics", 80, 80, 100, exam=0))
+        self.service.load_student_from_csv_row(make_row("S900", "Cybersecurity", 80, 80, 100, exam=45))
+        self.assertMatchesBruteForce()
+        fresh = CourseCooccurrence().matrices(self.service.students)
+        np.testing.assert_array_equal(self.service.cooccurrence.matrices(self.service.students).together, fresh.together)
+
+    def test_conditional_success(self):
+        matrices = self.service.cooccurrence.matrices(self.service.students)
+        together, passed, _ = brute_force(self.service.students)
+        np.testing.assert_allclose(matrices.conditional_success(), passed / np.diag(together)[:, None])
+
+
+class TestItemRecommendations(unittest.TestCase):
+
+    def setUp(self):
+        self.service = make_service(config=ItemConfig)
+
+    def test_scores_come_from_students_who_took_the_same_courses(self):
+        service = self.service
+        table = service.students
+        exams = table.course_scores(np.arange(len(table)))
+        row = table.index["S000"]
+        taken = ~np.isnan(exams[row])
+        peers = ~np.isnan(exams[:, taken])
+        for recommendation in service.generate_recommendations("S000", 3):
+            column = exams[:, table.course_index[recommendation.course_name]]
+            # every peer counts once per shared course
+            scores = np.repeat(column, peers.sum(axis=1))
+            scores = scores[scores > 0]
+            self.assertIn(
+                f"Popular among {len(scores)} students who took the same courses (avg success: {np.mean(scores) / 100:.2f})",
+                recommendation.reasoning
+            )
+
+    def test_new_student_without_co_enrollment_uses_course_success(self):
+        self.service.load_student_from_csv_row(make_row("S900", "Quantum Computing", 80, 80, 100, exam=70))
+        recommendations = self.service.generate_recommendations("S900", 5)
+        self.assertEqual(len(recommendations), 5)
+        for recommendation in recommendations:
+            self.assertIn("students of the course", recommendation.reasoning)
+
+    def test_batch_matches_single_student_recommendations(self):
+        student_ids = [f"S{i:03d}" for i in range(0, 120, 5)]
+        for student_id, recommendations in self.service.generate_recommendations_batch(student_ids, 3, chunk_size=7):
+            self.assertEqual(recommendations, self.service.generate_recommendations(student_id, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
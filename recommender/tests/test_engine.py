@@ -1,28 +1,39 @@
+import io
+import contextlib
 import unittest
-from recommender.core.engine import RecommendationEngine
+import numpy as np
+from recommender.core.services import RecommendationService
+from recommender.tests.test_services import make_service
+
 
 class TestRecommendationEngine(unittest.TestCase):
 
     def setUp(self):
-        self.engine = RecommendationEngine()
+        self.engine = make_service()
+        self.engine.students.column("dropout_likelihood")[:] = np.arange(len(self.engine.students)) % 4 == 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.engine.train_classifier()
 
     def test_generate_recommendations(self):
-        user_id = 1
-        recommendations = self.engine.generate_recommendations(user_id)
+        with contextlib.redirect_stdout(io.StringIO()):
+            recommendations = self.engine.generate_recommendations("S001")
         self.assertIsInstance(recommendations, list)
         self.assertGreater(len(recommendations), 0)
 
     def test_empty_user(self):
-        user_id = 9999  # Assuming this user does not exist
-        recommendations = self.engine.generate_recommendations(user_id)
+        recommendations = self.engine.generate_recommendations("S9999")  # this student does not exist
         self.assertEqual(recommendations, [])
+        self.assertEqual(RecommendationService().generate_recommendations("S001"), [])
 
     def test_recommendation_quality(self):
-        user_id = 1
-        recommendations = self.engine.generate_recommendations(user_id)
-        # Assuming we have a way to evaluate the quality of recommendations
-        quality_score = self.engine.evaluate_recommendations(recommendations)
-        self.assertGreaterEqual(quality_score, 0.7)  # Example threshold
+        student = self.engine.students["S001"]
+        with contextlib.redirect_stdout(io.StringIO()):
+            recommendations = self.engine.generate_recommendations("S001", 5)
+        # Only courses the student has not taken, best first
+        self.assertTrue(all(rec.course_name not in student.course_history for rec in recommendations))
+        scores = [rec.relevance_score for rec in recommendations]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(all(0.0 <= score <= 1.25 for score in scores))
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,57 @@
+import random
+import unittest
+import numpy as np
+from recommender.ai.features import FeatureStore, encode_profiles, encode_table, NUM_CLASSIFIER_FEATURES, NUM_SIMILARITY_FEATURES
+from recommender.core.table import StudentTable
+from recommender.tests.test_similarity import make_student
+
+
+class TestFeatureStore(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(5)
+        self.profiles = [make_student(f"S{i:05d}", rng) for i in range(40)]
+        self.table = StudentTable()
+        for profile in self.profiles:
+            self.table.add_profile(profile)
+        self.store = FeatureStore(initial_capacity=4)
+
+    def test_matches_per_profile_encoding(self):
+        self.store.refresh(self.table)
+        self.assertEqual(self.store.classifier.shape, (40, NUM_CLASSIFIER_FEATURES))
+        self.assertEqual(self.store.similarity.shape, (40, NUM_SIMILARITY_FEATURES))
+        for row, profile in enumerate(self.profiles[:5]):
+            classifier, similarity = encode_profiles([profile])
+            np.testing.assert_array_equal(self.store.classifier[row], classifier[0])
+            np.testing.assert_array_equal(self.store.similarity[row], similarity[0])
+
+    def test_averages_over_enrolled_courses(self):
+        profile = self.profiles[0]
+        classifier, similarity = encode_profiles([profile])
+        courses = len(profile.course_history)
+        expected_exam = sum(profile.final_exam_scores.values()) / courses / 100.0
+        self.assertAlmostEqual(classifier[0, 17], expected_exam)
+        self.assertAlmostEqual(similarity[0, 13], expected_exam)
+        self.assertEqual(similarity[0, 15], 1.0 if profile.dropout_likelihood else 0.0)
+
+    def test_refresh_recomputes_only_dirty_and_new_rows(self):
+        self.store.refresh(self.table)
+        self.assertEqual(len(self.store.refresh(self.table)), 0)
+        row = self.table.index["S00003"]
+        metrics = dict.fromkeys(("time_spent_on_videos", "quiz_scores", "forum_participation", "assignment_completion_rate"), 0.0)
+        self.table.set_enrollment(row, "Python Basics", metrics, 1, 0.0, 1)
+        self.table.add_profile(make_student("S99999", random.Random(1)))
+        self.store.mark_dirty(row)
+        changed = self.store.refresh(self.table)
+        np.testing.assert_array_equal(changed, [row, 40])
+        classifier, similarity = encode_table(self.table)
+        np.testing.assert_array_equal(self.store.classifier, classifier)
+        np.testing.assert_array_equal(self.store.similarity, similarity)
+
+    def test_duplicate_profiles_are_encoded_independently(self):
+        classifier, _ = encode_profiles([self.profiles[0], self.profiles[0]])
+        np.testing.assert_array_equal(classifier[0], classifier[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
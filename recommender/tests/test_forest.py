@@ -0,0 +1,62 @@
+import pickle
+import unittest
+import numpy as np
+from sklearn.ensemble import ExtraTreesClassifier, HistGradientBoostingClassifier, RandomForestClassifier
+from recommender.ai.classifier import DropoutClassifier
+from recommender.ai.forest import FlatForest
+
+
+class TestFlatForest(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = rng.normal(size=(600, 6))
+        self.y = (self.X[:, 0] + rng.normal(size=600)) > 1.0
+        self.queries = rng.normal(size=(300, 6))
+
+    def test_probabilities_are_identical_to_sklearn(self):
+        for model in (
+            RandomForestClassifier(n_estimators=25, class_weight="balanced", random_state=0),
+            RandomForestClassifier(n_estimators=10, max_depth=3, random_state=1),
+            ExtraTreesClassifier(n_estimators=15, min_samples_leaf=3, random_state=2),
+        ):
+            model.fit(self.X, self.y)
+            forest = FlatForest.from_estimator(model)
+            expected = model.predict_proba(self.queries)[:, 1]
+            np.testing.assert_array_equal(forest.predict_proba(self.queries), expected)
+            np.testing.assert_array_equal(forest.predict_proba(self.queries[:1]), expected[:1])
+            self.assertEqual(forest.predict_proba(self.queries[:0]).shape, (0,))
+
+    def test_other_models_are_not_flattened(self):
+        model = HistGradientBoostingClassifier(max_iter=5).fit(self.X, self.y)
+        self.assertIsNone(FlatForest.from_estimator(model))
+
+    def test_rejects_wrong_feature_count(self):
+        forest = FlatForest.from_estimator(RandomForestClassifier(n_estimators=2).fit(self.X, self.y))
+        with self.assertRaises(ValueError):
+            forest.predict_proba(self.queries[:, :5])
+
+
+class TestClassifierInference(unittest.TestCase):
+
+    def test_small_batches_use_the_flat_forest(self):
+        rng = np.random.default_rng(1)
+        X = rng.normal(size=(300, 4))
+        classifier = DropoutClassifier()
+        classifier.model = RandomForestClassifier(n_estimators=10, random_state=0)
+        classifier.train(X, X[:, 1] > 0.5)
+        expected = classifier.model.predict_proba(X)[:, 1]
+        np.testing.assert_array_equal(classifier.predict_proba(X[:3]), expected[:3])
+        self.assertIsNotNone(classifier.flat_forest)
+        np.testing.assert_array_equal(classifier.predict_proba(X), expected)
+
+        restored = pickle.loads(pickle.dumps(classifier))
+        self.assertIsNone(restored._flat_forest)
+        np.testing.assert_array_equal(restored.predict_proba(X[:3]), expected[:3])
+
+        classifier.train(X, X[:, 2] > 0.5)
+        self.assertIsNone(classifier._flat_forest)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,24 +1,88 @@
+import csv
+import os
+import tempfile
 import unittest
+import numpy as np
 from recommender.data.loader import DataLoader
+from recommender.benchmarks.generate_dataset import generate_dataset
+from recommender.core.table import STUDENT_COLUMNS, ENROLLMENT_COLUMNS
+from recommender.tests.test_services import make_row
 
 class TestDataLoader(unittest.TestCase):
 
     def setUp(self):
-        self.loader = DataLoader()
+        handle, self.path = tempfile.mkstemp(suffix=".csv")
+        os.close(handle)
+        generate_dataset(self.path, 50, courses_per_student=2, seed=3)
+        self.loader = DataLoader(self.path)
+
+    def tearDown(self):
+        os.remove(self.path)
 
     def test_load_data(self):
-        data = self.loader.load_data('path/to/dataset.csv')
-        self.assertIsNotNone(data)
-        self.assertGreater(len(data), 0)
+        self.loader.load_dataset()
+        service = self.loader.get_service()
+        self.assertEqual(len(service.students), 50)
+        self.assertEqual(service.students.num_enrollments, 100)
+        self.assertEqual(len(service.similarity_index), 50)
 
     def test_load_invalid_data(self):
         with self.assertRaises(FileNotFoundError):
-            self.loader.load_data('path/to/nonexistent.csv')
+            DataLoader('path/to/nonexistent.csv').load_dataset()
 
     def test_data_format(self):
-        data = self.loader.load_data('path/to/dataset.csv')
-        self.assertTrue(isinstance(data, list))
-        self.assertTrue(all(isinstance(item, dict) for item in data))
+        self.loader.load_dataset()
+        student = self.loader.get_service().students["S00001"]
+        self.assertEqual(len(student.course_history), 2)
+        self.assertTrue(all(isinstance(score, float) for score in student.final_exam_scores.values()))
+
+
+class TestBulkLoading(unittest.TestCase):
+
+    def setUp(self):
+        rows = [
+            make_row("S1", "Python Basics", 80, 60, 100),
+            make_row("S2", "Data Science", 90, 70, 200, Gender="Male", Learning_Style="Kinesthetic"),
+            make_row("S1", "Cybersecurity", 50, 50, 50),
+            make_row("S3", "Python Basics", 40, 95, 30, Engagement_Level="High"),
+            make_row("S1", "Python Basics", 85, 65, 110),  # overwrites S1's first row
+            make_row("S4", "Machine Learning", 70, 75, 300, Dropout_Likelihood="Yes"),
+            make_row("S2", "Python Basics", 60, 55, 120),
+        ]
+        handle, self.path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def assertSameState(self, expected, actual):
+        self.assertEqual(expected.students.ids, actual.students.ids)
+        self.assertEqual(expected.students.course_names, actual.students.course_names)
+        for name in STUDENT_COLUMNS:
+            if name != "last_updated":
+                np.testing.assert_array_equal(expected.students.column(name), actual.students.column(name))
+        for name in ENROLLMENT_COLUMNS:
+            np.testing.assert_array_equal(expected.students.enrollment_column(name), actual.students.enrollment_column(name))
+        self.assertEqual(list(expected.courses.items()), list(actual.courses.items()))
+        self.assertEqual(expected.course_stats, actual.course_stats)
+        np.testing.assert_array_equal(expected.similarity_index.matrix, actual.similarity_index.matrix)
+
+    def test_bulk_load_matches_row_by_row_load(self):
+        reference = DataLoader(self.path)
+        reference.load_dataset()
+        for workers in (1, 2):
+            bulk = DataLoader(self.path)
+            bulk.load_dataset_bulk(chunksize=2, workers=workers)
+            self.assertSameState(reference.get_service(), bulk.get_service())
+
+    def test_unknown_enum_value_is_rejected(self):
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write("S9,20,Robot,Undergraduate,Python Basics,1,1,1,1,1,Low,1,Visual,1,No\n")
+        with self.assertRaises(ValueError):
+            DataLoader(self.path).load_dataset_bulk()
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
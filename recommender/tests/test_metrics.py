@@ -0,0 +1,46 @@
+import unittest
+from recommender.core.metrics import Histogram, Metric, MetricsRegistry, registry
+from recommender.tests.test_services import make_service
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_buckets_are_cumulative_and_inclusive(self):
+        histogram = Histogram((0.1, 1.0))
+        for seconds in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(seconds)
+        counts, total = histogram.snapshot()
+        self.assertEqual(counts, [2, 3, 4])
+        self.assertAlmostEqual(total, 2.65)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_disabled_registry_records_nothing(self):
+        metrics = MetricsRegistry(enabled=False)
+        with metrics.stage("scoring"):
+            pass
+        metrics.observe("load", 1.0)
+        self.assertNotIn("recommender_stage_seconds_count", metrics.render())
+
+    def test_render_includes_stages_and_extra_metrics(self):
+        metrics = MetricsRegistry(buckets=(0.5,))
+        metrics.observe("load", 0.25)
+        text = metrics.render([Metric("recommender_model_info", "gauge", "Model.", [({"version": 'a"b'}, 1)])])
+        self.assertIn('recommender_stage_seconds_bucket{stage="load",le="0.5"} 1', text)
+        self.assertIn('recommender_stage_seconds_bucket{stage="load",le="+Inf"} 1', text)
+        self.assertIn('recommender_stage_seconds_count{stage="load"} 1', text)
+        self.assertIn('recommender_model_info{version="a\\"b"} 1', text)
+
+    def test_recommendation_pipeline_reports_its_stages(self):
+        service = make_service()
+        service.refresh_features()
+        registry.reset()
+        service.generate_recommendations("S001", 3)
+        text = registry.render()
+        for stage in ("neighbor_search", "scoring"):
+            self.assertIn(f'recommender_stage_seconds_count{{stage="{stage}"}} 1', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from unittest import mock
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from recommender.ai import model_selection
+from recommender.ai.model_selection import (
+    BalancedHistGradientBoostingClassifier, Candidate, ModelSelector, default_candidates, tune_threshold
+)
+from recommender.core.services import fit_dropout_classifier
+
+
+def f_beta(y, predicted, beta):
+    tp = np.sum(y & predicted)
+    precision = tp / predicted.sum() if predicted.sum() else 0.0
+    recall = tp / y.sum()
+    return (1 + beta ** 2) * precision * recall / (beta ** 2 * precision + recall) if tp else 0.0
+
+
+def make_data(rows=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, 4))
+    y = (X[:, 0] + rng.normal(scale=0.8, size=rows)) > 0.8
+    return X, y
+
+
+class TestTuneThreshold(unittest.TestCase):
+
+    def test_matches_brute_force_search(self):
+        rng = np.random.default_rng(3)
+        y = rng.random(200) < 0.3
+        probabilities = np.round(np.clip(y * 0.2 + rng.random(200) * 0.8, 0, 1), 2)  # with ties
+        for beta in (0.5, 1.0, 2.0):
+            threshold, score = tune_threshold(y, probabilities, beta)
+            best = max(f_beta(y, probabilities > t, beta) for t in np.concatenate(([0.0], probabilities)))
+            self.assertAlmostEqual(score, best)
+            self.assertAlmostEqual(f_beta(y, probabilities > threshold, beta), best)
+
+
+class TestModelSelector(unittest.TestCase):
+
+    def setUp(self):
+        self.X, self.y = make_data()
+        self.candidates = [
+            Candidate("hgb", HistGradientBoostingClassifier(max_iter=20, random_state=0)),
+            Candidate("rf", RandomForestClassifier(n_estimators=10, random_state=0)),
+        ]
+
+    def test_evaluates_every_candidate_with_tuned_thresholds(self):
+        results = ModelSelector(self.candidates, folds=3, workers=1).evaluate(self.X, self.y)
+        self.assertEqual({result.name for result in results}, {"hgb", "rf"})
+        for result in results:
+            self.assertGreater(result.roc_auc, 0.7)
+            self.assertEqual(result.oof_probabilities.shape, (len(self.y),))
+            self.assertEqual(tune_threshold(self.y, result.oof_probabilities), (result.threshold, result.score))
+            self.assertGreater(result.single_row_ms, 0)
+
+    def test_prefers_cheaper_model_within_tolerance(self):
+        results = ModelSelector(self.candidates, folds=3, workers=1).evaluate(self.X, self.y)
+        accurate = results[0]._replace(name="accurate", score=0.80, single_row_ms=9.0)
+        cheap = results[0]._replace(name="cheap", score=0.795, single_row_ms=1.0)
+        cheaper_but_worse = results[0]._replace(name="worse", score=0.70, single_row_ms=0.1)
+        ranked = ModelSelector(tolerance=0.01).rank([accurate, cheaper_but_worse, cheap])
+        self.assertEqual([result.name for result in ranked], ["cheap", "accurate", "worse"])
+
+    def test_exhausted_budget_falls_back_to_the_default_model(self):
+        self.assertEqual(ModelSelector(self.candidates, workers=1, time_budget=1e-9).evaluate(self.X, self.y), [])
+        selector = ModelSelector(self.candidates, workers=1, time_budget=1e-9)
+        classifier, _ = fit_dropout_classifier(self.X, self.y, ["a", "b", "c", "d"], selector=selector)
+        self.assertIsInstance(classifier.model, RandomForestClassifier)
+        self.assertEqual(classifier.threshold, 0.2)
+
+    def test_selected_model_is_refit_on_all_rows(self):
+        selector = ModelSelector(self.candidates, folds=3, workers=2)
+        classifier, probabilities = fit_dropout_classifier(self.X, self.y, ["a", "b", "c", "d"], selector=selector)
+        best = classifier.metadata["selection"][0]
+        self.assertEqual(classifier.threshold, best["threshold"])
+        self.assertEqual(len(classifier.metadata["selection"]), 2)
+        self.assertEqual(classifier.model.n_features_in_, 4)
+        np.testing.assert_array_equal(probabilities, classifier.predict_proba(self.X))
+        self.assertEqual(classifier.predict(self.X[:5]), [bool(p > classifier.threshold) for p in probabilities[:5]])
+
+
+class TestDefaultCandidates(unittest.TestCase):
+
+    def test_hist_gradient_boosting_is_balanced_without_class_weight(self):
+        # scikit-learn < 1.2, such as the pinned 0.24, has no class_weight for it
+        with mock.patch.object(model_selection, "HGB_CLASS_WEIGHT", False):
+            candidates = dict(default_candidates())
+        self.assertIn("hgb_100", candidates)
+        self.assertIn("hgb_200_slow", candidates)
+        estimator = candidates["hgb_100"]
+        self.assertIsInstance(estimator, BalancedHistGradientBoostingClassifier)
+        self.assertIsNone(estimator.get_params().get("class_weight"))
+
+        X, y = make_data()
+        balanced = model_selection.clone(estimator).fit(X, y)
+        if model_selection.HGB_CLASS_WEIGHT:
+            native = HistGradientBoostingClassifier(
+                max_iter=100, learning_rate=0.1, class_weight="balanced", random_state=42).fit(X, y)
+            np.testing.assert_allclose(balanced.predict_proba(X), native.predict_proba(X))
+        unweighted = HistGradientBoostingClassifier(max_iter=100, learning_rate=0.1, random_state=42).fit(X, y)
+        self.assertGreater(balanced.predict_proba(X)[:, 1].mean(), unweighted.predict_proba(X)[:, 1].mean())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+from recommender.api.profiling import RequestProfiler
+
+
+class TestRequestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.output_dir = tempfile.mkdtemp()
+        self.profiler = RequestProfiler(enabled=True, min_interval=10, output_dir=self.output_dir, clock=lambda: self.now)
+
+    def test_profiles_are_rate_limited(self):
+        self.assertTrue(self.profiler.acquire())
+        self.now = 9.5
+        self.assertFalse(self.profiler.acquire())
+        self.now = 10.0
+        self.assertTrue(self.profiler.acquire())
+
+    def test_disabled_profiler_never_profiles(self):
+        self.assertFalse(RequestProfiler(enabled=False, min_interval=0).acquire())
+
+    def test_finished_profile_is_stored_and_readable(self):
+        profile = self.profiler.start()
+        sorted(range(1000), key=lambda value: -value)
+        profile_id = self.profiler.finish(profile, "GET /api/recommendations/S1")
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, profile_id + ".prof")))
+        report = self.profiler.report(profile_id)
+        self.assertTrue(report.startswith("GET /api/recommendations/S1"))
+        self.assertIn("function calls", report)
+        self.assertIsNone(self.profiler.report("../" + profile_id))
+        self.assertIsNone(self.profiler.report("1-1"))
+
+    def test_profile_id_can_be_handed_out_before_finishing(self):
+        profile_id = self.profiler.new_id()
+        profile = self.profiler.start()
+        self.assertEqual(self.profiler.finish(profile, "GET /api/students/export", profile_id), profile_id)
+        self.assertTrue(self.profiler.report(profile_id).startswith("GET /api/students/export"))
+
+
+if __name__ == '__main__':
+    unittest.main()
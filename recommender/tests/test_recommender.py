@@ -0,0 +1,49 @@
+import random
+import unittest
+from recommender.algorithms.recommender import CourseRecommender
+from recommender.core.models import Course, LearningStyle
+from recommender.tests.test_similarity import make_student
+
+
+def make_course(name, visual):
+    weights = {style: (1.0 - visual) / 3 for style in LearningStyle}
+    weights[LearningStyle.VISUAL] = visual
+    return Course(name, weights, 0.0, 0.0, 0.0)
+
+
+class TestCourseRecommender(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(2)
+        self.student = make_student("S00000", rng)
+        self.student.learning_style = LearningStyle.VISUAL
+        self.neighbors = [make_student(f"S{i:05d}", rng) for i in range(1, 4)]
+        self.courses = [make_course("Python Basics", 0.2), make_course("Data Science", 0.6), make_course("Cybersecurity", 0.4)]
+
+    def test_scores_combine_style_match_and_neighbor_success(self):
+        for neighbor, exam in zip(self.neighbors, (80.0, 60.0, 0.0)):
+            neighbor.course_history = ["Python Basics"]
+            neighbor.final_exam_scores = {"Python Basics": exam}
+        recommendations = CourseRecommender().generate_recommendations(self.student, self.neighbors, self.courses, 3)
+        self.assertEqual([r.course_name for r in recommendations], ["Python Basics", "Data Science", "Cybersecurity"])
+        self.assertAlmostEqual(recommendations[0].relevance_score, 0.5 * 0.2 + 0.5 * 0.7)
+        self.assertEqual(
+            recommendations[0].reasoning,
+            "Matches learning style (Visual: 0.20). Popular among 2 similar students (avg success: 0.70)."
+        )
+
+    def test_high_dropout_risk_and_top_n(self):
+        self.student.predicted_dropout_score = 0.9
+        recommendations = CourseRecommender().generate_recommendations(self.student, [], self.courses, 2)
+        self.assertEqual([r.course_name for r in recommendations], ["Data Science", "Cybersecurity"])
+        self.assertAlmostEqual(recommendations[0].relevance_score, 0.3 + 0.25)
+        self.assertTrue(recommendations[0].reasoning.endswith("Adjusted for high dropout risk (+0.25)."))
+
+    def test_ties_keep_course_order(self):
+        courses = [make_course(name, 0.5) for name in ("A", "B", "C")]
+        recommendations = CourseRecommender().generate_recommendations(self.student, [], courses, 3)
+        self.assertEqual([r.course_name for r in recommendations], ["A", "B", "C"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import contextlib
+import io
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+from config.settings import Config
+from recommender.core.retraining import ModelWatcher, RetrainingScheduler
+from recommender.core.services import fit_dropout_classifier
+from recommender.data.manager import DataManager
+from recommender.tests.test_services import make_service
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRetrainingScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.service = make_service()
+        self.service.students.column("dropout_likelihood")[:] = np.arange(len(self.service.students)) % 3 == 0
+        self.service.training_snapshot()
+
+    def test_triggers_on_interval_and_drift(self):
+        clock = FakeClock()
+        scheduler = RetrainingScheduler(self.service, interval=60, drift_threshold=0.1, clock=clock)
+        self.assertFalse(scheduler.should_retrain())
+        clock.now = 60
+        self.assertTrue(scheduler.should_retrain())
+
+        scheduler = RetrainingScheduler(self.service, drift_threshold=0.1, clock=clock)
+        self.service.apply_events([{"student_id": f"S{i:03d}", "course_name": "Data Science", "quiz_scores": 1.0} for i in range(11)])
+        self.assertFalse(scheduler.should_retrain())
+        self.service.apply_events([{"student_id": "S050", "course_name": "Data Science", "quiz_scores": 1.0}])
+        self.assertTrue(scheduler.should_retrain())
+
+    def test_retrain_in_worker_process_swaps_model_and_scores(self):
+        self.service.generate_recommendations("S000", 3)
+        old_classifier = self.service.classifier
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            scheduler = RetrainingScheduler(self.service, executor=executor)
+            scheduler.retrain()
+        self.assertIsNot(self.service.classifier, old_classifier)
+        expected = self.service.classifier.predict_proba(self.service.features.classifier)
+        np.testing.assert_array_equal(self.service.students.column("predicted_dropout_score"), expected)
+        self.assertEqual(len(self.service.recommendation_cache), 0)
+        self.assertEqual(self.service.rows_changed_since_training, 0)
+
+    def test_students_changed_during_training_are_rescored_by_the_new_model(self):
+        service = self.service
+        X, y = service.training_snapshot()
+        classifier, probabilities = fit_dropout_classifier(X, y, service.preprocessor.feature_columns)
+        service.apply_events([
+            {"student_id": "S004", "course_name": "Data Science", "final_exam_score": 12.0},
+            {"student_id": "S500", "course_name": "Data Science", "age": 22, "gender": "Male",
+             "education_level": "Postgraduate", "learning_style": "Visual", "engagement_level": "High"},
+        ])
+        service.install_classifier(classifier, X, probabilities)
+        expected = classifier.predict_proba(service.features.classifier)
+        np.testing.assert_array_equal(service.students.column("predicted_dropout_score"), expected)
+
+
+class TestSharedRetraining(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.model_path = str(Path(self.directory.name) / "model")
+        self.service = make_service()
+        self.service.students.column("dropout_likelihood")[:] = np.arange(len(self.service.students)) % 3 == 0
+
+    def test_watcher_installs_each_model_saved_at_model_path(self):
+        watcher = ModelWatcher(self.service, self.model_path)
+        self.assertFalse(watcher.check())  # nothing saved yet
+        X, y = self.service.training_snapshot()
+        with contextlib.redirect_stdout(io.StringIO()):
+            saved, _ = fit_dropout_classifier(X, y, self.service.preprocessor.feature_columns, self.model_path)
+        self.assertTrue(watcher.check())
+        classifier = self.service.classifier
+        self.assertEqual(classifier.metadata["model_version"], saved.metadata["model_version"])
+        np.testing.assert_array_equal(self.service.students.column("predicted_dropout_score"),
+                                      saved.predict_proba(self.service.features.classifier))
+        self.assertFalse(watcher.check())
+        self.assertIs(self.service.classifier, classifier)
+
+    def test_only_one_process_retrains_a_shared_model(self):
+        config = type("SharedConfig", (Config,), {"RETRAIN_INTERVAL": 3600, "MODEL_PATH": self.model_path})
+        managers = [DataManager("unused.csv", config) for _ in range(2)]
+        for manager in managers:
+            manager.service = self.service
+            manager.start_retraining(shared=True)
+            self.addCleanup(manager.stop_retraining)
+        self.assertIsInstance(managers[0].retraining, RetrainingScheduler)
+        self.assertIsInstance(managers[1].retraining, ModelWatcher)
+        managers[0].start_retraining(shared=True)  # keeps its lock
+        self.assertIsInstance(managers[0].retraining, RetrainingScheduler)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import numpy as np
+from recommender.core.analytics import RISK_BIN_LABELS
+from recommender.core.roster import risk_bands
+from recommender.data.manager import DataManager
+from recommender.tests.test_services import make_row, make_service
+
+
+def matching_ids(service, filters):
+    ids = []
+    for student_id in service.students.ids:
+        student = service.students[student_id]
+        score = student.predicted_dropout_score
+        band = None if score is None or np.isnan(score) else RISK_BIN_LABELS[risk_bands(np.array([score]))[0]]
+        if "course" in filters and filters["course"] not in student.course_history:
+            continue
+        if "learning_style" in filters and student.learning_style.value != filters["learning_style"]:
+            continue
+        if "risk_band" in filters and band != filters["risk_band"]:
+            continue
+        ids.append(student_id)
+    return ids
+
+
+class TestRosterListing(unittest.TestCase):
+
+    FILTERS = [
+        {},
+        {"course": "Data Science"},
+        {"learning_style": "Visual", "risk_band": "0-0.25"},
+        {"course": "Cybersecurity", "learning_style": "Kinesthetic", "risk_band": "0.5-0.75"},
+    ]
+
+    def setUp(self):
+        self.service = make_service()
+        self.manager = DataManager("unused.csv")
+        self.manager.service = self.service
+
+    def all_pages(self, filters, limit):
+        ids, cursor = [], None
+        while True:
+            page, cursor = self.manager.list_students(limit, cursor, filters)
+            ids.extend(student["student_id"] for student in page)
+            if cursor is None:
+                return ids
+
+    def assert_listings_match(self):
+        for filters in self.FILTERS:
+            expected = matching_ids(self.service, filters)
+            self.assertEqual(self.all_pages(filters, 7), expected)
+            self.assertEqual([student["student_id"] for student in self.manager.export_students(filters)], expected)
+
+    def test_pages_and_export_match_a_full_scan(self):
+        self.assert_listings_match()
+        page, cursor = self.manager.list_students(120)
+        self.assertEqual((len(page), cursor), (120, None))
+
+    def test_index_follows_changed_and_new_students(self):
+        self.assert_listings_match()
+        scores = self.service.students.column("predicted_dropout_score")
+        scores[:5] = [0.9, 0.1, np.nan, 0.6, 0.3]
+        self.service.roster.mark_dirty(range(5))
+        self.service.apply_events([
+            {"student_id": "S010", "course_name": "Data Science", "quiz_scores": 10.0},
+            {"student_id": "S500", "course_name": "Cybersecurity", "age": 22, "gender": "Male",
+             "education_level": "Postgraduate", "learning_style": "Kinesthetic", "engagement_level": "High"},
+        ])
+        self.service.students.column("predicted_dropout_score")[-1] = 0.6
+        self.service.roster.mark_dirty(len(self.service.students) - 1)
+        self.assert_listings_match()
+
+    def test_student_scored_after_being_listed_unscored(self):
+        self.service.students.column("dropout_likelihood")[:] = np.arange(len(self.service.students)) % 3 == 0
+        self.service.train_classifier()
+        self.assert_listings_match()
+        self.service.load_student_from_csv_row(make_row("S900", "Data Science", 80, 80, 100))
+        self.assertIsNone(self.service.students["S900"].predicted_dropout_score)
+        self.assert_listings_match()
+        self.service.apply_events([{"student_id": "S900", "course_name": "Data Science", "quiz_scores": 20.0}])
+        self.assertIsNotNone(self.service.students["S900"].predicted_dropout_score)
+        self.assert_listings_match()
+
+    def test_rejects_bad_cursor_and_filters(self):
+        for cursor, filters in (("garbage!", None), (None, {"risk_band": "high"}), (None, {"course": "Nope"}),
+                                (None, {"learning_style": "Smell"}), (None, {"gender": "Male"})):
+            with self.assertRaises(ValueError):
+                self.manager.list_students(10, cursor, filters)
+
+
+if __name__ == '__main__':
+    unittest.main()
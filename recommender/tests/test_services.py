@@ -0,0 +1,276 @@
+import random
+import threading
+import unittest
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from recommender.core.models import LearningStyle, RunningStats
+from recommender.core.services import RecommendationService, SIMILAR_STUDENTS
+from config.settings import Config
+
+
+def make_row(student_id, course_name, completion, quiz, time_spent, exam=70, **overrides):
+    row = {
+        "Student_ID": student_id, "Age": "25", "Gender": "Female", "Education_Level": "Undergraduate",
+        "Course_Name": course_name, "Time_Spent_on_Videos": str(time_spent), "Quiz_Attempts": "2",
+        "Quiz_Scores": str(quiz), "Forum_Participation": "10", "Assignment_Completion_Rate": str(completion),
+        "Engagement_Level": "Medium", "Final_Exam_Score": str(exam), "Learning_Style": "Visual",
+        "Feedback_Score": "4", "Dropout_Likelihood": "No"
+    }
+    row.update(overrides)
+    return row
+
+
+class PerCourseConfig(Config):
+    COLLABORATIVE_NEIGHBORS = 'per_course'
+
+
+def make_service(students=120, seed=11, config=Config):
+    """Service with two random enrollments per student and random dropout scores."""
+    rng = random.Random(seed)
+    service = RecommendationService(config)
+    for i in range(students):
+        for course in rng.sample(["Python Basics", "Data Science", "Cybersecurity", "Web Development", "Machine Learning"], 2):
+            service.load_student_from_csv_row(make_row(
+                f"S{i:03d}", course, rng.randint(40, 100), rng.randint(40, 100), rng.randint(10, 500),
+                exam=rng.choice([0, rng.randint(30, 100)]),
+                Learning_Style=rng.choice(["Visual", "Auditory", "Reading/Writing", "Kinesthetic"]),
+                Age=str(rng.randint(18, 40))
+            ))
+    scores = service.students.column("predicted_dropout_score")
+    scores[:] = [rng.random() for _ in range(len(scores))]
+    return service
+
+
+class TestCourseAggregates(unittest.TestCase):
+
+    def setUp(self):
+        self.service = RecommendationService()
+
+    def test_running_averages_are_exact_means(self):
+        rows = [
+            make_row("S1", "Python Basics", 80, 60, 100),
+            make_row("S2", "Python Basics", 90, 70, 200),
+            make_row("S1", "Data Science", 50, 50, 50),
+            make_row("S3", "Python Basics", 40, 95, 30),
+        ]
+        for row in rows:
+            self.service.load_student_from_csv_row(row)
+        course = self.service.courses["Python Basics"]
+        self.assertAlmostEqual(course.average_completion_rate, 70.0)
+        self.assertAlmostEqual(course.average_quiz_score, 75.0)
+        self.assertAlmostEqual(course.average_time_spent, 110.0)
+        stats = self.service.course_stats["Python Basics"]
+        self.assertEqual(stats.completion_rate.count, 3)
+        self.assertAlmostEqual(stats.completion_rate.variance, 1400.0 / 3)
+        self.assertAlmostEqual(self.service.courses["Data Science"].average_quiz_score, 50.0)
+
+    def test_running_variance_keeps_precision_through_removals(self):
+        # Large offset, small spread: a sum of squares loses every significant digit here
+        values = 1e9 + np.random.default_rng(0).normal(scale=0.01, size=1000)
+        stats = RunningStats()
+        stats.add_many(values[:600])
+        for value in values[600:]:
+            stats.add(value)
+        stats.remove_many(values[:300])
+        for value in values[300:400]:
+            stats.remove(value)
+        rest = values[400:]
+        self.assertEqual(stats.count, len(rest))
+        self.assertAlmostEqual(stats.mean, rest.mean(), delta=1e-6)
+        self.assertAlmostEqual(stats.variance / rest.var(), 1.0, places=4)
+        stats.remove_many(rest)
+        self.assertEqual((stats.count, stats.mean, stats.variance), (0, 0.0, 0.0))
+
+    def test_reloaded_row_replaces_previous_values(self):
+        self.service.load_student_from_csv_row(make_row("S1", "Cybersecurity", 80, 60, 100))
+        self.service.load_student_from_csv_row(make_row("S2", "Cybersecurity", 40, 20, 10))
+        self.service.load_student_from_csv_row(make_row("S1", "Cybersecurity", 100, 80, 300))
+        stats = self.service.course_stats["Cybersecurity"]
+        self.assertEqual(stats.quiz_score.count, 2)
+        self.assertAlmostEqual(self.service.courses["Cybersecurity"].average_quiz_score, 50.0)
+
+
+class TestBatchRecommendations(unittest.TestCase):
+
+    def test_batch_matches_single_student_recommendations(self):
+        student_ids = [f"S{i:03d}" for i in range(0, 120, 3)] + ["missing"]
+        for config in (Config, PerCourseConfig):
+            service = make_service(config=config)
+            results = list(service.generate_recommendations_batch(student_ids, 3, chunk_size=16))
+            self.assertEqual([student_id for student_id, _ in results], student_ids)
+            for student_id, recommendations in results[:-1]:
+                self.assertEqual(recommendations, service.generate_recommendations(student_id, 3))
+            self.assertIsNone(results[-1][1])
+
+
+class TestCourseNeighbors(unittest.TestCase):
+
+    def setUp(self):
+        self.service = make_service(config=PerCourseConfig)
+
+    def test_each_course_gets_its_most_similar_enrolled_students(self):
+        service = self.service
+        table = service.students
+        rows = np.arange(0, 120, 7)
+        neighbor_rows, _, available = service._course_neighbors(rows, ~np.isnan(table.course_scores(rows)))
+        matrix = service.similarity_index.matrix
+        scores = table.course_scores(np.arange(len(table)))
+        for position, row in enumerate(rows):
+            for column, code in enumerate(service._course_codes()):
+                if not available[position, column]:
+                    continue
+                enrolled = np.flatnonzero(~np.isnan(scores[:, code]))
+                similarity = matrix[enrolled] @ matrix[row]
+                expected = enrolled[np.lexsort((enrolled, -similarity))[:SIMILAR_STUDENTS]]
+                np.testing.assert_array_equal(neighbor_rows[position, :, column], expected)
+        for recommendation in service.generate_recommendations("S000", 3):
+            self.assertIn("Popular among", recommendation.reasoning)
+
+    def test_global_mode_uses_the_overall_nearest_students(self):
+        service = make_service()  # 'global' is the default
+        service.generate_recommendations("S000", 3)
+        entry = service.recommendation_cache.items()[0][1]
+        self.assertEqual(entry.neighbor_ids, {student_id for student_id, _ in service.similarity_index.top_k("S000", 5)})
+
+        class UnknownConfig(Config):
+            COLLABORATIVE_NEIGHBORS = 'nearest'
+        with self.assertRaises(ValueError):
+            RecommendationService(UnknownConfig)
+
+    def test_cached_entries_survive_only_unrelated_changes(self):
+        for i in range(40):
+            self.service.generate_recommendations(f"S{i:03d}", 3)
+        self.service.load_student_from_csv_row(make_row("S500", "Cybersecurity", 75, 75, 250, exam=80))
+        self.service.load_student_from_csv_row(make_row("S007", "Machine Learning", 55, 90, 120, exam=65))
+        self.service.refresh_features()
+        self.assertLess(len(self.service.recommendation_cache), 40)
+        for (student_id, count), entry in self.service.recommendation_cache.items():
+            self.assertEqual(entry, self.service._compute_recommendations(self.service.students[student_id], count))
+
+
+class TestRecommendationCache(unittest.TestCase):
+
+    def setUp(self):
+        self.service = make_service()
+
+    def test_repeated_requests_hit_the_cache(self):
+        first = self.service.generate_recommendations("S000", 3)
+        self.assertEqual(self.service.generate_recommendations("S000", 3), first)
+        self.assertEqual(self.service.recommendation_cache.stats()["hits"], 1)
+
+    def test_change_to_a_neighbor_invalidates_only_dependent_entries(self):
+        for student_id in ("S000", "S001", "S002"):
+            self.service.generate_recommendations(student_id, 3)
+        neighbor_id = next(iter(self.service.recommendation_cache.items()[0][1].neighbor_ids))
+        self.service.load_student_from_csv_row(make_row(neighbor_id, "Python Basics", 10, 10, 10, exam=99))
+        self.service.refresh_features()
+        for (student_id, count), entry in self.service.recommendation_cache.items():
+            self.assertNotIn(neighbor_id, entry.neighbor_ids)
+            fresh = self.service._compute_recommendations(self.service.students[student_id], count)
+            self.assertEqual(entry, fresh)
+        self.assertNotIn(("S000", 3), dict(self.service.recommendation_cache.items()))
+
+    def test_course_weight_update_clears_recommendations(self):
+        self.service.generate_recommendations("S000", 3)
+        self.service.update_course_weights("Python Basics", {style: 1.0 for style in LearningStyle})
+        self.assertEqual(len(self.service.recommendation_cache), 0)
+
+
+class TestEventIngestion(unittest.TestCase):
+
+    def setUp(self):
+        self.service = make_service()
+        self.service.refresh_features()
+
+    def test_events_match_reloading_the_rows(self):
+        reloaded = make_service()
+        rows = [
+            make_row("S004", "Python Basics", 99, 12, 30, exam=88),
+            make_row("S200", "Cybersecurity", 70, 65, 120, exam=0, Learning_Style="Kinesthetic", Age="31"),
+        ]
+        for row in rows:
+            reloaded.load_student_from_csv_row(row)
+        reloaded.refresh_features()
+
+        self.service.generate_recommendations("S010", 3)
+        events = [{
+            "student_id": row["Student_ID"], "course_name": row["Course_Name"], "age": int(row["Age"]),
+            "gender": row["Gender"], "education_level": row["Education_Level"],
+            "learning_style": row["Learning_Style"], "engagement_level": row["Engagement_Level"],
+            "time_spent_on_videos": float(row["Time_Spent_on_Videos"]), "quiz_attempts": int(row["Quiz_Attempts"]),
+            "quiz_scores": float(row["Quiz_Scores"]), "forum_participation": float(row["Forum_Participation"]),
+            "assignment_completion_rate": float(row["Assignment_Completion_Rate"]),
+            "final_exam_score": float(row["Final_Exam_Score"]), "feedback_score": int(row["Feedback_Score"])
+        } for row in rows]
+        self.assertEqual(self.service.apply_events(events), ["S004", "S200"])
+
+        np.testing.assert_array_equal(self.service.features.similarity, reloaded.features.similarity)
+        for name, course in reloaded.courses.items():
+            self.assertAlmostEqual(self.service.courses[name].average_quiz_score, course.average_quiz_score)
+        for student_id in ("S004", "S010", "S200"):
+            self.assertEqual(
+                self.service.similarity_index.top_k(student_id, 5), reloaded.similarity_index.top_k(student_id, 5)
+            )
+            self.assertEqual(
+                self.service.generate_recommendations(student_id, 3), reloaded.generate_recommendations(student_id, 3)
+            )
+
+    def test_partial_event_keeps_other_fields_and_rescores_dropout(self):
+        service = self.service
+        service.classifier.model = RandomForestClassifier(n_estimators=5, random_state=0)
+        service.classifier.train(service.features.classifier, np.arange(len(service.students)) % 3 == 0)
+        student = service.students["S007"]
+        course = student.course_history[0]
+        before = student.engagement_metrics[course]
+
+        service.apply_events([{"student_id": "S007", "course_name": course, "quiz_scores": 3.0, "engagement_level": "Low"}])
+        self.assertEqual(student.engagement_metrics[course], dict(before, quiz_scores=3.0))
+        self.assertEqual(student.engagement_level.value, "Low")
+        expected = service.classifier.predict_proba(service.features.classifier[[student.row]])[0]
+        self.assertEqual(student.predicted_dropout_score, expected)
+
+    def test_invalid_event_changes_nothing(self):
+        quiz_scores = self.service.students.enrollment_column("quiz_scores").copy()
+        events = [
+            {"student_id": "S001", "course_name": "Data Science", "quiz_scores": 1.0},
+            {"student_id": "S999", "course_name": "Data Science", "quiz_scores": 1.0},
+        ]
+        with self.assertRaisesRegex(ValueError, "Invalid event 1"):
+            self.service.apply_events(events)
+        np.testing.assert_array_equal(self.service.students.enrollment_column("quiz_scores"), quiz_scores)
+        self.assertNotIn("S999", self.service.students)
+
+    def test_concurrent_events_apply_whole_batches(self):
+        events = [
+            [{"student_id": f"S{i:03d}", "course_name": "Machine Learning", "quiz_scores": float(i), "final_exam_score": 50.0}]
+            for i in range(60)
+        ] + [[{
+            "student_id": f"N{i:03d}", "course_name": "Data Science", "age": 20, "gender": "Male",
+            "education_level": "High School", "learning_style": "Visual", "engagement_level": "Low"
+        }] for i in range(60)]
+        threads = [threading.Thread(target=self.service.apply_events, args=(batch,)) for batch in events]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        table = self.service.students
+        self.assertEqual(len(table), 180)
+        for i in range(60):
+            self.assertEqual(table[f"S{i:03d}"].engagement_metrics["Machine Learning"]["quiz_scores"], float(i))
+        self.service.refresh_features()
+        np.testing.assert_array_equal(self.service.similarity_index.ids, table.ids)
+
+class TestWarmUp(unittest.TestCase):
+
+    def test_builds_lazy_structures_without_changing_results(self):
+        service = make_service()
+        expected = make_service().generate_recommendations("S005", 3)
+        service.warm_up()
+        self.assertIsNotNone(service.students._blocks)
+        self.assertIsNotNone(service.similarity_index._rows)
+        self.assertIsNotNone(service._style_weights)
+        self.assertEqual(len(service.features), len(service.students))
+        self.assertEqual(service.generate_recommendations("S005", 3), expected)
+
+if __name__ == '__main__':
+    unittest.main()
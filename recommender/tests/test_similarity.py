@@ -0,0 +1,186 @@
+import random
+import unittest
+from unittest import mock
+import numpy as np
+from datetime import datetime
+from recommender.core.models import StudentProfile, LearningStyle, Gender, EducationLevel, EngagementLevel
+from recommender.algorithms.similarity import CosineSimilarity, SimilarityIndex, IVFSimilarityIndex
+from recommender.core.services import RecommendationService
+from config.settings import Config
+
+
+def make_student(student_id: str, rng: random.Random) -> StudentProfile:
+    course = rng.choice(["Python Basics", "Data Science", "Cybersecurity"])
+    return StudentProfile(
+        student_id=student_id,
+        age=rng.randint(15, 49),
+        gender=rng.choice(list(Gender)),
+        education_level=rng.choice(list(EducationLevel)),
+        learning_style=rng.choice(list(LearningStyle)),
+        course_history=[course],
+        engagement_metrics={course: {
+            "time_spent_on_videos": float(rng.randint(10, 500)),
+            "quiz_scores": float(rng.randint(50, 100)),
+            "forum_participation": float(rng.randint(0, 50)),
+            "assignment_completion_rate": float(rng.randint(50, 100))
+        }},
+        quiz_attempts={course: rng.randint(1, 4)},
+        engagement_level=rng.choice(list(EngagementLevel)),
+        final_exam_scores={course: float(rng.randint(40, 100))},
+        feedback_scores={course: rng.randint(1, 5)},
+        dropout_likelihood=rng.random() < 0.2,
+        last_updated=datetime.now()
+    )
+
+
+def make_students(count: int = 300):
+    rng = random.Random(7)
+    students = {f"S{i:05d}": make_student(f"S{i:05d}", rng) for i in range(count)}
+    # Exact duplicates make sure ties are broken by insertion order
+    students[f"S{count:05d}"] = make_student(f"S{count:05d}", random.Random(1))
+    students[f"S{count + 1:05d}"] = make_student(f"S{count + 1:05d}", random.Random(1))
+    students[f"S{count + 1:05d}"].student_id = f"S{count + 1:05d}"
+    return students
+
+
+class TestSimilarityIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.students = make_students()
+        self.calculator = CosineSimilarity()
+        self.index = SimilarityIndex(self.calculator)
+        self.index.rebuild(self.students)
+
+    def brute_force(self, student_id, k):
+        target = self.students[student_id]
+        scores = [
+            (s.student_id, self.calculator.calculate_profile_similarity(target, s))
+            for s in self.students.values() if s.student_id != student_id
+        ]
+        scores.sort(key=lambda x: x[1], reverse=True)
+        return [sid for sid, _ in scores[:k]]
+
+    def test_top_k_matches_cosine_similarity_ranking(self):
+        for student_id in list(self.students)[::15] + ["S00300"]:
+            got = [sid for sid, _ in self.index.top_k(student_id, 5)]
+            self.assertEqual(got, self.brute_force(student_id, 5))
+
+    def test_dirty_profile_is_revectorized(self):
+        self.students["S00010"].age = 49
+        self.index.mark_dirty("S00010")
+        self.index.refresh(self.students)
+        self.assertEqual([sid for sid, _ in self.index.top_k("S00010", 5)], self.brute_force("S00010", 5))
+
+    def test_unknown_student_and_limits(self):
+        self.assertEqual(self.index.top_k("missing", 5), [])
+        self.assertEqual(len(self.index.top_k("S00000", 1000)), len(self.students) - 1)
+
+    def test_batch_matches_single_queries(self):
+        student_ids = list(self.students)[::7] + ["missing", "S00300", "S00301"]
+        expected = [self.index.top_k(sid, 5) if sid in self.students else None for sid in student_ids]
+        self.assertEqual(self.index.top_k_batch(student_ids, 5), expected)
+        self.assertEqual(self.index.top_k_batch(["S00000"], 1000), [self.index.top_k("S00000", 1000)])
+
+    def test_top_k_among_searches_each_group_only(self):
+        courses = ["Python Basics", "Data Science", "Cybersecurity"]
+        groups = [np.array([self.index.rows[sid] for sid, s in self.students.items() if s.course_history == [course]]) for course in courses]
+        query_rows = np.arange(0, len(self.students), 9)
+        searched = np.array([[row not in group for group in groups] for row in query_rows])
+        neighbors, scores = self.index.top_k_among(query_rows, groups, 5, searched)
+        matrix = self.index.matrix
+        for position, row in enumerate(query_rows):
+            for column, group in enumerate(groups):
+                if not searched[position, column]:
+                    self.assertTrue((neighbors[position, :, column] == -1).all())
+                    continue
+                exact = matrix[group] @ matrix[row]
+                expected = group[np.lexsort((group, -exact))[:5]]
+                np.testing.assert_array_equal(neighbors[position, :, column], expected)
+            single = self.index.top_k_among(query_rows[position:position + 1], groups, 5, searched[position:position + 1])
+            np.testing.assert_array_equal(single[0][0], neighbors[position])
+            np.testing.assert_array_equal(single[1][0], scores[position])
+
+        # Groups this small are scored on their own rows rather than after a full product
+        small = [group[::8] for group in groups]
+        searched = np.array([[row not in group for group in small] for row in query_rows])
+        neighbors, scores = self.index.top_k_among(query_rows, small, 5, searched)
+        for position in range(len(query_rows)):
+            single = self.index.top_k_among(query_rows[position:position + 1], small, 5, searched[position:position + 1])
+            np.testing.assert_array_equal(single[0][0], neighbors[position])
+            np.testing.assert_array_equal(single[1][0], scores[position])
+
+
+class TestIVFSimilarityIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.students = make_students()
+        self.calculator = CosineSimilarity()
+        self.index = SimilarityIndex(self.calculator)
+        self.index.rebuild(self.students)
+
+    def test_probing_every_list_is_exact(self):
+        index = IVFSimilarityIndex(self.calculator, n_lists=8, n_probe=8)
+        index.rebuild(self.students)
+        for student_id in list(self.students)[::25]:
+            self.assertEqual(index.top_k(student_id, 5), self.index.top_k(student_id, 5))
+
+    def test_single_probe_returns_k_neighbors_with_good_recall(self):
+        index = IVFSimilarityIndex(self.calculator, n_lists=8, n_probe=1)
+        index.rebuild(self.students)
+        hits = 0
+        for student_id in self.students:
+            approx = {sid for sid, _ in index.top_k(student_id, 5)}
+            self.assertEqual(len(approx), 5)
+            hits += len(approx & {sid for sid, _ in self.index.top_k(student_id, 5)})
+        self.assertGreater(hits / (5 * len(self.students)), 0.6)
+
+    def test_top_k_among_searches_probed_lists_within_each_group(self):
+        groups = [np.arange(group, len(self.students), 3) for group in range(3)]
+        query_rows = np.arange(0, len(self.students), 11)
+        searched = np.array([[row not in group for group in groups] for row in query_rows])
+        exact = self.index.top_k_among(query_rows, groups, 5, searched)
+        index = IVFSimilarityIndex(self.calculator, n_lists=8, n_probe=8)
+        index.rebuild(self.students)
+        for expected, found in zip(exact, index.top_k_among(query_rows, groups, 5, searched)):
+            np.testing.assert_array_equal(found, expected)
+
+        index = IVFSimilarityIndex(self.calculator, n_lists=8, n_probe=1)
+        index.rebuild(self.students)
+        neighbors, _ = index.top_k_among(query_rows, groups, 5, searched)
+        for position, row in enumerate(query_rows):
+            probed = set(index._probe(index.matrix[row], 1).tolist())
+            for column, group in enumerate(groups):
+                if not searched[position, column]:
+                    continue
+                found = neighbors[position, :, column]
+                self.assertTrue(np.isin(found, group).all())
+                if len(probed & set(group.tolist())) >= 5:
+                    self.assertTrue(set(found.tolist()) <= probed)
+                else:  # too few rows of the group were probed: searched exactly
+                    np.testing.assert_array_equal(found, exact[0][position, :, column])
+
+    def test_changed_rows_move_between_lists_without_a_rebuild(self):
+        index = IVFSimilarityIndex(self.calculator, n_lists=8, n_probe=1)
+        index.rebuild(self.students)
+        index.warm_up()
+        rng = np.random.default_rng(0)
+        dim = index.matrix.shape[1]
+        ids = list(self.students)
+        with mock.patch.object(index, "_build_lists", side_effect=AssertionError("lists rebuilt")):
+            index.add_vectors([ids[3], ids[40], "NEW1", "NEW2"], rng.normal(size=(4, dim)))
+            index.add_vectors([ids[3]], rng.normal(size=(1, dim)))
+            lists = [bucket.copy() for bucket in index._lists]
+            for student_id in ids[::25] + ["NEW1"]:
+                self.assertEqual(len(index.top_k(student_id, 5)), 5)
+        index._build_lists()
+        for incremental, rebuilt in zip(lists, index._lists):
+            np.testing.assert_array_equal(incremental, rebuilt)
+
+    def test_config_selects_search_method(self):
+        class IVFConfig(Config):
+            SIMILARITY_SEARCH = 'ivf'
+        self.assertIsInstance(RecommendationService(IVFConfig).similarity_index, IVFSimilarityIndex)
+        self.assertNotIsInstance(RecommendationService().similarity_index, IVFSimilarityIndex)
+
+if __name__ == '__main__':
+    unittest.main()
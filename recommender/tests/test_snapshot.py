@@ -0,0 +1,87 @@
+import contextlib
+import io
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+from recommender.core.services import RecommendationService
+from recommender.benchmarks.generate_dataset import generate_dataset
+from recommender.data.manager import DataManager
+from recommender.data.snapshot import SNAPSHOT_VERSION, file_checksum, is_current, load_snapshot, read_header, save_snapshot
+from recommender.tests.test_services import make_row, make_service
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.path = self.directory / "snapshot"
+        self.service = RecommendationService()
+        for i, course in enumerate(["Python Basics", "Data Science", "Cybersecurity"] * 4):
+            self.service.load_student_from_csv_row(make_row(f"S{i % 5}", course, 50 + i, 40 + 2 * i, 10 * i, exam=60 + i))
+        self.service.students.column("predicted_dropout_score")[:] = np.linspace(0.1, 0.9, len(self.service.students))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip_restores_state(self):
+        save_snapshot(self.service, str(self.path), "abc")
+        restored = load_snapshot(str(self.path))
+        for student_id in self.service.students:
+            self.assertEqual(restored.students[student_id].to_profile(), self.service.students[student_id].to_profile())
+        self.assertEqual(restored.courses, self.service.courses)
+        self.assertEqual(restored.course_stats, self.service.course_stats)
+        np.testing.assert_array_equal(restored.similarity_index.matrix, self.service.similarity_index.matrix)
+        self.assertEqual(
+            [s.student_id for s in restored.get_similar_students("S1", 3)],
+            [s.student_id for s in self.service.get_similar_students("S1", 3)]
+        )
+
+    def test_restored_service_accepts_updates_without_touching_snapshot(self):
+        save_snapshot(self.service, str(self.path), "abc")
+        restored = load_snapshot(str(self.path))
+        restored.load_student_from_csv_row(make_row("S9", "Web Development", 10, 10, 10))
+        restored.students["S0"].predicted_dropout_score = 0.0
+        self.assertIn("S9", restored.students)
+        again = load_snapshot(str(self.path))
+        self.assertNotIn("S9", again.students)
+        self.assertAlmostEqual(again.students["S0"].predicted_dropout_score, 0.1)
+
+    def test_round_trip_keeps_the_dropout_model(self):
+        service = make_service()
+        service.students.column("dropout_likelihood")[:] = np.arange(len(service.students)) % 3 == 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            service.train_classifier()
+        save_snapshot(service, str(self.path), "abc")
+        restored = load_snapshot(str(self.path))  # Config.MODEL_PATH is None
+        self.assertTrue(restored.classifier.is_trained)
+        self.assertEqual(restored.classifier.threshold, service.classifier.threshold)
+        profile = {"age": 25, "gender": "Female", "education_level": "Undergraduate", "learning_style": "Visual",
+                   "engagement_level": "Medium", "courses": [{"course_name": "Data Science", "quiz_scores": 55.0}]}
+        self.assertEqual(restored.score_profiles([profile])[0][0], service.score_profiles([profile])[0][0])
+
+    def test_manager_trains_when_the_snapshot_has_no_model(self):
+        dataset = str(self.directory / "dataset.csv")
+        generate_dataset(dataset, 60, courses_per_student=2, seed=5)
+        manager = DataManager(dataset)
+        manager.loader.load_dataset()
+        save_snapshot(manager.loader.get_service(), str(self.path), file_checksum(dataset))
+        self.assertIsNone(read_header(str(self.path))["model"])
+        manager = DataManager(dataset)
+        with contextlib.redirect_stdout(io.StringIO()):
+            manager.initialize(str(self.path))
+        self.assertTrue(manager.service.classifier.is_trained)
+        self.assertEqual(read_header(str(self.path))["model"], "model")
+
+    def test_checksum_and_version_gate_reuse(self):
+        self.assertFalse(is_current(str(self.path), "abc"))
+        save_snapshot(self.service, str(self.path), "abc")
+        self.assertTrue(is_current(str(self.path), "abc"))
+        self.assertFalse(is_current(str(self.path), "changed"))
+        header = (self.path / "header.json").read_text().replace(f'"version": {SNAPSHOT_VERSION}', '"version": 0')
+        (self.path / "header.json").write_text(header)
+        self.assertFalse(is_current(str(self.path), "abc"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import random
+import threading
+import unittest
+import numpy as np
+from recommender.core.models import Gender, LearningStyle
+from recommender.core.table import DirtyRows, StudentTable, StudentView
+from recommender.tests.test_similarity import make_student
+
+
+class TestStudentTable(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(3)
+        self.profiles = [make_student(f"S{i:05d}", rng) for i in range(50)]
+        self.table = StudentTable(initial_capacity=4)
+        for profile in self.profiles:
+            self.table.add_profile(profile)
+
+    def test_views_round_trip_profiles(self):
+        self.assertEqual(len(self.table), 50)
+        for profile in self.profiles:
+            view = self.table[profile.student_id]
+            self.assertIsInstance(view, StudentView)
+            restored = view.to_profile()
+            restored.last_updated = profile.last_updated  # stored as a float timestamp
+            self.assertEqual(restored, profile)
+
+    def test_set_enrollment_overwrites_existing_course(self):
+        row = self.table.index["S00000"]
+        course = self.profiles[0].course_history[0]
+        metrics = dict.fromkeys(("time_spent_on_videos", "quiz_scores", "forum_participation", "assignment_completion_rate"), 1.0)
+        previous = self.table.set_enrollment(row, course, metrics, 3, 99.0, 5)
+        self.assertEqual(previous["final_exam_score"], self.profiles[0].final_exam_scores[course])
+        self.assertIsNone(self.table.set_enrollment(row, "Web Development", metrics, 1, 50.0, 2))
+        view = self.table["S00000"]
+        self.assertEqual(view.course_history, [course, "Web Development"])
+        self.assertEqual(view.final_exam_scores, {course: 99.0, "Web Development": 50.0})
+
+    def test_enrollment_blocks_group_courses_by_student(self):
+        row = self.table.index["S00007"]
+        metrics = dict.fromkeys(("time_spent_on_videos", "quiz_scores", "forum_participation", "assignment_completion_rate"), 0.0)
+        self.table.set_enrollment(row, "Web Development", metrics, 1, 10.0, 1)
+        order, indptr = self.table.enrollment_blocks()
+        self.assertEqual(indptr[-1], self.table.num_enrollments)
+        block = order[indptr[row]:indptr[row + 1]]
+        self.assertEqual(list(block), self.table.student_enrollments(row))
+        self.assertTrue(np.all(self.table.enrollment_column("student")[order] == np.repeat(np.arange(50), np.diff(indptr))))
+
+    def test_encoded_columns_and_predicted_score(self):
+        view = self.table["S00003"]
+        self.assertIsNone(view.predicted_dropout_score)
+        view.predicted_dropout_score = 0.25
+        self.assertEqual(self.table.column("predicted_dropout_score")[view.row], 0.25)
+        self.assertIsInstance(view.gender, Gender)
+        self.assertIsInstance(view.learning_style, LearningStyle)
+        self.assertNotIn("missing", self.table)
+        self.assertIsNone(self.table.get("missing"))
+
+
+class TestDirtyRows(unittest.TestCase):
+
+    def test_take_returns_rows_below_size_and_empties_the_set(self):
+        dirty = DirtyRows()
+        dirty.add([7, 2, 2])
+        dirty.add(12)
+        self.assertTrue(dirty)
+        np.testing.assert_array_equal(dirty.take(10), [2, 7])
+        self.assertFalse(dirty)
+
+    def test_rows_marked_concurrently_are_never_lost(self):
+        dirty = DirtyRows()
+        taken = []
+        threads = [threading.Thread(target=dirty.add, args=(range(i * 100, (i + 1) * 100),)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            taken.extend(dirty.take(2000))
+        for thread in threads:
+            thread.join()
+        taken.extend(dirty.take(2000))
+        self.assertEqual(sorted(taken), list(range(2000)))
+
+
+if __name__ == '__main__':
+    unittest.main()